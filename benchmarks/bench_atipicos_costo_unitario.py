@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark de limpiar_atipicos_costo_unitario al crecer el número de categorías.
+
+Compara la versión agrupada (una pasada + where) con la versión original, que filtra
+el dataframe completo una vez por categoría.
+
+Uso:
+    python benchmarks/bench_atipicos_costo_unitario.py [filas]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from limpieza_datos_inventario import limpiar_atipicos_costo_unitario
+
+# La versión original se vuelve impráctica con muchas categorías
+MAX_CATEGORIAS_ORIGINAL = 2000
+
+
+def limpiar_atipicos_original(df, remplazo):
+    """Versión original: una máscara de filas completa por categoría y estadística."""
+    medidas = {}
+    for cat in df['Categoria'].unique():
+        datos = df[df['Categoria'] == cat]['Costo_Unitario_USD']
+        medidas[cat] = {'moda': datos.mode()[0], 'mediana': datos.median(), 'media': datos.mean()}
+    for cat in df['Categoria'].unique():
+        mask_altos = (df['Categoria'] == cat) & (df['Costo_Unitario_USD'] > 10000)
+        mask_bajos = (df['Categoria'] == cat) & (df['Costo_Unitario_USD'] < 30)
+        if mask_altos.sum() > 0:
+            df.loc[mask_altos, 'Costo_Unitario_USD'] = medidas[cat][remplazo]
+        if mask_bajos.sum() > 0:
+            df.loc[mask_bajos, 'Costo_Unitario_USD'] = medidas[cat][remplazo]
+    return df
+
+
+def generar_inventario(filas, categorias, semilla=0):
+    rng = np.random.default_rng(semilla)
+    costos = rng.lognormal(mean=6, sigma=1.2, size=filas).round(2)
+    # ~5% de atípicos en ambos extremos
+    atipicos = rng.random(filas) < 0.05
+    costos[atipicos] = rng.choice([5.0, 50000.0], atipicos.sum())
+    return pd.DataFrame({
+        'Categoria': np.char.add('CAT-', rng.integers(0, categorias, filas).astype(str)),
+        'Costo_Unitario_USD': costos,
+    })
+
+
+def medir(funcion, df, remplazo, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        copia = df.copy()
+        inicio = time.perf_counter()
+        funcion(copia, remplazo)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"📊 limpiar_atipicos_costo_unitario - {filas:,} filas, remplazo='mediana'\n")
+    print(f"{'categorías':>11} | {'original (s)':>13} | {'agrupada (s)':>13} | {'speedup':>8}")
+    print("-" * 55)
+    for categorias in [5, 50, 500, 2000, 20000]:
+        df = generar_inventario(filas, categorias)
+        t_nueva = medir(limpiar_atipicos_costo_unitario, df, 'mediana')
+        if categorias <= MAX_CATEGORIAS_ORIGINAL:
+            t_original = medir(limpiar_atipicos_original, df, 'mediana', repeticiones=1)
+            print(f"{categorias:>11} | {t_original:>13.4f} | {t_nueva:>13.4f} | {t_original / t_nueva:>7.1f}x")
+        else:
+            print(f"{categorias:>11} | {'(omitido)':>13} | {t_nueva:>13.4f} | {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark de calcular_health_score sobre un dataframe ancho (estilo merge integrado).
+
+Compara la versión de una pasada (un solo ordenamiento del bloque numérico, hash por
+fila, sin modificar el dataframe) con la versión original, que recorre las columnas
+numéricas una a una y llama a duplicated() sobre todo el dataframe.
+
+Uso:
+    python benchmarks/bench_health_score.py [filas] [columnas]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_cleaning import calcular_health_score
+
+
+def calcular_health_score_original(df):
+    """Versión original: quantile por columna, duplicated() sobre todo el frame."""
+    n_rows, n_cols = df.shape
+    if 'Comentario_Texto' in df.columns:
+        df.loc[df['Comentario_Texto'] == "---", 'Comentario_Texto'] = np.nan
+    if 'Categoria' in df.columns:
+        df.loc[df['Categoria'] == "???", 'Categoria'] = np.nan
+    null_global_pct = df.isna().sum().sum() / (n_rows * n_cols) * 100
+    dup_ratio = int(df.duplicated().sum()) / n_rows * 100
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    total_outliers = 0
+    for col in numeric_cols:
+        s = pd.to_numeric(df[col], errors='coerce').dropna()
+        if len(s) > 0:
+            q1 = s.quantile(0.25)
+            q3 = s.quantile(0.75)
+            iqr = q3 - q1
+            if iqr > 0:
+                total_outliers += ((s < q1 - 1.5 * iqr) | (s > q3 + 1.5 * iqr)).sum()
+    outlier_ratio = total_outliers / (n_rows * len(numeric_cols)) * 100 if len(numeric_cols) else 0.0
+    negative_count = 0
+    for col in ['Stock_Actual', 'Cantidad_Vendida']:
+        if col in df.columns:
+            negative_count += (pd.to_numeric(df[col], errors='coerce') < 0).sum()
+    negative_ratio = negative_count / n_rows * 100
+    score = 100 - (null_global_pct * 5 + dup_ratio * 7 + outlier_ratio * 3 + negative_ratio * 7)
+    return float(max(0, min(100, score)))
+
+
+def generar_merge(filas, columnas, semilla=0, con_id=True):
+    """Dataframe con ~70% de columnas numéricas y ~30% de texto, con nulos y centinelas."""
+    rng = np.random.default_rng(semilla)
+    datos = {}
+    if con_id:
+        datos['Transaccion_ID'] = np.char.add('TRX-', np.arange(filas).astype(str))
+    for i in range(columnas):
+        if i % 10 < 7:
+            valores = rng.lognormal(3, 1, filas)
+            valores[rng.random(filas) < 0.03] = np.nan
+            datos[f'num_{i}'] = valores
+        else:
+            datos[f'txt_{i}'] = rng.choice(['A', 'B', 'C', 'D', None], filas)
+    datos['Cantidad_Vendida'] = rng.integers(-2, 20, filas)
+    datos['Comentario_Texto'] = rng.choice(['Excelente', 'Lento', '---'], filas)
+    return pd.DataFrame(datos)
+
+
+def medir(funcion, df, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        copia = df.copy()
+        inicio = time.perf_counter()
+        funcion(copia)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    columnas = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"📊 calcular_health_score - {filas:,} filas x {columnas} columnas\n")
+    print(f"{'dataframe':>12} | {'original (s)':>13} | {'una pasada (s)':>15} | {'speedup':>8}")
+    print("-" * 58)
+    for nombre, con_id in [('con ID', True), ('sin ID', False)]:
+        df = generar_merge(filas, columnas, con_id=con_id)
+        t_original = medir(calcular_health_score_original, df)
+        t_nueva = medir(calcular_health_score, df)
+        assert calcular_health_score(df) == calcular_health_score_original(df.copy())
+        print(f"{nombre:>12} | {t_original:>13.4f} | {t_nueva:>15.4f} | {t_original / t_nueva:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
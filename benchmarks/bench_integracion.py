@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark de integrar_datos: claves de texto vs claves codificadas como enteros, y
+merge vs búsqueda por índice para la dimensión de inventario (tiempo y pico de memoria).
+
+Uso:
+    python benchmarks/bench_integracion.py [transacciones]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_integration import integrar_datos, _unir_dimension
+
+SKUS = 2500
+
+
+def generar_fuentes(transacciones, semilla=0):
+    """Transacciones, feedback (~45% de las transacciones) e inventario con IDs prefijo+número."""
+    rng = np.random.default_rng(semilla)
+    ids = np.char.add('TRX-', (10000 + np.arange(transacciones)).astype(str))
+    df_transaccion = pd.DataFrame({
+        'Transaccion_ID': pd.array(ids, dtype='str'),
+        'SKU_ID': pd.array(np.char.add('PROD-', rng.integers(1000, 1000 + SKUS + 300, transacciones).astype(str)), dtype='str'),
+        'Cantidad_Vendida': rng.integers(1, 20, transacciones),
+        'Precio_Venta_Final': rng.lognormal(6, 1, transacciones).round(2),
+    })
+    con_feedback = rng.random(transacciones) < 0.45
+    df_feedback = pd.DataFrame({
+        'Feedback_ID': pd.array(np.char.add('FB-', np.arange(con_feedback.sum()).astype(str)), dtype='str'),
+        'Transaccion_ID': pd.array(ids[con_feedback], dtype='str'),
+        'Rating_Producto': rng.integers(1, 6, con_feedback.sum()),
+    }).sample(frac=1, random_state=semilla).reset_index(drop=True)
+    df_inventario = pd.DataFrame({
+        'SKU_ID': pd.array(np.char.add('PROD-', np.arange(1000, 1000 + SKUS).astype(str)), dtype='str'),
+        'Costo_Unitario_USD': rng.lognormal(5, 1, SKUS).round(2),
+        'Categoria': pd.array(rng.choice(['Laptops', 'Monitores', 'Tablets'], SKUS), dtype='str'),
+    })
+    return df_transaccion, df_feedback, df_inventario
+
+
+VARIANTES = [
+    ('texto + merge', {'codificar_claves': False, 'busqueda_inventario': False}),
+    ('enteras + merge', {'busqueda_inventario': False}),
+    ('enteras + búsqueda', {}),
+]
+
+
+def medir(fuentes, repeticiones=3, **opciones):
+    """Retorna (mejor tiempo en s, pico de memoria en MB medido con tracemalloc)."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            integrar_datos(*fuentes, **opciones)
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        integrar_datos(*fuentes, **opciones)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tiempos), pico / 1024 ** 2
+
+
+def main():
+    filas = [int(sys.argv[1])] if len(sys.argv) > 1 else [100_000, 1_000_000, 3_000_000]
+    print("📊 integrar_datos - tiempo (s) y pico de memoria de numpy (MB)\n")
+    print(f"{'transacciones':>14} | {'variante':>20} | {'tiempo (s)':>10} | {'pico (MB)':>10} | {'speedup':>8}")
+    print("-" * 76)
+    for n in filas:
+        fuentes = generar_fuentes(n)
+        t_base = None
+        for nombre, opciones in VARIANTES:
+            tiempo, pico = medir(fuentes, **opciones)
+            t_base = t_base or tiempo
+            print(f"{n:>14,} | {nombre:>20} | {tiempo:>10.4f} | {pico:>10.1f} | {t_base / tiempo:>7.1f}x")
+
+
+    print("\n📊 Solo el join con inventario (hechos = transacciones + feedback)\n")
+    print(f"{'transacciones':>14} | {'variante':>20} | {'tiempo (s)':>10} | {'pico (MB)':>10}")
+    print("-" * 65)
+    for n in filas:
+        df_transaccion, df_feedback, df_inventario = generar_fuentes(n)
+        hechos = pd.merge(df_transaccion, df_feedback, on='Transaccion_ID')
+        for nombre, funcion in [
+            ('pd.merge', lambda: pd.merge(hechos, df_inventario, on='SKU_ID')),
+            ('búsqueda por índice', lambda: _unir_dimension(hechos, df_inventario, 'SKU_ID')),
+        ]:
+            tiempo, pico = medir_funcion(funcion)
+            print(f"{n:>14,} | {nombre:>20} | {tiempo:>10.4f} | {pico:>10.1f}")
+
+
+def medir_funcion(funcion, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tiempos), pico / 1024 ** 2
+
+
+if __name__ == "__main__":
+    main()
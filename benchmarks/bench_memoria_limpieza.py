@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria de limpiar_feedback sobre un archivo de feedback de millones de filas.
+
+Compara el pico de RSS de la limpieza en dos modos, cada uno en un proceso nuevo:
+- copias: la cadena anterior, con una copia inicial del DataFrame y otra copia completa
+  en cada manejar_outliers_* (que no recibían inplace)
+- pipeline: limpiar_feedback actual, que ejecuta cada paso con inplace=True sobre una
+  selección de sus columnas
+
+El pico se mide con VmHWM de /proc/self/status, que se reinicia después de leer el CSV:
+así solo cuenta la memoria que agrega la limpieza (Linux; en otros sistemas se usa
+ru_maxrss, que incluye la lectura).
+
+Uso:
+    python benchmarks/bench_memoria_limpieza.py [filas] [--archivo feedback.csv]
+
+    python benchmarks/bench_memoria_limpieza.py 5000000
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from limpieza_datos_feedback import (
+    manejar_outliers_rating_producto, manejar_outliers_edad_cliente,
+    imputar_valores_comentario_texto, imputar_valores_recomienda_marca
+)
+from utils.data_cleaning import limpiar_feedback
+from utils.schemas import leer_csv_con_esquema
+from utils.synthetic_data import PROPORCION_FEEDBACK, generar_feedback
+
+FILAS_POR_DEFECTO = 3_000_000
+MODOS = ['copias', 'pipeline']
+
+
+def limpiar_feedback_con_copias(df):
+    """Cadena anterior: copia inicial y una copia completa en cada manejo de outliers."""
+    df = df.copy()
+    df = manejar_outliers_rating_producto(df, 'Mediana')
+    df = manejar_outliers_edad_cliente(df, 'Mediana')
+    df = imputar_valores_comentario_texto(df, inplace=True)
+    df = imputar_valores_recomienda_marca(df, inplace=True)
+    return df
+
+
+def _memoria_proceso(campo):
+    """VmRSS o VmHWM del proceso en MB, o None si /proc no está disponible."""
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith(campo + ':'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def _reiniciar_pico():
+    """Reinicia VmHWM al RSS actual. Retorna False si el sistema no lo permite."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def medir(modo, ruta):
+    """Lee el CSV, limpia con el modo indicado y retorna tiempo, RSS base y pico en MB."""
+    with open(ruta, 'rb') as f:
+        df = leer_csv_con_esquema(f.read(), 'feedback')
+    gc.collect()
+
+    reiniciado = _reiniciar_pico()
+    base = _memoria_proceso('VmRSS')
+    funcion = limpiar_feedback_con_copias if modo == 'copias' else limpiar_feedback
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        limpio = funcion(df)
+    segundos = time.perf_counter() - inicio
+
+    if reiniciado:
+        pico = _memoria_proceso('VmHWM')
+    else:
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    return {
+        'modo': modo,
+        'filas': len(limpio),
+        'segundos': round(segundos, 4),
+        'rss_base_mb': round(base, 1) if base is not None else None,
+        'rss_pico_mb': round(pico, 1),
+        'pico_sobre_base_mb': round(pico - base, 1) if reiniciado and base is not None else None,
+        'marco_mb': round(df.memory_usage(index=True, deep=True).sum() / 1024 ** 2, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pico de RSS de limpiar_feedback con y sin copias")
+    parser.add_argument('filas', nargs='?', type=int, default=FILAS_POR_DEFECTO, help="Filas del feedback sintético")
+    parser.add_argument('--archivo', help="CSV de feedback a usar en lugar de generar uno")
+    parser.add_argument('--medir', choices=MODOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        # Proceso hijo: una sola medición, como JSON
+        print(json.dumps(medir(args.medir, args.archivo)))
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = args.archivo
+        if ruta is None:
+            ruta = os.path.join(directorio, 'feedback.csv')
+            print(f"Generando feedback sintético de {args.filas:,} filas...")
+            generar_feedback(args.filas, int(args.filas / PROPORCION_FEEDBACK)).to_csv(ruta, index=False)
+
+        print(f"\n📊 Memoria de limpiar_feedback - {ruta}\n")
+        print(f"{'modo':>10} | {'filas':>10} | {'tiempo (s)':>10} | {'marco (MB)':>10} | {'RSS base (MB)':>13} | {'pico sobre base (MB)':>20}")
+        print("-" * 90)
+        for modo in MODOS:
+            salida = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--medir', modo, '--archivo', ruta],
+                capture_output=True, text=True, check=True,
+            )
+            m = json.loads(salida.stdout.strip().splitlines()[-1])
+            extra = m['pico_sobre_base_mb'] if m['pico_sobre_base_mb'] is not None else f"(pico total {m['rss_pico_mb']})"
+            print(f"{m['modo']:>10} | {m['filas']:>10,} | {m['segundos']:>10.3f} | {m['marco_mb']:>10.1f} | "
+                  f"{m['rss_base_mb']:>13.1f} | {extra:>20}")
+
+
+if __name__ == "__main__":
+    main()
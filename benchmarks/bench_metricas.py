@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark de crear_metricas_nuevas: versión de una pasada sobre arreglos numpy (con y
+sin la copia defensiva, y con la caché del registro de métricas vacía y en un rerun) frente a la
+versión original con operaciones de pandas encadenadas (tiempo y pico de memoria).
+
+Uso:
+    python benchmarks/bench_metricas.py [filas]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.data_integration import crear_metricas_nuevas
+from utils.metrics_registry import limpiar_cache_metricas
+
+
+def crear_metricas_nuevas_original(df_merged):
+    """Versión original: copia, replace(0, 1) dos veces, fillna/clip encadenados."""
+    df_merged = df_merged.copy()
+    df_merged['Rating_Servicio'] = (df_merged['Rating_Producto'] * df_merged['Rating_Logistica']) / 5
+    df_merged['Margen_Unitario_Pct'] = (
+        (df_merged['Precio_Venta_Final'] - df_merged['Costo_Unitario_USD'])
+        / df_merged['Precio_Venta_Final'] * 100
+    ).fillna(0).clip(lower=0)
+    cantidad_vendida = df_merged.get('Cantidad_Vendida', 1).copy()
+    cantidad_vendida = cantidad_vendida.replace(0, 1)
+    costo_envio = df_merged.get('Costo_Envio', 0).fillna(0)
+    costo_envio_unitario = costo_envio / cantidad_vendida
+    ganancia_unitaria = (
+        df_merged['Precio_Venta_Final'] - df_merged['Costo_Unitario_USD'] - costo_envio_unitario
+    )
+    df_merged['Ganancia_Neta_Total'] = (ganancia_unitaria * cantidad_vendida).clip(lower=0).fillna(0)
+    cantidad_vendida = df_merged.get('Cantidad_Vendida', 1).copy()
+    cantidad_vendida = cantidad_vendida.replace(0, 1)
+    revenue_total = df_merged['Precio_Venta_Final'] * cantidad_vendida
+    df_merged['Margen_Real_Pct'] = (
+        (df_merged['Ganancia_Neta_Total'] / revenue_total * 100).fillna(0).clip(lower=-100, upper=100)
+    )
+    return df_merged
+
+
+def generar_merge(filas, semilla=0):
+    """Columnas que usa crear_metricas_nuevas más algunas de texto, como el merge integrado."""
+    rng = np.random.default_rng(semilla)
+    costo_envio = rng.gamma(2, 10, filas)
+    costo_envio[rng.random(filas) < 0.05] = np.nan
+    return pd.DataFrame({
+        'Transaccion_ID': pd.array(np.char.add('TRX-', np.arange(filas).astype(str)), dtype='str'),
+        'Ciudad_Destino': pd.array(rng.choice(['Bogotá', 'Medellín', 'Cali'], filas), dtype='str'),
+        'Rating_Producto': rng.integers(1, 6, filas),
+        'Rating_Logistica': rng.integers(1, 6, filas),
+        'Precio_Venta_Final': rng.lognormal(6, 1, filas).round(2),
+        'Costo_Unitario_USD': rng.lognormal(5.5, 1, filas).round(2),
+        'Cantidad_Vendida': rng.integers(0, 20, filas),
+        'Costo_Envio': costo_envio,
+    })
+
+
+def medir(funcion, df, repeticiones=3):
+    """Retorna (mejor tiempo en s, pico de memoria en MB medido con tracemalloc)."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(df)
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcion(df)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tiempos), pico / 1024 ** 2
+
+
+def _sin_cache(funcion):
+    def medir_sin_cache(df):
+        limpiar_cache_metricas()
+        return funcion(df)
+    return medir_sin_cache
+
+
+VARIANTES = [
+    ('original (pandas)', crear_metricas_nuevas_original),
+    ('una pasada', lambda df: crear_metricas_nuevas(df, usar_cache=False)),
+    # Cada repetición trabaja sobre su propia copia superficial (sin copiar los datos)
+    ('una pasada, copiar=False', lambda df: crear_metricas_nuevas(df.copy(deep=False), copiar=False, usar_cache=False)),
+    ('caché vacía, copiar=False', _sin_cache(lambda df: crear_metricas_nuevas(df.copy(deep=False), copiar=False, version='bench'))),
+    ('caché (rerun), copiar=False', lambda df: crear_metricas_nuevas(df.copy(deep=False), copiar=False, version='bench')),
+]
+
+
+def main():
+    filas = [int(sys.argv[1])] if len(sys.argv) > 1 else [1_000_000, 10_000_000]
+    print("📊 crear_metricas_nuevas - tiempo (s) y pico de memoria de numpy (MB)\n")
+    print(f"{'filas':>12} | {'variante':>28} | {'tiempo (s)':>10} | {'pico (MB)':>10} | {'speedup':>8}")
+    print("-" * 82)
+    for n in filas:
+        df = generar_merge(n)
+        pd.testing.assert_frame_equal(crear_metricas_nuevas(df), crear_metricas_nuevas_original(df))
+        t_base = None
+        for nombre, funcion in VARIANTES:
+            tiempo, pico = medir(funcion, df)
+            t_base = t_base or tiempo
+            print(f"{n:>12,} | {nombre:>28} | {tiempo:>10.4f} | {pico:>10.1f} | {t_base / tiempo:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalabilidad del pipeline completo sobre datos sintéticos.
+
+Genera los tres datasets sucios con utils.synthetic_data (mismos patrones que
+data/*_v2.csv) y mide tiempo y pico de memoria de cada etapa: lectura con esquema,
+limpiar_inventario / limpiar_feedback / limpiar_transacciones, calcular_health_score,
+integrar_datos y crear_metricas_nuevas.
+
+Además de la tabla, cada medición se emite como una línea JSON (tamaño, etapa, tiempo,
+pico de memoria, filas, versiones) para seguir regresiones entre commits.
+
+Uso:
+    python benchmarks/bench_pipeline.py [transacciones ...] [--json resultados.jsonl] [--repeticiones N]
+
+    python benchmarks/bench_pipeline.py                        # 10k, 100k y 1M transacciones
+    python benchmarks/bench_pipeline.py 10000000 --repeticiones 1 --json bench_10M.jsonl
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.synthetic_data import generar_csv
+from utils.schemas import leer_csv_con_esquema
+from utils.data_cleaning import (
+    limpiar_inventario, limpiar_feedback, limpiar_transacciones, calcular_health_score, limpiar_cache_health_score
+)
+from utils.data_integration import integrar_datos, crear_metricas_nuevas
+
+TAMANOS_POR_DEFECTO = [10_000, 100_000, 1_000_000]
+
+
+def medir(funcion, repeticiones=3, antes=None):
+    """
+    Retorna (resultado, mejor tiempo en s, pico de memoria en MB medido con tracemalloc).
+
+    antes se llama antes de cada ejecución, fuera del tiempo medido (p. ej. para vaciar
+    una caché). El pico se mide en una ejecución aparte porque tracemalloc la hace más lenta.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        if antes:
+            antes()
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    if antes:
+        antes()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, min(tiempos), pico / 1024 ** 2
+
+
+def ejecutar(transacciones, repeticiones=3, semilla=0):
+    """Genera los datos de un tamaño, ejecuta el pipeline etapa por etapa y retorna una medición (dict) por etapa."""
+    archivos = generar_csv(transacciones, semilla)
+    mediciones = []
+
+    def registrar(etapa, funcion, antes=None):
+        resultado, tiempo, pico = medir(funcion, repeticiones, antes)
+        mediciones.append({
+            'transacciones': transacciones,
+            'etapa': etapa,
+            'segundos': round(tiempo, 6),
+            'pico_mb': round(pico, 2),
+            'filas': len(resultado) if isinstance(resultado, pd.DataFrame) else None,
+        })
+        return resultado
+
+    crudos = {
+        nombre: registrar(f'leer_csv_con_esquema[{nombre}]', lambda c=contenido, n=nombre: leer_csv_con_esquema(c, n))
+        for nombre, contenido in archivos.items()
+    }
+    inventario = registrar('limpiar_inventario', lambda: limpiar_inventario(crudos['inventario']))
+    feedback = registrar('limpiar_feedback', lambda: limpiar_feedback(crudos['feedback']))
+    transacciones_limpias = registrar('limpiar_transacciones', lambda: limpiar_transacciones(crudos['transacciones']))
+
+    integrado = registrar('integrar_datos', lambda: integrar_datos(transacciones_limpias, feedback, inventario))
+    integrado = registrar('crear_metricas_nuevas', lambda: crear_metricas_nuevas(integrado, usar_cache=False))
+
+    # Sin caché: cada ejecución recorre el dataframe completo
+    registrar('calcular_health_score[transacciones]', lambda: calcular_health_score(crudos['transacciones']),
+              antes=limpiar_cache_health_score)
+    registrar('calcular_health_score[integrado]', lambda: calcular_health_score(integrado),
+              antes=limpiar_cache_health_score)
+    return mediciones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidad del pipeline sobre datos sintéticos")
+    parser.add_argument('transacciones', nargs='*', type=int, default=TAMANOS_POR_DEFECTO,
+                        help="Filas de transacciones de cada corrida (10k a 10M)")
+    parser.add_argument('--json', help="Archivo donde agregar los resultados, una línea JSON por medición")
+    parser.add_argument('--repeticiones', type=int, default=3, help="Ejecuciones cronometradas por etapa (se toma la mejor)")
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    entorno = {
+        'fecha': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'repeticiones': args.repeticiones,
+    }
+
+    print("📊 Pipeline completo sobre datos sintéticos - tiempo (s) y pico de memoria de tracemalloc (MB)\n")
+    print(f"{'transacciones':>14} | {'etapa':>38} | {'tiempo (s)':>10} | {'pico (MB)':>10} | {'filas':>10}")
+    print("-" * 94)
+    for transacciones in args.transacciones:
+        mediciones = ejecutar(transacciones, args.repeticiones, args.semilla)
+        for m in mediciones:
+            filas = f"{m['filas']:,}" if m['filas'] is not None else '-'
+            print(f"{m['transacciones']:>14,} | {m['etapa']:>38} | {m['segundos']:>10.4f} | {m['pico_mb']:>10.1f} | {filas:>10}")
+        total = sum(m['segundos'] for m in mediciones)
+        print(f"{transacciones:>14,} | {'total':>38} | {total:>10.4f} |")
+        print("-" * 94)
+
+        if args.json:
+            with open(args.json, 'a', encoding='utf-8') as f:
+                for m in mediciones:
+                    f.write(json.dumps({**entorno, **m}, ensure_ascii=False) + '\n')
+
+    if args.json:
+        print(f"\n💾 Resultados agregados a {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark del dashboard de la página Merge: las ~40 agregaciones originales (un groupby,
+value_counts o crosstab sobre todas las filas cada una) frente a construir el cubo de
+utils/rollup.py una vez y resolver las mismas consultas sobre él.
+
+Uso:
+    python benchmarks/bench_rollup.py [filas]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.rollup import construir_cubo, consultar_cubo, conteos, tabla_cruzada, total_cubo
+
+KPIS = {'Revenue': 'sum', 'Ganancia_Neta_Total': 'sum', 'Cantidad_Vendida': 'sum',
+        'Rating_Producto': 'mean', 'Satisfaccion_NPS': 'mean', 'Margen_Real_Pct': 'mean'}
+
+
+def generar_dashboard(filas, semilla=0):
+    """Dataset integrado sintético con las columnas que usa el dashboard."""
+    rng = np.random.default_rng(semilla)
+    skus = rng.integers(1000, 4000, filas)
+    categorias = np.array(['Laptops', 'Monitores', 'Tablets', 'Smartphones', 'Accesorios'])
+    ciudades = np.array(['Bogotá', 'Medellín', 'Cali', 'Barranquilla', 'Cartagena', 'Ventas_Web'])
+    estados = np.array(['Entregado', 'Retrasado', 'Perdido', 'Devuelto', 'En Camino'])
+    cantidad = rng.integers(1, 20, filas)
+    precio = rng.lognormal(6, 1, filas).round(2)
+    return pd.DataFrame({
+        'Transaccion_ID': pd.array(np.char.add('TRX-', np.arange(filas).astype(str)), dtype='str'),
+        'SKU_ID': pd.array(np.char.add('PROD-', skus.astype(str)), dtype='str'),
+        'Fecha_Venta': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 500, filas), unit='D'),
+        'Cantidad_Vendida': cantidad,
+        'Revenue': cantidad * precio,
+        'Ganancia_Neta_Total': cantidad * precio * rng.random(filas),
+        'Margen_Real_Pct': rng.uniform(-100, 100, filas),
+        'Rating_Producto': rng.integers(1, 6, filas),
+        'Rating_Logistica': rng.integers(1, 6, filas),
+        'Rating_Servicio': rng.uniform(0, 5, filas),
+        'Satisfaccion_NPS': rng.integers(-100, 101, filas).astype(np.float64),
+        'Costo_Envio': rng.gamma(2, 10, filas),
+        'Tiempo_Entrega_Real': rng.integers(1, 30, filas).astype(np.float64),
+        'Stock_Actual': (skus * 7) % 1500,
+        'Categoria': pd.array(categorias[skus % len(categorias)], dtype='str'),
+        'Canal_Venta': pd.array(rng.choice(['Físico', 'Online', 'App'], filas), dtype='str'),
+        'Ciudad_Destino': pd.array(rng.choice(ciudades, filas), dtype='str'),
+        'Estado_Envio': pd.array(rng.choice(estados, filas), dtype='str'),
+    })
+
+
+def dashboard_original(df):
+    """Las agregaciones de la página tal como estaban: cada una recorre todas las filas."""
+    r = [df['Revenue'].sum(), df['Ganancia_Neta_Total'].sum(), df['Margen_Real_Pct'].mean(), df['Revenue'].mean()]
+    r.append(df.groupby('SKU_ID').agg({'Revenue': 'sum', 'Ganancia_Neta_Total': 'sum', 'Cantidad_Vendida': 'sum'}))
+    r.append(df.groupby('Ciudad_Destino')['Revenue'].sum())
+    r.append(df.groupby('Canal_Venta').agg({'Revenue': 'sum', 'Margen_Real_Pct': 'mean'}))
+    r.append(df.groupby('SKU_ID').agg({'Stock_Actual': 'first', 'Cantidad_Vendida': 'sum', 'Categoria': 'first'}))
+    r.append(df.groupby('Categoria').agg({'Revenue': 'sum', 'Ganancia_Neta_Total': 'sum', 'Cantidad_Vendida': 'sum', 'Rating_Producto': 'mean'}))
+    r.append(df.groupby('Categoria')['Margen_Real_Pct'].mean())
+    r.append(df['Canal_Venta'].value_counts())
+    r.append(df.groupby('Canal_Venta')['Revenue'].sum())
+    r.append(df.groupby('Canal_Venta')['Satisfaccion_NPS'].mean())
+    r.append(df.groupby('Canal_Venta')['Costo_Envio'].mean())
+    r.append(df.groupby('Canal_Venta')['Margen_Real_Pct'].mean())
+    r.append(df.groupby('Ciudad_Destino')['Revenue'].sum())
+    r.append(pd.crosstab(df['Ciudad_Destino'], df['Estado_Envio']))
+    r.append(pd.crosstab(df['Ciudad_Destino'], df['Categoria'], values=df['Revenue'], aggfunc='sum'))
+    r.append(df['Ciudad_Destino'].value_counts())
+    r.append(df.groupby('Ciudad_Destino')['Rating_Producto'].mean())
+    r.append(df[df['Estado_Envio'] == 'Entregado'].groupby('Ciudad_Destino').size() / df.groupby('Ciudad_Destino').size())
+    r.append(df.groupby(df['Fecha_Venta'].dt.date)['Revenue'].sum())
+    r.append(df.groupby(df['Fecha_Venta'].dt.date)['Ganancia_Neta_Total'].sum())
+    r.append(df['Estado_Envio'].value_counts())
+    r.append(df.groupby('Estado_Envio').agg({'Revenue': 'sum', 'Rating_Producto': 'mean', 'Transaccion_ID': 'count'}))
+    r.append(df.groupby(['Categoria', 'Ciudad_Destino'])['Revenue'].sum())
+    r.append(df.groupby(['Canal_Venta', 'Categoria'])['Revenue'].sum())
+    r.append(df.groupby('SKU_ID').agg({'Stock_Actual': 'first', 'Cantidad_Vendida': 'sum', 'Revenue': 'sum', 'Categoria': 'first'}))
+    r.append(df.groupby('Categoria').agg({'Cantidad_Vendida': 'sum', 'Stock_Actual': 'first'}))
+    r.append(pd.crosstab(df['Categoria'], df['Estado_Envio']))
+    for dimension in ['Canal_Venta', 'Categoria', 'Ciudad_Destino']:
+        r.append(df.groupby(dimension).agg(KPIS))
+    r.append(df.groupby('SKU_ID').agg({'Ganancia_Neta_Total': 'sum', 'Cantidad_Vendida': 'sum', 'Revenue': 'sum'}))
+    r.append(df.groupby('Categoria').agg({'Ganancia_Neta_Total': 'sum', 'Revenue': 'sum'}))
+    r.append(df.groupby('Categoria').agg({'Rating_Servicio': 'mean', 'Ganancia_Neta_Total': 'sum'}))
+    r.append(pd.crosstab(df['Categoria'], df['Canal_Venta'], values=df['Rating_Servicio'], aggfunc='mean'))
+    r.append(df.groupby('Canal_Venta').agg({'Ganancia_Neta_Total': ['sum', 'mean', 'count'], 'Rating_Servicio': 'mean', 'Margen_Real_Pct': 'mean'}))
+    r.append(df.groupby('SKU_ID').agg({'Ganancia_Neta_Total': 'sum', 'Rating_Servicio': 'mean', 'Cantidad_Vendida': 'sum', 'Categoria': 'first'}))
+    return r
+
+
+def dashboard_cubo(df):
+    """Las mismas consultas resueltas sobre el cubo."""
+    cubo = construir_cubo(df)
+    r = [total_cubo(cubo, 'Revenue'), total_cubo(cubo, 'Ganancia_Neta_Total'),
+         total_cubo(cubo, 'Margen_Real_Pct', 'mean'), total_cubo(cubo, 'Revenue', 'mean')]
+    r.append(consultar_cubo(cubo, ['SKU_ID'], {'Revenue': 'sum', 'Ganancia_Neta_Total': 'sum', 'Cantidad_Vendida': 'sum'}))
+    r.append(consultar_cubo(cubo, ['Ciudad_Destino'], {'Revenue': 'sum'}))
+    r.append(consultar_cubo(cubo, ['Canal_Venta'], {'Revenue': 'sum', 'Margen_Real_Pct': 'mean'}))
+    r.append(consultar_cubo(cubo, ['SKU_ID'], {'Stock_Actual': 'first', 'Cantidad_Vendida': 'sum', 'Categoria': 'first'}))
+    r.append(consultar_cubo(cubo, ['Categoria'], {'Revenue': 'sum', 'Ganancia_Neta_Total': 'sum', 'Cantidad_Vendida': 'sum', 'Rating_Producto': 'mean'}))
+    r.append(consultar_cubo(cubo, ['Categoria'], {'Margen_Real_Pct': 'mean'}))
+    r.append(conteos(cubo, 'Canal_Venta'))
+    r.append(consultar_cubo(cubo, ['Canal_Venta'], {'Revenue': 'sum'}))
+    r.append(consultar_cubo(cubo, ['Canal_Venta'], {'Satisfaccion_NPS': 'mean'}))
+    r.append(consultar_cubo(cubo, ['Canal_Venta'], {'Costo_Envio': 'mean'}))
+    r.append(consultar_cubo(cubo, ['Canal_Venta'], {'Margen_Real_Pct': 'mean'}))
+    r.append(consultar_cubo(cubo, ['Ciudad_Destino'], {'Revenue': 'sum'}))
+    r.append(tabla_cruzada(cubo, 'Ciudad_Destino', 'Estado_Envio'))
+    r.append(tabla_cruzada(cubo, 'Ciudad_Destino', 'Categoria', 'Revenue', 'sum'))
+    r.append(conteos(cubo, 'Ciudad_Destino'))
+    r.append(consultar_cubo(cubo, ['Ciudad_Destino'], {'Rating_Producto': 'mean'}))
+    r.append(tabla_cruzada(cubo, 'Ciudad_Destino', 'Estado_Envio')['Entregado'] / conteos(cubo, 'Ciudad_Destino'))
+    r.append(consultar_cubo(cubo, ['Fecha_Venta'], {'Revenue': 'sum'}))
+    r.append(consultar_cubo(cubo, ['Fecha_Venta'], {'Ganancia_Neta_Total': 'sum'}))
+    r.append(conteos(cubo, 'Estado_Envio'))
+    r.append(consultar_cubo(cubo, ['Estado_Envio'], {'Revenue': 'sum', 'Rating_Producto': 'mean', 'Transaccion_ID': 'size'}))
+    r.append(consultar_cubo(cubo, ['Categoria', 'Ciudad_Destino'], {'Revenue': 'sum'}))
+    r.append(consultar_cubo(cubo, ['Canal_Venta', 'Categoria'], {'Revenue': 'sum'}))
+    r.append(consultar_cubo(cubo, ['SKU_ID'], {'Stock_Actual': 'first', 'Cantidad_Vendida': 'sum', 'Revenue': 'sum', 'Categoria': 'first'}))
+    r.append(consultar_cubo(cubo, ['Categoria'], {'Cantidad_Vendida': 'sum', 'Stock_Actual': 'first'}))
+    r.append(tabla_cruzada(cubo, 'Categoria', 'Estado_Envio'))
+    for dimension in ['Canal_Venta', 'Categoria', 'Ciudad_Destino']:
+        r.append(consultar_cubo(cubo, [dimension], KPIS))
+    r.append(consultar_cubo(cubo, ['SKU_ID'], {'Ganancia_Neta_Total': 'sum', 'Cantidad_Vendida': 'sum', 'Revenue': 'sum'}))
+    r.append(consultar_cubo(cubo, ['Categoria'], {'Ganancia_Neta_Total': 'sum', 'Revenue': 'sum'}))
+    r.append(consultar_cubo(cubo, ['Categoria'], {'Rating_Servicio': 'mean', 'Ganancia_Neta_Total': 'sum'}))
+    r.append(tabla_cruzada(cubo, 'Categoria', 'Canal_Venta', 'Rating_Servicio', 'mean'))
+    r.append(consultar_cubo(cubo, ['Canal_Venta'], {'Ganancia_Neta_Total': ['sum', 'mean', 'count'], 'Rating_Servicio': 'mean', 'Margen_Real_Pct': 'mean'}))
+    r.append(consultar_cubo(cubo, ['SKU_ID'], {'Ganancia_Neta_Total': 'sum', 'Rating_Servicio': 'mean', 'Cantidad_Vendida': 'sum', 'Categoria': 'first'}))
+    return r
+
+
+def medir(funcion, df, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(df)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    filas = [int(sys.argv[1])] if len(sys.argv) > 1 else [100_000, 1_000_000, 3_000_000]
+    print("📊 Dashboard de Merge - agregaciones por separado vs cubo de agregados\n")
+    print(f"{'filas':>12} | {'consultas':>9} | {'original (s)':>12} | {'cubo (s)':>10} | {'speedup':>8}")
+    print("-" * 64)
+    for n in filas:
+        df = generar_dashboard(n)
+        t_original = medir(dashboard_original, df)
+        t_cubo = medir(dashboard_cubo, df)
+        print(f"{n:>12,} | {len(dashboard_original(df)):>9} | {t_original:>12.3f} | {t_cubo:>10.3f} | {t_original / t_cubo:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import numpy as np
 import pandas as pd
 
+from utils.schemas import transformar_valores
+from utils.tracing import anotar_traza
+
 # Función para manejar outliers en Rating_Producto
-def manejar_outliers_rating_producto(df, medida='Mediana'):
+def manejar_outliers_rating_producto(df, medida='Mediana', inplace=False):
     """
     Detecta y reemplaza outliers en la columna Rating_Producto.
     
@@ -12,14 +15,16 @@ def manejar_outliers_rating_producto(df, medida='Mediana'):
         Dataframe que contiene la columna Rating_Producto
     medida : str
         Medida para reemplazar outliers: 'Moda', 'Mediana' o 'Media'
+    inplace : bool
+        Si es True se modifica df en lugar de una copia
         
     Retorna:
     --------
     DataFrame : Dataframe con outliers reemplazados
     """
     
-    df_copy = df.copy()
-    df_copy['Ticket_Soporte_Abierto'] = df_copy['Ticket_Soporte_Abierto'].replace({"1": "Sí", "0": "No"})
+    df_copy = df if inplace else df.copy()
+    df_copy['Ticket_Soporte_Abierto'] = transformar_valores(df_copy['Ticket_Soporte_Abierto'], lambda valores: valores.replace({"1": "Sí", "0": "No"}))
     columna = 'Rating_Producto'
     
     # Detectar outliers usando IQR
@@ -50,16 +55,18 @@ def manejar_outliers_rating_producto(df, medida='Mediana'):
     # Reemplazar outliers
     df_copy.loc[outliers_mask, columna] = valor_reemplazo
     
-    print(f"Outliers detectados: {num_outliers}")
-    print(f"Límite inferior: {limite_inferior:.2f}")
-    print(f"Límite superior: {limite_superior:.2f}")
-    print(f"Valor de reemplazo ({medida}): {valor_reemplazo:.2f}")
-    print(f"Outliers reemplazados exitosamente")
+    # El detalle queda en la traza del paso (utils.tracing)
+    anotar_traza(
+        outliers=int(num_outliers),
+        limite_inferior=float(limite_inferior),
+        limite_superior=float(limite_superior),
+        valor_reemplazo=float(valor_reemplazo),
+    )
     
     return df_copy
 
 # Función para manejar outliers en Rating_Producto
-def manejar_outliers_edad_cliente(df, medida='Mediana'):
+def manejar_outliers_edad_cliente(df, medida='Mediana', inplace=False):
     """
     Detecta y reemplaza outliers en la columna Edad_Cliente.
     
@@ -69,13 +76,15 @@ def manejar_outliers_edad_cliente(df, medida='Mediana'):
         Dataframe que contiene la columna Edad_Cliente
     medida : str
         Medida para reemplazar outliers: 'Moda', 'Mediana' o 'Media'
+    inplace : bool
+        Si es True se modifica df en lugar de una copia
         
     Retorna:
     --------
     DataFrame : Dataframe con outliers reemplazados
     """
     
-    df_copy = df.copy()
+    df_copy = df if inplace else df.copy()
     columna = 'Edad_Cliente'
     
     # Detectar outliers usando IQR
@@ -106,25 +115,31 @@ def manejar_outliers_edad_cliente(df, medida='Mediana'):
     # Reemplazar outliers
     df_copy.loc[outliers_mask, columna] = valor_reemplazo
     
-    print(f"Outliers detectados: {num_outliers}")
-    print(f"Límite inferior: {limite_inferior:.2f}")
-    print(f"Límite superior: {limite_superior:.2f}")
-    print(f"Valor de reemplazo ({medida}): {valor_reemplazo:.2f}")
-    print(f"Outliers reemplazados exitosamente")
+    # El detalle queda en la traza del paso (utils.tracing)
+    anotar_traza(
+        outliers=int(num_outliers),
+        limite_inferior=float(limite_inferior),
+        limite_superior=float(limite_superior),
+        valor_reemplazo=float(valor_reemplazo),
+    )
     
     return df_copy
 
-def imputar_valores_comentario_texto(df):
+def imputar_valores_comentario_texto(df, inplace=False):
     """
     Imputa valores faltantes en Comentario_Texto con un valor específico.
     """
-    df.loc[df['Comentario_Texto'] == "---", 'Comentario_Texto'] = np.nan
+    if not inplace:
+        df = df.copy()
+    df['Comentario_Texto'] = transformar_valores(df['Comentario_Texto'], lambda valores: valores.replace({"---": np.nan}))
     df['Comentario_Texto'] = df['Comentario_Texto'].fillna(df['Comentario_Texto'].mode()[0])
     return df
 
-def imputar_valores_recomienda_marca(df):
+def imputar_valores_recomienda_marca(df, inplace=False):
     """
     Imputa valores faltantes en Recomienda_Marca con la moda.
     """
+    if not inplace:
+        df = df.copy()
     df['Recomienda_Marca'] = df['Recomienda_Marca'].fillna(df['Recomienda_Marca'].mode()[0])
     return df
\ No newline at end of file
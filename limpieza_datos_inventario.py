@@ -1,7 +1,11 @@
 import pandas as pd
 import numpy as np
 
-def imputar_valores_columna_stock_actual(df,remplazo):
+from utils.schemas import transformar_valores
+
+def imputar_valores_columna_stock_actual(df,remplazo, inplace=False):
+    if not inplace:
+        df = df.copy()
     if remplazo == 'media':
         valor_reemplazo = df['Stock_Actual'].mean()
     elif remplazo == 'mediana':
@@ -15,7 +19,9 @@ def imputar_valores_columna_stock_actual(df,remplazo):
     df['Stock_Actual'] = df['Stock_Actual'].abs()
     return df
 
-def imputar_valores_columna_lead_time_dias(df):
+def imputar_valores_columna_lead_time_dias(df, inplace=False):
+    if not inplace:
+        df = df.copy()
     df['Lead_Time_Dias'] = df['Lead_Time_Dias'].replace({
         '25-30 dias': 27,
         '25-30 días': 27,
@@ -27,55 +33,105 @@ def imputar_valores_columna_lead_time_dias(df):
     df['Lead_Time_Dias'] = df['Lead_Time_Dias'].fillna(df['Lead_Time_Dias'].median()).astype(int)
 
     return df
-def corregir_tipos_datos_punto_reorden(df):
+def corregir_tipos_datos_punto_reorden(df, inplace=False):
+    if not inplace:
+        df = df.copy()
     df['Punto_Reorden'] = pd.to_numeric(df['Punto_Reorden'], errors='coerce')
     df['Punto_Reorden'] = df['Punto_Reorden'].fillna(df['Punto_Reorden'].median()).astype(int)
     df['Punto_Reorden'] = df['Punto_Reorden'].abs()
     return df
-def corregir_nombres_bodega_origen(df):
-    df['Bodega_Origen'] = df['Bodega_Origen'].str.upper().str.strip()
+def corregir_nombres_bodega_origen(df, inplace=False):
+    if not inplace:
+        df = df.copy()
+    df['Bodega_Origen'] = transformar_valores(df['Bodega_Origen'], lambda valores: valores.str.upper().str.strip())
     return df
 
 
-def limpiar_atipicos_costo_unitario(df,remplazo):
-    categorias_unicas = df['Categoria'].unique()
+def _moda_por_grupo(df, grupo, columna):
+    """
+    Calcula la moda de `columna` para cada valor de `grupo` en una sola pasada.
+    En caso de empate se toma el menor valor, igual que Series.mode()[0].
+    """
+    conteos = df.groupby([grupo, columna], observed=True).size().reset_index(name='_conteo')
+    conteos = conteos.sort_values(['_conteo', columna], ascending=[False, True], kind='mergesort')
+    return conteos.drop_duplicates(grupo).set_index(grupo)[columna]
+
+
+def _medidas_costo_por_categoria(df, remplazo):
+    """Calcula la moda, mediana o media de Costo_Unitario_USD por categoría con un groupby."""
+    if remplazo == 'moda':
+        return _moda_por_grupo(df, 'Categoria', 'Costo_Unitario_USD')
+    grupos = df.groupby('Categoria', sort=False, observed=True)['Costo_Unitario_USD']
+    if remplazo == 'mediana':
+        return grupos.median()
+    return grupos.mean()
+
+
+def limpiar_atipicos_costo_unitario(df,remplazo, inplace=False):
+    """
+    Reemplaza los costos unitarios fuera de [LIMITE_INFERIOR, LIMITE_SUPERIOR] por la
+    medida de su categoría ('moda', 'mediana' o 'media').
+
+    La medida de todas las categorías se calcula en una sola pasada agrupada y el
+    reemplazo se aplica con un único where sobre la columna.
+    """
+    if not inplace:
+        df = df.copy()
     LIMITE_SUPERIOR = 10000 # Estos limites fueron seleccionados de forma manual, por lo que no se sigue ningun patron exacto de manejo de datos atipicos
     LIMITE_INFERIOR = 30
-    medidas_catg = {}
-    for categoria_unica in categorias_unicas:
-        moda = df[df['Categoria'] == categoria_unica]['Costo_Unitario_USD'].mode()[0]
-        mediana = df[df['Categoria'] == categoria_unica]['Costo_Unitario_USD'].median()
-        promedio = df[df['Categoria'] == categoria_unica]['Costo_Unitario_USD'].mean()
-        medidas_catg[categoria_unica] = {'moda': moda, 'mediana': mediana, 'media': promedio}
-
-    for categoria_unica in categorias_unicas:
-        # Identificamos valores que superan el límite superior
-        mask_outliers_altos = (df['Categoria'] == categoria_unica) & (df['Costo_Unitario_USD'] > LIMITE_SUPERIOR)
-        num_outliers_altos = mask_outliers_altos.sum()
-
-        # Identificamos valores que están por debajo del límite inferior
-        mask_outliers_bajos = (df['Categoria'] == categoria_unica) & (df['Costo_Unitario_USD'] < LIMITE_INFERIOR)
-        num_outliers_bajos = mask_outliers_bajos.sum()
-
-        # Obtenemos la moda de la categoría
-        if remplazo == 'moda':
-            valor_remplazo = medidas_catg[categoria_unica]['moda']
-        elif remplazo == "mediana":
-            valor_remplazo = medidas_catg[categoria_unica]['mediana']
-        elif remplazo == "media":
-            valor_remplazo = medidas_catg[categoria_unica]['media']
-        else:
-            raise ValueError("El parámetro 'remplazo' debe ser 'media', 'mediana' o 'moda'.")
-
-        if num_outliers_altos > 0:
-            # Reemplazamos valores altos con la moda
-            df.loc[mask_outliers_altos, 'Costo_Unitario_USD'] = valor_remplazo
-        if num_outliers_bajos > 0:
-            # Reemplazamos valores bajos con la moda
-            df.loc[mask_outliers_bajos, 'Costo_Unitario_USD'] = valor_remplazo
+    if remplazo not in ['moda', 'mediana', 'media']:
+        raise ValueError("El parámetro 'remplazo' debe ser 'media', 'mediana' o 'moda'.")
+
+    # Medida de reemplazo de cada fila según su categoría
+    medidas_catg = _medidas_costo_por_categoria(df, remplazo)
+    valor_remplazo = df['Categoria'].map(medidas_catg).astype(np.float64)
+
+    # Identificamos valores por encima del límite superior o por debajo del inferior
+    costo = df['Costo_Unitario_USD']
+    mask_outliers = ((costo > LIMITE_SUPERIOR) | (costo < LIMITE_INFERIOR)) & df['Categoria'].notna()
+
+    df['Costo_Unitario_USD'] = costo.where(~mask_outliers, valor_remplazo)
     return df
 
-def imputar_valores_columna_categoria(df, remplazo):
+
+def _categoria_mas_cercana(medidas, costos):
+    """
+    Asigna a cada costo la posición (en el orden de `medidas`) de la categoría cuya
+    medida está más cercana, usando searchsorted sobre las medidas ordenadas.
+
+    Replica el desempate de min() sobre el diccionario original: ante distancias
+    iguales gana la categoría que aparece primero, un costo NaN toma la primera
+    categoría y una medida NaN nunca gana salvo que sea la primera.
+    """
+    rangos = np.zeros(len(costos), dtype=np.intp)
+    if np.isnan(medidas[0]):
+        return rangos
+
+    posiciones = np.arange(len(medidas))
+    validas = ~np.isnan(medidas)
+    valores, posiciones = medidas[validas], posiciones[validas]
+
+    # Ordenamos por medida y, ante medidas repetidas, nos quedamos con la primera categoría
+    orden = np.lexsort((posiciones, valores))
+    valores, posiciones = valores[orden], posiciones[orden]
+    primeras = np.r_[True, valores[1:] != valores[:-1]]
+    valores, posiciones = valores[primeras], posiciones[primeras]
+
+    # La medida más cercana es la vecina izquierda o derecha del punto de inserción
+    insercion = np.searchsorted(valores, costos)
+    izquierda = np.clip(insercion - 1, 0, len(valores) - 1)
+    derecha = np.clip(insercion, 0, len(valores) - 1)
+    dist_izquierda = np.abs(valores[izquierda] - costos)
+    dist_derecha = np.abs(valores[derecha] - costos)
+    usar_derecha = (dist_derecha < dist_izquierda) | (
+        (dist_derecha == dist_izquierda) & (posiciones[derecha] < posiciones[izquierda])
+    )
+    rangos = np.where(usar_derecha, posiciones[derecha], posiciones[izquierda])
+    rangos[np.isnan(costos)] = 0
+    return rangos
+
+
+def imputar_valores_columna_categoria(df, remplazo, inplace=False):
     """
     Reemplaza valores '???' en la columna Categoria basándose en la medida estadística
     más cercana del costo_unitario.
@@ -83,48 +139,44 @@ def imputar_valores_columna_categoria(df, remplazo):
     Args:
         df: DataFrame con los datos
         remplazo: 'Moda', 'Mediana' o 'Promedio' - medida a usar para la comparación
+        inplace: si es True se modifica df en lugar de una copia
     
     Returns:
         DataFrame con categorías imputadas
     """
-    df['Categoria'] = df['Categoria'].replace({'LAPTOP':'Laptops',
+    if not inplace:
+        df = df.copy()
+    df['Categoria'] = transformar_valores(df['Categoria'], lambda valores: valores.replace({'LAPTOP':'Laptops',
                                        'smart-phone':'Smartphones',
-                                       '???': np.nan})
+                                       '???': np.nan}))
     if remplazo not in ['moda', 'mediana', 'media']:
         raise ValueError("El parámetro 'remplazo' debe ser 'moda', 'mediana' o 'media'.")
-    df['Categoria'] = df['Categoria'].astype(str)   
-    # Obtenemos categorías únicas excluyendo NaN y 'nan'
-    categorias_unicas = df['Categoria'].unique()
-    categorias_validas = [cat for cat in categorias_unicas if cat not in ['nan', np.nan]]
-    
-    # Calculamos las medidas estadísticas para cada categoría válida
-    medidas_por_categoria = {}
-    
-    for cat in categorias_validas:
-        datos_cat = df[df['Categoria'] == cat]['Costo_Unitario_USD']
-        if remplazo == 'moda':
-            medida = datos_cat.mode()[0]
-        elif remplazo == 'mediana':
-            medida = datos_cat.median()
-        else:  # media
-            medida = datos_cat.mean()
-        medidas_por_categoria[cat] = medida
-    
-    # Identificamos filas con categoria "???" o 'nan' (string después de astype)
-    mask_desconocidos = (df['Categoria'] == 'nan')
-    # Reemplazamos cada "???" con la categoría cuya medida esté más cercana
-    for idx in df[mask_desconocidos].index:
-        costo_valor = df.loc[idx, 'Costo_Unitario_USD']
-        
-        # Encontramos la categoría con la medida más cercana
-        categoria_asignada = min(medidas_por_categoria.keys(), 
-                                key=lambda cat: abs(medidas_por_categoria[cat] - costo_valor))
-        # Reemplazamos la categoría
-        df.loc[idx, 'Categoria'] = categoria_asignada
+    if not isinstance(df['Categoria'].dtype, pd.CategoricalDtype):
+        # Una columna categórica conserva sus nulos como NaN; en texto pasan a 'nan'
+        df['Categoria'] = df['Categoria'].astype(str)
+    # Identificamos filas con categoria "???" (NaN, o 'nan' como string después de astype)
+    mask_desconocidos = df['Categoria'].isna() | (df['Categoria'] == 'nan')
+    if not mask_desconocidos.any():
+        return df
+
+    # Calculamos las medidas estadísticas de todas las categorías válidas en una sola pasada,
+    # conservando el orden de aparición de las categorías
+    conocidos = df.loc[~mask_desconocidos, ['Categoria', 'Costo_Unitario_USD']]
+    categorias_validas = conocidos['Categoria'].unique()
+    if len(categorias_validas) == 0:
+        raise ValueError("No hay categorías válidas para imputar los valores desconocidos.")
+    medidas = _medidas_costo_por_categoria(conocidos, remplazo).reindex(categorias_validas)
+
+    # Reemplazamos todos los "???" con la categoría cuya medida esté más cercana
+    costos = df.loc[mask_desconocidos, 'Costo_Unitario_USD'].to_numpy(dtype=float)
+    rangos = _categoria_mas_cercana(medidas.to_numpy(dtype=float), costos)
+    df.loc[mask_desconocidos, 'Categoria'] = np.asarray(categorias_validas, dtype=object)[rangos]
     
     return df
 
-def limpiezar_fecha_ultima_revision(df):
+def limpiezar_fecha_ultima_revision(df, inplace=False):
+    if not inplace:
+        df = df.copy()
     df['Ultima_Revision'] = pd.to_datetime(df['Ultima_Revision'], errors='coerce')
     fecha_minima = df['Ultima_Revision'].min()
     df['Ultima_Revision'] = df['Ultima_Revision'].fillna(fecha_minima)
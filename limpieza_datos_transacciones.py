@@ -1,88 +1,120 @@
 import pandas as pd
 import numpy as np
 
-def corregir_nombres_ciudad_destino(df):
-    df['Ciudad_Destino'] = df['Ciudad_Destino'].replace({
+from utils.schemas import transformar_valores
+
+def corregir_nombres_ciudad_destino(df, inplace=False):
+    if not inplace:
+        df = df.copy()
+    # En una columna categórica el reemplazo se hace sobre las categorías, no fila por fila
+    df['Ciudad_Destino'] = transformar_valores(df['Ciudad_Destino'], lambda valores: valores.replace({
         'BOG': 'Bogotá',
-        'MED': 'Medellín'})
+        'MED': 'Medellín'}))
     return df   
 
-def corregir_canal_venta(df):
-    df['Canal_Venta'] = df['Canal_Venta'].replace({ # Consideramos que es importante manteneer App como un canal dee venta debido a que nos puede dar informacion relevante con el uso de la aplicacion y la necesidad de mantenerla.
+def corregir_canal_venta(df, inplace=False):
+    if not inplace:
+        df = df.copy()
+    df['Canal_Venta'] = transformar_valores(df['Canal_Venta'], lambda valores: valores.replace({ # Consideramos que es importante manteneer App como un canal dee venta debido a que nos puede dar informacion relevante con el uso de la aplicacion y la necesidad de mantenerla.
         'WhatsApp': 'Online'
-    })
+    }))
     return df
 
-def corregir_valores_negativos_cantidad_vendida(df):
+def corregir_valores_negativos_cantidad_vendida(df, inplace=False):
+    if not inplace:
+        df = df.copy()
     df['Cantidad_Vendida'] = df['Cantidad_Vendida'].abs() # Encontramos valores negativos en cantidad vendida, los cuales no tienen sentido en este contexto, por lo que tomamos su valor absoluto.
     return df
 
 
-def reemplazar_outliers_tiempo_entrega_real(df, metodo):
+def calcular_limites_outliers_tiempo_entrega(Q1, Q3):
     """
-    Reemplaza outliers en Tiempo_Entrega_Real usando el método IQR.
-    
-    Parámetros:
-    - df: DataFrame a procesar (se modifica directamente)
-    - metodo: 'limite', 'media', 'mediana', 'moda'
+    Calcula los límites IQR de Tiempo_Entrega_Real a partir de sus cuartiles.
+    Retorna (limite_inferior, limite_superior); el inferior nunca es negativo.
     """
-    Q1 = df['Tiempo_Entrega_Real'].quantile(0.25)
-    Q3 = df['Tiempo_Entrega_Real'].quantile(0.75)
     IQR = Q3 - Q1
     limite_inferior = Q1 - 1.5 * IQR
     limite_superior = Q3 + 1.5 * IQR
     
     # No puede haber tiempos negativos
     limite_inferior = max(limite_inferior, 0)
+    return limite_inferior, limite_superior
+
+
+def reemplazar_outliers_tiempo_entrega_real(df, metodo, limites=None, valor_reemplazo=None, inplace=False):
+    """
+    Reemplaza outliers en Tiempo_Entrega_Real usando el método IQR.
+    
+    Parámetros:
+    - df: DataFrame a procesar (se modifica directamente solo con inplace=True)
+    - metodo: 'limite', 'media', 'mediana', 'moda'
+    - limites: (limite_inferior, limite_superior) ya calculados; si es None se calculan con df
+    - valor_reemplazo: valor ya calculado para los outliers; si es None se calcula con df
+      (los dos últimos permiten limpiar un archivo por bloques con estadísticas globales)
+    """
+    if not inplace:
+        df = df.copy()
+    if limites is None:
+        limites = calcular_limites_outliers_tiempo_entrega(
+            df['Tiempo_Entrega_Real'].quantile(0.25), df['Tiempo_Entrega_Real'].quantile(0.75)
+        )
+    limite_inferior, limite_superior = limites
     
     mascara_outliers = (df['Tiempo_Entrega_Real'] < limite_inferior) | (df['Tiempo_Entrega_Real'] > limite_superior)
     
     # Aplicar el método de reemplazo
     if metodo == 'Limite':
         df['Tiempo_Entrega_Real'] = df['Tiempo_Entrega_Real'].clip(lower=limite_inferior, upper=limite_superior)
-    elif metodo == 'Media':
-        valor_reemplazo = df['Tiempo_Entrega_Real'][~mascara_outliers].mean()
-        df.loc[mascara_outliers, 'Tiempo_Entrega_Real'] = valor_reemplazo
-    elif metodo == 'Mediana':
-        valor_reemplazo = df['Tiempo_Entrega_Real'][~mascara_outliers].median()
-        df.loc[mascara_outliers, 'Tiempo_Entrega_Real'] = valor_reemplazo
-    elif metodo == 'Moda':
-        valor_reemplazo = df['Tiempo_Entrega_Real'][~mascara_outliers].mode()[0]
-        df.loc[mascara_outliers, 'Tiempo_Entrega_Real'] = valor_reemplazo
-    else:
+        return df
+    if valor_reemplazo is None:
+        if metodo == 'Media':
+            valor_reemplazo = df['Tiempo_Entrega_Real'][~mascara_outliers].mean()
+        elif metodo == 'Mediana':
+            valor_reemplazo = df['Tiempo_Entrega_Real'][~mascara_outliers].median()
+        elif metodo == 'Moda':
+            valor_reemplazo = df['Tiempo_Entrega_Real'][~mascara_outliers].mode()[0]
+        else:
+            raise ValueError("El parámetro 'remplazo' debe ser 'media', 'mediana' o 'moda'.")
+    elif metodo not in ['Media', 'Mediana', 'Moda']:
         raise ValueError("El parámetro 'remplazo' debe ser 'media', 'mediana' o 'moda'.")
+    df.loc[mascara_outliers, 'Tiempo_Entrega_Real'] = valor_reemplazo
     
     return df
 
-def imputar_costo_envio(df, remplzar_por='Mediana'):
+def imputar_costo_envio(df, remplzar_por='Mediana', valor=None, inplace=False):
     """
     Imputa valores faltantes en Costo_Envio con la media.
+    Si se pasa `valor` (calculado sobre todo el archivo) se usa en lugar de calcularlo con df.
     """
-    if remplzar_por == 'Mediana':
-        mediana_costo_envio = df['Costo_Envio'].median()
-        df['Costo_Envio'] = df['Costo_Envio'].fillna(mediana_costo_envio)
-    elif remplzar_por == 'Media':
-        media_costo_envio = df['Costo_Envio'].mean()
-        df['Costo_Envio'] = df['Costo_Envio'].fillna(media_costo_envio)
-    elif remplzar_por == 'Moda':
-        moda_costo_envio = df['Costo_Envio'].mode()[0]
-        df['Costo_Envio'] = df['Costo_Envio'].fillna(moda_costo_envio)
-    else:
+    if not inplace:
+        df = df.copy()
+    if remplzar_por not in ['Mediana', 'Media', 'Moda']:
         raise ValueError("El parámetro 'remplazo' debe ser 'media', 'mediana' o 'moda'.")
+    if valor is None:
+        if remplzar_por == 'Mediana':
+            valor = df['Costo_Envio'].median()
+        elif remplzar_por == 'Media':
+            valor = df['Costo_Envio'].mean()
+        else:
+            valor = df['Costo_Envio'].mode()[0]
+    df['Costo_Envio'] = df['Costo_Envio'].fillna(valor)
     return df
 
-def imputar_estado_envio(df, remplazo):
+def imputar_estado_envio(df, remplazo, valor=None, inplace=False):
     """
     Imputa valores faltantes en Estado_Envio con la moda.
     
     Parámetros:
-    - df: DataFrame a procesar (se modifica directamente)
+    - df: DataFrame a procesar (se modifica directamente solo con inplace=True)
+    - valor: moda ya calculada sobre todo el archivo; si es None se calcula con df
     
     Nota: Se usa la moda porque el análisis mostró que no hay relación
     entre Tiempo_Entrega_Real y Estado_Envio.
     """
+    if not inplace:
+        df = df.copy()
     if remplazo == 'Moda':
-        moda_estado_envio = df['Estado_Envio'].mode()[0]
+        moda_estado_envio = df['Estado_Envio'].mode()[0] if valor is None else valor
         df['Estado_Envio'] = df['Estado_Envio'].fillna(moda_estado_envio)
     elif  remplazo == 'Mediana':
         mediana_estado_envio= df['Estado_Envio'].median()[0]
@@ -94,4 +126,4 @@ def imputar_estado_envio(df, remplazo):
         raise ValueError("El parámetro 'remplazo' debe ser 'media', 'mediana' o 'moda'.")
         
     
-    return df
\ No newline at end of file
+    return df
@@ -3,7 +3,7 @@ import io
 from utils.session_init import init_session_state
 
 # Inicializar session state
-init_session_state()
+init_session_state("Inicio")
 
 # Configuración de la página
 st.set_page_config(
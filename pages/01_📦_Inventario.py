@@ -2,12 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.data_loader import display_dataframe_info, load_csv_file
+from utils.cache import clave_cache
+from utils.data_loader import display_dataframe_info, load_csv_file, load_clean_csv_file, mostrar_errores_limpieza
 from utils.session_init import init_session_state
-from utils.data_cleaning import limpiar_inventario, generar_audit_summary, calcular_health_score, contar_valores_invalidos
+from utils.tracing import iniciar_traza, terminar_traza
+from utils.report_service import generar_reporte_stream
+from utils.report_prompts import prompt_inventario
+from utils.data_cleaning import limpiar_inventario, generar_audit_summary, calcular_health_score_detallado
 
 # Inicializar session state
-init_session_state()
+init_session_state("Inventario")
 
 st.set_page_config(
     page_title="Inventario",
@@ -33,8 +37,8 @@ if st.session_state.get('inventario_file') is not None:
                 # Health Score antes de limpieza
                 st.markdown("### 📊 Métricas de Calidad - ANTES de Limpieza")
                 col1, col2, col3, col4, col5 = st.columns(5)
-                health_score_antes = calcular_health_score(df)
-                valores_invalidos_antes = contar_valores_invalidos(df)
+                detalle_antes = calcular_health_score_detallado(df, clave_cache(st.session_state.inventario_file, 'csv'))
+                health_score_antes = detalle_antes['score']
                 
                 with col1:
                     st.metric("Health Score", f"{health_score_antes:.1f}/100")
@@ -43,9 +47,9 @@ if st.session_state.get('inventario_file') is not None:
                 with col3:
                     st.metric("Columnas", len(df.columns))
                 with col4:
-                    st.metric("Valores Nulos", int(df.isna().sum().sum()))
+                    st.metric("Valores Nulos", detalle_antes['nulos'])
                 with col5:
-                    st.metric("❌ Valores Inválidos", valores_invalidos_antes)
+                    st.metric("❌ Valores Inválidos", detalle_antes['negativos'])
                 
                 st.markdown("---")
                 display_dataframe_info(df)
@@ -75,13 +79,14 @@ if st.session_state.get('inventario_file') is not None:
                 st.subheader("Datos Limpiados")
                 try:
                     
-                    df_limpio = limpiar_inventario(df)
+                    df_limpio = load_clean_csv_file(st.session_state.inventario_file, limpiar_inventario)
+                    mostrar_errores_limpieza(df_limpio)
                     
                     # Health Score después de limpieza
                     st.markdown("### 📊 Métricas de Calidad - DESPUÉS de Limpieza")
                     col1, col2, col3, col4, col5 = st.columns(5)
-                    health_score_despues = calcular_health_score(df_limpio)
-                    valores_invalidos_despues = contar_valores_invalidos(df_limpio)
+                    detalle_despues = calcular_health_score_detallado(df_limpio, clave_cache(st.session_state.inventario_file, 'limpiar_inventario'))
+                    health_score_despues = detalle_despues['score']
                     with col1:
                         st.metric("Health Score", f"{health_score_despues:.1f}/100")
                     with col2:
@@ -89,15 +94,15 @@ if st.session_state.get('inventario_file') is not None:
                     with col3:
                         st.metric("Columnas", len(df_limpio.columns))
                     with col4:
-                        st.metric("Valores Nulos", int(df_limpio.isna().sum().sum()))
+                        st.metric("Valores Nulos", detalle_despues['nulos'])
                     with col5:
-                        st.metric("❌ Valores Inválidos", valores_invalidos_despues)
+                        st.metric("❌ Valores Inválidos", detalle_despues['negativos'])
                     
                     st.markdown("---")
                     
                     # Comparación antes y después
                     st.markdown("### 📈 Comparación ANTES vs DESPUÉS")
-                    audit = generar_audit_summary(df, df_limpio, "Inventario")
+                    audit = generar_audit_summary(df, df_limpio, "Inventario", detalle_antes, detalle_despues)
                     
                     col1, col2, col3, col4, col5 = st.columns(5)
                     with col1:
@@ -120,6 +125,7 @@ if st.session_state.get('inventario_file') is not None:
                     
                     st.markdown("---")
                     
+                    span_graficos = iniciar_traza('graficos')
                     # ========== GRÁFICAS DE ANÁLISIS ==========
                     st.markdown("### 📊 Análisis de Inventario - Gráficas")
                     
@@ -154,7 +160,7 @@ if st.session_state.get('inventario_file') is not None:
                     # Gráfica 2: Costo promedio por categoría
                     with col2:
                         st.markdown("#### 💰 Costo Promedio (USD) por Categoría")
-                        costo_categoria = df_limpio.groupby('Categoria')['Costo_Unitario_USD'].mean().reset_index()
+                        costo_categoria = df_limpio.groupby('Categoria', observed=True)['Costo_Unitario_USD'].mean().reset_index()
                         costo_categoria.columns = ['Categoria', 'Costo_Promedio']
                         costo_categoria = costo_categoria.sort_values('Costo_Promedio', ascending=False)
                         
@@ -182,7 +188,7 @@ if st.session_state.get('inventario_file') is not None:
                     # Gráfica 3: Distribución de bodegas por categoría
                     with col3:
                         st.markdown("#### 🏭 Distribución de Bodegas por Categoría")
-                        bodega_categoria = df_limpio.groupby('Categoria')['Bodega_Origen'].nunique().reset_index()
+                        bodega_categoria = df_limpio.groupby('Categoria', observed=True)['Bodega_Origen'].nunique().reset_index()
                         bodega_categoria.columns = ['Categoria', 'Cantidad_Bodegas']
                         
                         fig_bodega = px.bar(
@@ -207,7 +213,7 @@ if st.session_state.get('inventario_file') is not None:
                     # Gráfica 4: Stock actual total por categoría
                     with col4:
                         st.markdown("#### 📈 Stock Actual Total por Categoría")
-                        stock_categoria = df_limpio.groupby('Categoria')['Stock_Actual'].sum().reset_index()
+                        stock_categoria = df_limpio.groupby('Categoria', observed=True)['Stock_Actual'].sum().reset_index()
                         stock_categoria.columns = ['Categoria', 'Stock_Total']
                         stock_categoria = stock_categoria.sort_values('Stock_Total', ascending=False)
                         
@@ -241,7 +247,7 @@ if st.session_state.get('inventario_file') is not None:
                     with col5:
                         st.markdown("#### 💎 Valor Total del Inventario por Categoría")
                         df_limpio['Valor_Total'] = df_limpio['Stock_Actual'] * df_limpio['Costo_Unitario_USD']
-                        valor_categoria = df_limpio.groupby('Categoria')['Valor_Total'].sum().reset_index()
+                        valor_categoria = df_limpio.groupby('Categoria', observed=True)['Valor_Total'].sum().reset_index()
                         valor_categoria.columns = ['Categoria', 'Valor_Total']
                         valor_categoria = valor_categoria.sort_values('Valor_Total', ascending=False)
                         
@@ -266,7 +272,7 @@ if st.session_state.get('inventario_file') is not None:
                         df_critico = df_limpio[df_limpio['Stock_Actual'] < df_limpio['Punto_Reorden']].copy()
                         df_critico['Deficiencia'] = df_critico['Punto_Reorden'] - df_critico['Stock_Actual']
                         
-                        critico_categoria = df_critico.groupby('Categoria').size().reset_index(name='Cantidad_Critica')
+                        critico_categoria = df_critico.groupby('Categoria', observed=True).size().reset_index(name='Cantidad_Critica')
                         
                         fig_critico = px.bar(
                             critico_categoria,
@@ -296,10 +302,10 @@ if st.session_state.get('inventario_file') is not None:
                     # Gráfica 7: Distribución de stock por bodega (Sunburst)
                     with col7:
                         st.markdown("#### 🏭 Distribución de Stock por Bodega y Categoría")
-                        bodega_distribucion = df_limpio.groupby(['Bodega_Origen', 'Categoria'])['Stock_Actual'].sum().reset_index()
+                        bodega_distribucion = df_limpio.groupby(['Bodega_Origen', 'Categoria'], observed=True)['Stock_Actual'].sum().reset_index()
                         
                         # Preparar datos para sunburst
-                        bodega_total = df_limpio.groupby('Bodega_Origen')['Stock_Actual'].sum().reset_index()
+                        bodega_total = df_limpio.groupby('Bodega_Origen', observed=True)['Stock_Actual'].sum().reset_index()
                         
                         labels_list = ['Total'] + bodega_total['Bodega_Origen'].tolist() + [f"{row['Bodega_Origen']} - {row['Categoria']}" for _, row in bodega_distribucion.iterrows()]
                         parents_list = [''] + ['Total'] * len(bodega_total) + bodega_total['Bodega_Origen'].tolist()
@@ -318,7 +324,7 @@ if st.session_state.get('inventario_file') is not None:
                     # Gráfica 8: Lead Time promedio por categoría
                     with col8:
                         st.markdown("#### ⏱️ Lead Time Promedio (días) por Categoría")
-                        leadtime_categoria = df_limpio.groupby('Categoria')['Lead_Time_Dias'].mean().reset_index()
+                        leadtime_categoria = df_limpio.groupby('Categoria', observed=True)['Lead_Time_Dias'].mean().reset_index()
                         leadtime_categoria.columns = ['Categoria', 'Lead_Time_Promedio']
                         leadtime_categoria = leadtime_categoria.sort_values('Lead_Time_Promedio', ascending=False)
                         
@@ -411,7 +417,7 @@ if st.session_state.get('inventario_file') is not None:
                         df_limpio['Ultima_Revision'] = pd.to_datetime(df_limpio['Ultima_Revision'])
                         df_limpio['Dias_Desde_Revision'] = (datetime.now() - df_limpio['Ultima_Revision']).dt.days
                         
-                        antiguedad_categoria = df_limpio.groupby('Categoria')['Dias_Desde_Revision'].mean().reset_index()
+                        antiguedad_categoria = df_limpio.groupby('Categoria', observed=True)['Dias_Desde_Revision'].mean().reset_index()
                         antiguedad_categoria.columns = ['Categoria', 'Dias_Promedio']
                         antiguedad_categoria = antiguedad_categoria.sort_values('Dias_Promedio', ascending=False)
                         
@@ -433,6 +439,7 @@ if st.session_state.get('inventario_file') is not None:
                         )
                         fig_antiguedad.update_traces(textposition='auto')
                         st.plotly_chart(fig_antiguedad, use_container_width=True)
+                    terminar_traza(span_graficos)
                     
                     st.markdown("---")
                     display_dataframe_info(df_limpio)
@@ -527,80 +534,20 @@ if generar_analisis:
     if not groq_api_key:
         st.error("⚠️ Por favor ingresa tu API Key de Groq")
     else:
-        # Barra de progreso animada
-        progress_bar = st.progress(0)
         status_text = st.empty()
         
         try:
-            from groq import Groq
-            import time
-            
-            # Simular progreso
-            for i in range(20):
-                progress_bar.progress(i * 5)
-                status_text.text(f"🔄 Conectando con Llama 3.3... {i*5}%")
-                time.sleep(0.05)
-            
-            client = Groq(api_key=groq_api_key)
-            
-            # Preparar resumen de INVENTARIO
-            resumen = f"""
-Datos de Inventario - TechLogistics S.A.
-
-Total de productos en catálogo: {len(df_limpio)}
-
-Estadísticas de Stock Actual:
-{df_limpio['Stock_Actual'].describe().to_string()}
-
-Productos con stock crítico (< Punto_Reorden):
-{len(df_limpio[df_limpio['Stock_Actual'] < df_limpio['Punto_Reorden']])} productos ({(len(df_limpio[df_limpio['Stock_Actual'] < df_limpio['Punto_Reorden']])/len(df_limpio)*100):.1f}%)
-
-Distribución por bodega:
-{df_limpio['Bodega_Origen'].value_counts().to_string()}
-
-Estadísticas de costos:
-{df_limpio['Costo_Unitario_USD'].describe().to_string()}
-
-Valor total del inventario: ${(df_limpio['Stock_Actual'] * df_limpio['Costo_Unitario_USD']).sum():,.2f} USD
-
-Lead time promedio: {df_limpio['Lead_Time_Dias'].mean():.1f} días
-"""
+            # Resumen del dataset e instrucciones para el modelo
+            prompt = prompt_inventario(df_limpio)
             
             status_text.text("🧠 Analizando datos de inventario...")
-            progress_bar.progress(60)
-            
-            response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{
-                    "role": "user",
-                    "content": f"""Eres un consultor estratégico senior especializado en gestión de inventarios para TechLogistics S.A.
-
-Analiza estos datos de inventario:
-
-{resumen}
-
-Genera exactamente 3 párrafos de recomendaciones estratégicas accionables y específicas.
-
-Formato requerido:
-- Párrafo 1: Análisis de la situación actual del inventario y principales hallazgos críticos
-- Párrafo 2: Recomendación táctica inmediata para optimizar stock (corto plazo)
-- Párrafo 3: Recomendación estratégica para gestión de inventario (mediano-largo plazo)
-
-Escribe los 3 párrafos separados por línea en blanco, sin títulos ni numeración."""
-                }],
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            status_text.text("✍️ Generando recomendaciones...")
-            progress_bar.progress(90)
-            
-            recomendaciones = response.choices[0].message.content
-            
-            progress_bar.progress(100)
-            time.sleep(0.3)
+            # El texto aparece a medida que el modelo lo genera; un resumen ya
+            # consultado con los mismos parámetros sale de la caché del servicio
+            vista_previa = st.empty()
+            with vista_previa.container():
+                recomendaciones = st.write_stream(generar_reporte_stream(prompt, groq_api_key))
+            vista_previa.empty()
             status_text.empty()
-            progress_bar.empty()
             
             # Mostrar resultados con diseño mejorado
             st.markdown("""
@@ -682,7 +629,6 @@ Escribe los 3 párrafos separados por línea en blanco, sin títulos ni numeraci
             """, unsafe_allow_html=True)
             
         except Exception as e:
-            progress_bar.empty()
             status_text.empty()
             
             st.markdown("""
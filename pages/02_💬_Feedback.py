@@ -2,12 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.data_loader import display_dataframe_info, load_csv_file
+from utils.cache import clave_cache
+from utils.data_loader import display_dataframe_info, load_csv_file, load_clean_csv_file, mostrar_errores_limpieza
 from utils.session_init import init_session_state
-from utils.data_cleaning import limpiar_feedback, generar_audit_summary, calcular_health_score, contar_valores_invalidos
+from utils.tracing import iniciar_traza, terminar_traza
+from utils.report_service import generar_reporte_stream
+from utils.report_prompts import prompt_feedback
+from utils.data_cleaning import limpiar_feedback, generar_audit_summary, calcular_health_score_detallado
 
 # Inicializar session state
-init_session_state()
+init_session_state("Feedback")
 
 st.set_page_config(
     page_title="Feedback",
@@ -33,8 +37,8 @@ if st.session_state.get('feedback_file') is not None:
                 # Health Score antes de limpieza
                 st.markdown("### 📊 Métricas de Calidad - ANTES de Limpieza")
                 col1, col2, col3, col4, col5 = st.columns(5)
-                health_score_antes = calcular_health_score(df)
-                valores_invalidos_antes = contar_valores_invalidos(df)
+                detalle_antes = calcular_health_score_detallado(df, clave_cache(st.session_state.feedback_file, 'csv'))
+                health_score_antes = detalle_antes['score']
                 with col1:
                     st.metric("Health Score", f"{health_score_antes:.1f}/100")
                 with col2:
@@ -42,9 +46,9 @@ if st.session_state.get('feedback_file') is not None:
                 with col3:
                     st.metric("Columnas", len(df.columns))
                 with col4:
-                    st.metric("Valores Nulos", int(df.isna().sum().sum()))
+                    st.metric("Valores Nulos", detalle_antes['nulos'])
                 with col5:
-                    st.metric("❌ Valores Inválidos", valores_invalidos_antes)
+                    st.metric("❌ Valores Inválidos", detalle_antes['negativos'])
                 
                 st.markdown("---")
                 display_dataframe_info(df)
@@ -73,13 +77,14 @@ if st.session_state.get('feedback_file') is not None:
             with tab2:
                 st.subheader("Datos Limpiados")
                 try:
-                    df_limpio = limpiar_feedback(df)
+                    df_limpio = load_clean_csv_file(st.session_state.feedback_file, limpiar_feedback)
+                    mostrar_errores_limpieza(df_limpio)
                     
                     # Health Score después de limpieza
                     st.markdown("### 📊 Métricas de Calidad - DESPUÉS de Limpieza")
                     col1, col2, col3, col4, col5 = st.columns(5)
-                    health_score_despues = calcular_health_score(df_limpio)
-                    valores_invalidos_despues = contar_valores_invalidos(df_limpio)
+                    detalle_despues = calcular_health_score_detallado(df_limpio, clave_cache(st.session_state.feedback_file, 'limpiar_feedback'))
+                    health_score_despues = detalle_despues['score']
                     with col1:
                         st.metric("Health Score", f"{health_score_despues:.1f}/100")
                     with col2:
@@ -87,15 +92,15 @@ if st.session_state.get('feedback_file') is not None:
                     with col3:
                         st.metric("Columnas", len(df_limpio.columns))
                     with col4:
-                        st.metric("Valores Nulos", int(df_limpio.isna().sum().sum()))
+                        st.metric("Valores Nulos", detalle_despues['nulos'])
                     with col5:
-                        st.metric("❌ Valores Inválidos", valores_invalidos_despues)
+                        st.metric("❌ Valores Inválidos", detalle_despues['negativos'])
                     
                     st.markdown("---")
                     
                     # Comparación antes y después
                     st.markdown("### 📈 Comparación ANTES vs DESPUÉS")
-                    audit = generar_audit_summary(df, df_limpio, "Feedback")
+                    audit = generar_audit_summary(df, df_limpio, "Feedback", detalle_antes, detalle_despues)
                     
                     col1, col2, col3, col4, col5 = st.columns(5)
                     with col1:
@@ -118,6 +123,7 @@ if st.session_state.get('feedback_file') is not None:
                     
                     st.markdown("---")
                     
+                    span_graficos = iniciar_traza('graficos')
                     # ========== GRÁFICAS DE ANÁLISIS ==========
                     st.markdown("### 📊 Análisis de Feedback - Gráficas")
                     
@@ -438,10 +444,9 @@ if st.session_state.get('feedback_file') is not None:
                     with col11:
                         st.markdown("#### 🔥 Matriz: Recomendación vs Rating Producto")
                         
-                        crosstab_recomenda = pd.crosstab(
-                            df_limpio['Recomienda_Marca'].astype(str),
-                            df_limpio['Rating_Producto'].astype(int)
-                        )
+                        crosstab_recomenda = df_limpio.groupby(
+                            ['Recomienda_Marca', df_limpio['Rating_Producto'].astype(int)], observed=True
+                        ).size().unstack(fill_value=0)
                         
                         fig_heatmap_recomenda = px.imshow(
                             crosstab_recomenda,
@@ -501,10 +506,9 @@ if st.session_state.get('feedback_file') is not None:
                     with col14:
                         st.markdown("#### 💬 Comentario vs Recomendación")
                         
-                        crosstab_comment = pd.crosstab(
-                            df_limpio['Comentario_Texto'].astype(str),
-                            df_limpio['Recomienda_Marca'].astype(str)
-                        )
+                        crosstab_comment = df_limpio.groupby(
+                            ['Comentario_Texto', 'Recomienda_Marca'], observed=True
+                        ).size().unstack(fill_value=0)
                         
                         fig_heatmap_comment = px.imshow(
                             crosstab_comment,
@@ -627,6 +631,7 @@ if st.session_state.get('feedback_file') is not None:
                         hovermode='x unified'
                     )
                     st.plotly_chart(fig_violin, use_container_width=True)
+                    terminar_traza(span_graficos)
                     
                     st.markdown("---")
                     
@@ -721,81 +726,20 @@ if generar_analisis:
     if not groq_api_key:
         st.error("⚠️ Por favor ingresa tu API Key de Groq")
     else:
-        # Barra de progreso animada
-        progress_bar = st.progress(0)
         status_text = st.empty()
         
         try:
-            from groq import Groq
-            import time
-            
-            # Simular progreso
-            for i in range(20):
-                progress_bar.progress(i * 5)
-                status_text.text(f"🔄 Conectando con Llama 3.3... {i*5}%")
-                time.sleep(0.05)
-            
-            client = Groq(api_key=groq_api_key)
-            
-            # Preparar resumen de FEEDBACK
-            resumen = f"""
-Datos de Feedback de Clientes - TechLogistics S.A.
-
-Total de registros: {len(df_limpio)}
-
-Estadísticas de Rating_Producto:
-{df_limpio['Rating_Producto'].describe().to_string()}
-
-Estadísticas de Rating_Logistica:
-{df_limpio['Rating_Logistica'].describe().to_string()}
-
-Distribución de Satisfaccion_NPS:
-{df_limpio['Satisfaccion_NPS'].value_counts().head(10).to_string()}
-
-Análisis de calidad:
-- Comentarios con rating producto bajo (≤2): {len(df_limpio[df_limpio['Rating_Producto'] <= 2])} ({(len(df_limpio[df_limpio['Rating_Producto'] <= 2])/len(df_limpio)*100):.1f}%)
-- Comentarios con rating logística bajo (≤2): {len(df_limpio[df_limpio['Rating_Logistica'] <= 2])} ({(len(df_limpio[df_limpio['Rating_Logistica'] <= 2])/len(df_limpio)*100):.1f}%)
-
-Rating promedio producto: {df_limpio['Rating_Producto'].mean():.2f}/5.0
-Rating promedio logística: {df_limpio['Rating_Logistica'].mean():.2f}/5.0
-NPS promedio: {df_limpio['Satisfaccion_NPS'].mean():.2f}/10.0
-"""
+            # Resumen del dataset e instrucciones para el modelo
+            prompt = prompt_feedback(df_limpio)
             
             status_text.text("🧠 Analizando feedback de clientes...")
-            progress_bar.progress(60)
-            
-            response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{
-                    "role": "user",
-                    "content": f"""Eres un consultor estratégico senior especializado en experiencia del cliente para TechLogistics S.A.
-
-Analiza estos datos de feedback de clientes:
-
-{resumen}
-
-Genera exactamente 3 párrafos de recomendaciones estratégicas accionables y específicas.
-
-Formato requerido:
-- Párrafo 1: Análisis de la satisfacción del cliente y principales hallazgos
-- Párrafo 2: Recomendación táctica inmediata para mejorar la experiencia (corto plazo)
-- Párrafo 3: Recomendación estratégica para fidelización de clientes (mediano-largo plazo)
-
-Escribe los 3 párrafos separados por línea en blanco, sin títulos ni numeración."""
-                }],
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            status_text.text("✍️ Generando recomendaciones...")
-            progress_bar.progress(90)
-            
-            recomendaciones = response.choices[0].message.content
-            
-            progress_bar.progress(100)
-            time.sleep(0.3)
+            # El texto aparece a medida que el modelo lo genera; un resumen ya
+            # consultado con los mismos parámetros sale de la caché del servicio
+            vista_previa = st.empty()
+            with vista_previa.container():
+                recomendaciones = st.write_stream(generar_reporte_stream(prompt, groq_api_key))
+            vista_previa.empty()
             status_text.empty()
-            progress_bar.empty()
             
             # Mostrar resultados con diseño mejorado
             st.markdown("""
@@ -877,7 +821,6 @@ Escribe los 3 párrafos separados por línea en blanco, sin títulos ni numeraci
             """, unsafe_allow_html=True)
             
         except Exception as e:
-            progress_bar.empty()
             status_text.empty()
             
             st.markdown("""
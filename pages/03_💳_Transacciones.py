@@ -2,12 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.data_loader import display_dataframe_info, load_csv_file
+from utils.cache import clave_cache
+from utils.data_loader import display_dataframe_info, load_csv_file, load_clean_csv_file, mostrar_errores_limpieza
 from utils.session_init import init_session_state
-from utils.data_cleaning import limpiar_transacciones, generar_audit_summary, calcular_health_score, contar_valores_invalidos
+from utils.tracing import iniciar_traza, terminar_traza
+from utils.report_service import generar_reporte_stream
+from utils.report_prompts import prompt_transacciones
+from utils.data_cleaning import limpiar_transacciones, generar_audit_summary, calcular_health_score_detallado
 
 # Inicializar session state
-init_session_state()
+init_session_state("Transacciones")
 
 st.set_page_config(
     page_title="Transacciones",
@@ -33,8 +37,8 @@ if st.session_state.get('transacciones_file') is not None:
                 # Health Score antes de limpieza
                 st.markdown("### 📊 Métricas de Calidad - ANTES de Limpieza")
                 col1, col2, col3, col4, col5 = st.columns(5)
-                health_score_antes = calcular_health_score(df)
-                valores_invalidos_antes = contar_valores_invalidos(df)
+                detalle_antes = calcular_health_score_detallado(df, clave_cache(st.session_state.transacciones_file, 'csv'))
+                health_score_antes = detalle_antes['score']
                 with col1:
                     st.metric("Health Score", f"{health_score_antes:.1f}/100")
                 with col2:
@@ -42,9 +46,9 @@ if st.session_state.get('transacciones_file') is not None:
                 with col3:
                     st.metric("Columnas", len(df.columns))
                 with col4:
-                    st.metric("Valores Nulos", int(df.isna().sum().sum()))
+                    st.metric("Valores Nulos", detalle_antes['nulos'])
                 with col5:
-                    st.metric("❌ Valores Inválidos", valores_invalidos_antes)
+                    st.metric("❌ Valores Inválidos", detalle_antes['negativos'])
                 
                 st.markdown("---")
                 display_dataframe_info(df)
@@ -72,13 +76,14 @@ if st.session_state.get('transacciones_file') is not None:
             with tab2:
                 st.subheader("Datos Limpiados")
                 try:
-                    df_limpio = limpiar_transacciones(df)
+                    df_limpio = load_clean_csv_file(st.session_state.transacciones_file, limpiar_transacciones)
+                    mostrar_errores_limpieza(df_limpio)
                     
                     # Health Score después de limpieza
                     st.markdown("### 📊 Métricas de Calidad - DESPUÉS de Limpieza")
                     col1, col2, col3, col4, col5 = st.columns(5)
-                    health_score_despues = calcular_health_score(df_limpio)
-                    valores_invalidos_despues = contar_valores_invalidos(df_limpio)
+                    detalle_despues = calcular_health_score_detallado(df_limpio, clave_cache(st.session_state.transacciones_file, 'limpiar_transacciones'))
+                    health_score_despues = detalle_despues['score']
                     with col1:
                         st.metric("Health Score", f"{health_score_despues:.1f}/100")
                     with col2:
@@ -86,15 +91,15 @@ if st.session_state.get('transacciones_file') is not None:
                     with col3:
                         st.metric("Columnas", len(df_limpio.columns))
                     with col4:
-                        st.metric("Valores Nulos", int(df_limpio.isna().sum().sum()))
+                        st.metric("Valores Nulos", detalle_despues['nulos'])
                     with col5:
-                        st.metric("❌ Valores Inválidos", valores_invalidos_despues)
+                        st.metric("❌ Valores Inválidos", detalle_despues['negativos'])
                     
                     st.markdown("---")
                     
                     # Comparación antes y después
                     st.markdown("### 📈 Comparación ANTES vs DESPUÉS")
-                    audit = generar_audit_summary(df, df_limpio, "Transacciones")
+                    audit = generar_audit_summary(df, df_limpio, "Transacciones", detalle_antes, detalle_despues)
                     
                     col1, col2, col3, col4, col5 = st.columns(5)
                     with col1:
@@ -117,6 +122,7 @@ if st.session_state.get('transacciones_file') is not None:
                     
                     st.markdown("---")
                     
+                    span_graficos = iniciar_traza('graficos')
                     # ========== GRÁFICAS DE ANÁLISIS ==========
                     st.markdown("### 📊 Análisis de Transacciones - Gráficas")
                     
@@ -207,7 +213,7 @@ if st.session_state.get('transacciones_file') is not None:
                     # Gráfica 4: Costo promedio de envío por ciudad destino
                     with col4:
                         st.markdown("#### 🏙️ Costo Promedio de Envío por Ciudad Destino")
-                        costo_ciudad = df_limpio.groupby('Ciudad_Destino')['Costo_Envio'].mean().sort_values(ascending=False).reset_index()
+                        costo_ciudad = df_limpio.groupby('Ciudad_Destino', observed=True)['Costo_Envio'].mean().sort_values(ascending=False).reset_index()
                         costo_ciudad.columns = ['Ciudad_Destino', 'Costo_Promedio']
                         
                         fig_costo_ciudad = px.bar(
@@ -235,7 +241,7 @@ if st.session_state.get('transacciones_file') is not None:
                     # Gráfica 5: Costo promedio de envío por canal de venta
                     with col5:
                         st.markdown("#### 📱 Costo Promedio de Envío por Canal de Venta")
-                        costo_canal = df_limpio.groupby('Canal_Venta')['Costo_Envio'].mean().sort_values(ascending=False).reset_index()
+                        costo_canal = df_limpio.groupby('Canal_Venta', observed=True)['Costo_Envio'].mean().sort_values(ascending=False).reset_index()
                         costo_canal.columns = ['Canal_Venta', 'Costo_Promedio']
                         
                         fig_costo_canal = px.bar(
@@ -391,10 +397,9 @@ if st.session_state.get('transacciones_file') is not None:
                     with col11:
                         st.markdown("#### 🔥 Matriz: Estado de Envío vs Canal de Venta")
                         
-                        crosstab_estado_canal = pd.crosstab(
-                            df_limpio['Estado_Envio'].astype(str),
-                            df_limpio['Canal_Venta'].astype(str)
-                        )
+                        crosstab_estado_canal = df_limpio.groupby(
+                            ['Estado_Envio', 'Canal_Venta'], observed=True
+                        ).size().unstack(fill_value=0)
                         
                         fig_heatmap_estado = px.imshow(
                             crosstab_estado_canal,
@@ -592,6 +597,7 @@ if st.session_state.get('transacciones_file') is not None:
                         ))
                         fig_gauge_tiempo.update_layout(height=300)
                         st.plotly_chart(fig_gauge_tiempo, use_container_width=True)
+                    terminar_traza(span_graficos)
                     
                     st.markdown("---")
                     display_dataframe_info(df_limpio)
@@ -687,83 +693,20 @@ if generar_analisis:
     if not groq_api_key:
         st.error("⚠️ Por favor ingresa tu API Key de Groq")
     else:
-        # Barra de progreso animada
-        progress_bar = st.progress(0)
         status_text = st.empty()
         
         try:
-            from groq import Groq
-            import time
-            
-            # Simular progreso
-            for i in range(20):
-                progress_bar.progress(i * 5)
-                status_text.text(f"🔄 Conectando con Llama 3.3... {i*5}%")
-                time.sleep(0.05)
-            
-            client = Groq(api_key=groq_api_key)
-            
-            # Preparar resumen de TRANSACCIONES
-            resumen = f"""
-Datos de Transacciones Logísticas - TechLogistics S.A.
-
-Total de transacciones: {len(df_limpio)}
-
-Estadísticas de Tiempo_Entrega:
-{df_limpio['Tiempo_Entrega'].describe().to_string()}
-
-Distribución por estado de envío:
-{df_limpio['Estado_Envio'].value_counts().to_string()}
-
-Top 10 ciudades destino:
-{df_limpio['Ciudad_Destino'].value_counts().head(10).to_string()}
-
-Análisis financiero:
-- Ingresos totales: ${(df_limpio['Cantidad_Vendida'] * df_limpio['Precio_Venta_Final']).sum():,.2f} USD
-- Costos de envío totales: ${df_limpio['Costo_Envio'].sum():,.2f} USD
-- Margen neto: ${((df_limpio['Cantidad_Vendida'] * df_limpio['Precio_Venta_Final']).sum() - df_limpio['Costo_Envio'].sum()):,.2f} USD
-
-Métricas operativas:
-- Tiempo promedio de entrega: {df_limpio['Tiempo_Entrega'].mean():.1f} días
-- Entregas rápidas (≤3 días): {len(df_limpio[df_limpio['Tiempo_Entrega'] <= 3])} ({(len(df_limpio[df_limpio['Tiempo_Entrega'] <= 3])/len(df_limpio)*100):.1f}%)
-- Entregas lentas (>7 días): {len(df_limpio[df_limpio['Tiempo_Entrega'] > 7])} ({(len(df_limpio[df_limpio['Tiempo_Entrega'] > 7])/len(df_limpio)*100):.1f}%)
-"""
+            # Resumen del dataset e instrucciones para el modelo
+            prompt = prompt_transacciones(df_limpio)
             
             status_text.text("🧠 Analizando transacciones logísticas...")
-            progress_bar.progress(60)
-            
-            response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{
-                    "role": "user",
-                    "content": f"""Eres un consultor estratégico senior especializado en logística y operaciones para TechLogistics S.A.
-
-Analiza estos datos de transacciones logísticas:
-
-{resumen}
-
-Genera exactamente 3 párrafos de recomendaciones estratégicas accionables y específicas.
-
-Formato requerido:
-- Párrafo 1: Análisis del desempeño logístico actual y principales hallazgos
-- Párrafo 2: Recomendación táctica inmediata para optimizar entregas (corto plazo)
-- Párrafo 3: Recomendación estratégica para eficiencia operativa (mediano-largo plazo)
-
-Escribe los 3 párrafos separados por línea en blanco, sin títulos ni numeración."""
-                }],
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            status_text.text("✍️ Generando recomendaciones...")
-            progress_bar.progress(90)
-            
-            recomendaciones = response.choices[0].message.content
-            
-            progress_bar.progress(100)
-            time.sleep(0.3)
+            # El texto aparece a medida que el modelo lo genera; un resumen ya
+            # consultado con los mismos parámetros sale de la caché del servicio
+            vista_previa = st.empty()
+            with vista_previa.container():
+                recomendaciones = st.write_stream(generar_reporte_stream(prompt, groq_api_key))
+            vista_previa.empty()
             status_text.empty()
-            progress_bar.empty()
             
             # Mostrar resultados con diseño mejorado
             st.markdown("""
@@ -845,7 +788,6 @@ Escribe los 3 párrafos separados por línea en blanco, sin títulos ni numeraci
             """, unsafe_allow_html=True)
             
         except Exception as e:
-            progress_bar.empty()
             status_text.empty()
             
             st.markdown("""
@@ -3,14 +3,19 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-import time
-from utils.data_loader import display_dataframe_info, load_csv_file
+from utils.cache import clave_cache
+from utils.data_loader import display_dataframe_info, load_csv_file, load_clean_csv_files, mostrar_errores_limpieza
 from utils.session_init import init_session_state
-from utils.data_cleaning import limpiar_inventario, limpiar_feedback, limpiar_transacciones, calcular_health_score, generar_audit_summary, contar_valores_invalidos
-from utils.data_integration import integrar_datos, crear_metricas_nuevas
+from utils.tracing import iniciar_traza, terminar_traza, traza
+from utils.report_service import generar_reporte_stream
+from utils.report_prompts import prompt_merge
+from utils.data_cleaning import limpiar_inventario, limpiar_feedback, limpiar_transacciones, generar_audit_summary, contar_valores_invalidos
+from utils.data_integration import preparar_dashboard_merge
+from utils.rollup import consultar_cubo, conteos, tabla_cruzada, total_cubo
+from utils.session_store import clave_entradas, obtener_resultado, guardar_resultado
 
 # Inicializar session state
-init_session_state()
+init_session_state("Merge")
 
 st.set_page_config(
     page_title="Merge",
@@ -36,9 +41,18 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
             
             # LIMPIAR OBLIGATORIAMENTE
             st.info("🧹 Limpiando datos automáticamente...")
-            df_inventario = limpiar_inventario(df_inventario_raw)
-            df_feedback = limpiar_feedback(df_feedback_raw)
-            df_transacciones = limpiar_transacciones(df_transacciones_raw)
+            limpios, tiempos_limpieza = load_clean_csv_files({
+                'inventario': (st.session_state.inventario_file, limpiar_inventario),
+                'feedback': (st.session_state.feedback_file, limpiar_feedback),
+                'transacciones': (st.session_state.transacciones_file, limpiar_transacciones),
+            })
+            df_inventario = limpios['inventario']
+            df_feedback = limpios['feedback']
+            df_transacciones = limpios['transacciones']
+            if any(tiempos_limpieza.values()):
+                st.caption("⏱️ Limpieza en paralelo: " + ", ".join(
+                    f"{nombre} {segundos:.2f}s" for nombre, segundos in tiempos_limpieza.items()
+                ))
             
             # Mostrar comparación de health scores ANTES y DESPUÉS para cada dataset
             st.markdown("---")
@@ -47,7 +61,12 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
             tab_inv, tab_feed, tab_trans = st.tabs(["📦 Inventario", "💬 Feedback", "💳 Transacciones"])
             
             with tab_inv:
-                audit_inv = generar_audit_summary(df_inventario_raw, df_inventario, "Inventario")
+                audit_inv = generar_audit_summary(
+                    df_inventario_raw, df_inventario, "Inventario",
+                    version_antes=clave_cache(st.session_state.inventario_file, 'csv'),
+                    version_despues=clave_cache(st.session_state.inventario_file, 'limpiar_inventario'),
+                )
+                mostrar_errores_limpieza(df_inventario)
                 col1, col2, col3, col4, col5 = st.columns(5)
                 with col1:
                     delta = audit_inv['health_score_despues'] - audit_inv['health_score_antes']
@@ -68,7 +87,12 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                     st.metric("Valores Inválidos Eliminados", f"{audit_inv['valores_invalidos_antes']} → {audit_inv['valores_invalidos_despues']}")
             
             with tab_feed:
-                audit_feed = generar_audit_summary(df_feedback_raw, df_feedback, "Feedback")
+                audit_feed = generar_audit_summary(
+                    df_feedback_raw, df_feedback, "Feedback",
+                    version_antes=clave_cache(st.session_state.feedback_file, 'csv'),
+                    version_despues=clave_cache(st.session_state.feedback_file, 'limpiar_feedback'),
+                )
+                mostrar_errores_limpieza(df_feedback)
                 col1, col2, col3, col4, col5 = st.columns(5)
                 with col1:
                     delta = audit_feed['health_score_despues'] - audit_feed['health_score_antes']
@@ -89,7 +113,12 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                     st.metric("Valores Inválidos Eliminados", f"{audit_feed['valores_invalidos_antes']} → {audit_feed['valores_invalidos_despues']}")
             
             with tab_trans:
-                audit_trans = generar_audit_summary(df_transacciones_raw, df_transacciones, "Transacciones")
+                audit_trans = generar_audit_summary(
+                    df_transacciones_raw, df_transacciones, "Transacciones",
+                    version_antes=clave_cache(st.session_state.transacciones_file, 'csv'),
+                    version_despues=clave_cache(st.session_state.transacciones_file, 'limpiar_transacciones'),
+                )
+                mostrar_errores_limpieza(df_transacciones)
                 col1, col2, col3, col4, col5 = st.columns(5)
                 with col1:
                     delta = audit_trans['health_score_despues'] - audit_trans['health_score_antes']
@@ -137,8 +166,20 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
             
             st.markdown("---")
             
+            # El resultado de la integración se guarda en la sesión asociado a los hashes de
+            # los tres archivos: los reruns posteriores (p. ej. el botón de Groq) lo reutilizan
+            # sin volver a integrar, y se descarta solo si cambia alguno de los archivos
+            clave_merge = clave_entradas(
+                st.session_state.inventario_file,
+                st.session_state.feedback_file,
+                st.session_state.transacciones_file,
+            )
+            with traza('merge_en_sesion') as span:
+                merge = obtener_resultado(st.session_state, 'merge_integrado', clave_merge)
+                span['cache'] = 'hit' if merge is not None else 'miss'
+            
             # Botón para realizar el merge
-            if st.button("Ejecutar Integración de Datos"):
+            if st.button("Ejecutar Integración de Datos") or merge is not None:
                 with st.spinner("🔄 Integrando datos..."):
                     try:
                         # Verificar columnas disponibles
@@ -157,11 +198,34 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             inv_cols = df_inventario.columns.tolist()
                             st.write(f"**Inventario**: {len(inv_cols)} cols")
                         
-                        # Usar la función integrar_datos
-                        df_integrado = integrar_datos(df_transacciones, df_feedback, df_inventario)
+                        if merge is None:
+                            merge = guardar_resultado(
+                                st.session_state, 'merge_integrado', clave_merge,
+                                preparar_dashboard_merge(df_transacciones, df_feedback, df_inventario, version=clave_merge),
+                            )
                         
-                        # Crear métricas nuevas
-                        df_integrado = crear_metricas_nuevas(df_integrado)
+                        df_integrado = merge['df_integrado']
+                        reporte_joins = merge['reporte_joins']
+                        df_dash = merge['df_dash']
+                        cubo = merge['cubo']
+                        
+                        # Diagnóstico de los joins: claves sin pareja y claves repetidas
+                        with st.expander("🔍 Diagnóstico de los joins"):
+                            for titulo, clave in [("Transacciones + Feedback", 'transaccion_feedback'),
+                                                  ("+ Inventario", 'inventario')]:
+                                rep = reporte_joins[clave]
+                                st.markdown(f"**{titulo}**")
+                                col1, col2, col3, col4 = st.columns(4)
+                                with col1:
+                                    st.metric("Claves coincidentes", rep['claves_coincidentes'])
+                                with col2:
+                                    st.metric("Filas sin pareja (izq.)", rep['filas_solo_izquierda'])
+                                with col3:
+                                    st.metric("Claves sin pareja (der.)", rep['claves_solo_derecha'])
+                                with col4:
+                                    st.metric("Filas extra por claves repetidas", rep['filas_extra_por_repetidas'])
+                                if len(rep['huerfanas_izquierda']) > 0:
+                                    st.caption(f"Claves huérfanas (izquierda): {', '.join(map(str, rep['huerfanas_izquierda'].head(20)))}")
                         
                         # DEBUG: Mostrar columnas después de crear métricas
                         st.info(f"✅ Métricas creadas. Columnas disponibles: {list(df_integrado.columns)}")
@@ -177,7 +241,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         # Mostrar health score del merge
                         st.markdown("---")
                         st.subheader("🏥 Salud del Merge Final")
-                        health_merge = calcular_health_score(df_integrado)
+                        health_merge = merge['health_merge']
                         col1, col2, col3, col4 = st.columns(4)
                         with col1:
                             st.metric("Health Score Merge", f"{health_merge:.1f}/100")
@@ -236,17 +300,13 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.subheader("Estadísticas Detalladas de Márgenes")
                             st.write(df_integrado['Margen_Real_Pct'].describe())
                         
+                        span_graficos = iniciar_traza('graficos')
                         # ==========================================
                         # SECCIÓN DE GRÁFICAS ANALÍTICAS INTEGRADAS
                         # ==========================================
                         st.markdown("---")
                         st.header("📊 ANÁLISIS INTEGRADO - 10 CATEGORÍAS")
                         
-                        # Preparación de datos
-                        df_dash = df_integrado.copy()
-                        df_dash['Fecha_Venta'] = pd.to_datetime(df_dash['Fecha_Venta'], errors='coerce')
-                        df_dash['Revenue'] = df_dash['Cantidad_Vendida'] * df_dash['Precio_Venta_Final']
-                        
                         # Colores estandarizados
                         color_canal = {'Físico': '#3498db', 'Online': '#e74c3c'}
                         color_estado = {'Entregado': '#2ecc71', 'En_Transito': '#3498db', 'Perdido': '#e74c3c', 'Retrasado': '#f39c12'}
@@ -256,10 +316,10 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         # ==========================================
                         st.markdown("### 1️⃣ KPIs Principales - Revenue & Profitability")
                         
-                        revenue_total = df_dash['Revenue'].sum()
-                        ganancia_total = df_dash['Ganancia_Neta_Total'].sum()
-                        margen_pct = df_dash['Margen_Real_Pct'].mean()
-                        aov = df_dash['Revenue'].mean()
+                        revenue_total = total_cubo(cubo, 'Revenue')
+                        ganancia_total = total_cubo(cubo, 'Ganancia_Neta_Total')
+                        margen_pct = total_cubo(cubo, 'Margen_Real_Pct', 'mean')
+                        aov = total_cubo(cubo, 'Revenue', 'mean')
                         
                         col1, col2, col3, col4 = st.columns(4)
                         
@@ -340,7 +400,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         col1, col2, col3 = st.columns(3)
                         
                         with col1:
-                            top_productos_rev = df_dash.groupby('SKU_ID').agg({
+                            top_productos_rev = consultar_cubo(cubo, ['SKU_ID'], {
                                 'Revenue': 'sum',
                                 'Ganancia_Neta_Total': 'sum',
                                 'Cantidad_Vendida': 'sum'
@@ -359,7 +419,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_prod_rev, use_container_width=True)
                         
                         with col2:
-                            top_ciudades = df_dash.groupby('Ciudad_Destino')['Revenue'].sum().sort_values(ascending=False).head(10)
+                            top_ciudades = consultar_cubo(cubo, ['Ciudad_Destino'], {'Revenue': 'sum'})['Revenue'].sort_values(ascending=False).head(10)
                             
                             fig_ciudades = px.bar(
                                 x=top_ciudades.values,
@@ -374,7 +434,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_ciudades, use_container_width=True)
                         
                         with col3:
-                            canal_rentabilidad = df_dash.groupby('Canal_Venta').agg({
+                            canal_rentabilidad = consultar_cubo(cubo, ['Canal_Venta'], {
                                 'Revenue': 'sum',
                                 'Margen_Real_Pct': 'mean'
                             })
@@ -420,7 +480,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col2:
                             # Stock vs Cantidad Vendida
-                            stock_qty = df_dash.groupby('SKU_ID').agg({
+                            stock_qty = consultar_cubo(cubo, ['SKU_ID'], {
                                 'Stock_Actual': 'first',
                                 'Cantidad_Vendida': 'sum',
                                 'Categoria': 'first'
@@ -487,7 +547,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         col1, col2 = st.columns(2)
                         
                         with col1:
-                            cat_analysis = df_dash.groupby('Categoria').agg({
+                            cat_analysis = consultar_cubo(cubo, ['Categoria'], {
                                 'Revenue': 'sum',
                                 'Ganancia_Neta_Total': 'sum',
                                 'Cantidad_Vendida': 'sum',
@@ -538,7 +598,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_cat_rating, use_container_width=True)
                         
                         with col2:
-                            margen_real_cat = df_dash.groupby('Categoria')['Margen_Real_Pct'].mean().sort_values(ascending=False)
+                            margen_real_cat = consultar_cubo(cubo, ['Categoria'], {'Margen_Real_Pct': 'mean'})['Margen_Real_Pct'].sort_values(ascending=False)
                             fig_cat_margen_pct = px.bar(
                                 x=margen_real_cat.index,
                                 y=margen_real_cat.values,
@@ -562,7 +622,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         col1, col2, col3 = st.columns(3)
                         
                         with col1:
-                            canal_dist = df_dash['Canal_Venta'].value_counts()
+                            canal_dist = conteos(cubo, 'Canal_Venta')
                             fig_canal_dist = px.pie(
                                 values=canal_dist.values,
                                 names=canal_dist.index,
@@ -574,7 +634,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_canal_dist, use_container_width=True)
                         
                         with col2:
-                            canal_rev = df_dash.groupby('Canal_Venta')['Revenue'].sum()
+                            canal_rev = consultar_cubo(cubo, ['Canal_Venta'], {'Revenue': 'sum'})['Revenue']
                             fig_canal_rev_pie = px.pie(
                                 values=canal_rev.values,
                                 names=canal_rev.index,
@@ -586,7 +646,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_canal_rev_pie, use_container_width=True)
                         
                         with col3:
-                            canal_nps = df_dash.groupby('Canal_Venta')['Satisfaccion_NPS'].mean()
+                            canal_nps = consultar_cubo(cubo, ['Canal_Venta'], {'Satisfaccion_NPS': 'mean'})['Satisfaccion_NPS']
                             fig_canal_nps = px.bar(
                                 x=canal_nps.index,
                                 y=canal_nps.values,
@@ -603,7 +663,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         col1, col2 = st.columns(2)
                         
                         with col1:
-                            canal_costo = df_dash.groupby('Canal_Venta')['Costo_Envio'].mean().sort_values(ascending=False)
+                            canal_costo = consultar_cubo(cubo, ['Canal_Venta'], {'Costo_Envio': 'mean'})['Costo_Envio'].sort_values(ascending=False)
                             fig_canal_costo = px.bar(
                                 x=canal_costo.index,
                                 y=canal_costo.values,
@@ -618,7 +678,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_canal_costo, use_container_width=True)
                         
                         with col2:
-                            canal_margen = df_dash.groupby('Canal_Venta')['Margen_Real_Pct'].mean().sort_values(ascending=False)
+                            canal_margen = consultar_cubo(cubo, ['Canal_Venta'], {'Margen_Real_Pct': 'mean'})['Margen_Real_Pct'].sort_values(ascending=False)
                             fig_canal_margen = px.bar(
                                 x=canal_margen.index,
                                 y=canal_margen.values,
@@ -642,7 +702,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         col1, col2 = st.columns(2)
                         
                         with col1:
-                            geo_rev = df_dash.groupby('Ciudad_Destino')['Revenue'].sum().sort_values(ascending=False).head(15)
+                            geo_rev = consultar_cubo(cubo, ['Ciudad_Destino'], {'Revenue': 'sum'})['Revenue'].sort_values(ascending=False).head(15)
                             fig_geo_rev = px.bar(
                                 y=geo_rev.index,
                                 x=geo_rev.values,
@@ -656,7 +716,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_geo_rev, use_container_width=True)
                         
                         with col2:
-                            geo_entregas = pd.crosstab(df_dash['Ciudad_Destino'], df_dash['Estado_Envio']).head(15)
+                            geo_entregas = tabla_cruzada(cubo, 'Ciudad_Destino', 'Estado_Envio').head(15)
                             fig_geo_entregas = px.bar(
                                 geo_entregas,
                                 title='📦 Entregas por Estado por Ciudad (Top 15)',
@@ -668,15 +728,10 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_geo_entregas, use_container_width=True)
                         
                         # Heatmap Ciudad vs Categoría
-                        geo_cat_heat = pd.crosstab(
-                            df_dash['Ciudad_Destino'],
-                            df_dash['Categoria'],
-                            values=df_dash['Revenue'],
-                            aggfunc='sum'
-                        ).fillna(0)
+                        geo_cat_heat = tabla_cruzada(cubo, 'Ciudad_Destino', 'Categoria', 'Revenue', 'sum').fillna(0)
                         
                         # Top 15 ciudades
-                        top_ciudades_list = df_dash['Ciudad_Destino'].value_counts().head(15).index
+                        top_ciudades_list = conteos(cubo, 'Ciudad_Destino').head(15).index
                         geo_cat_heat = geo_cat_heat.loc[top_ciudades_list]
                         
                         fig_geo_heat = px.imshow(
@@ -692,7 +747,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         col1, col2 = st.columns(2)
                         
                         with col1:
-                            geo_rating = df_dash.groupby('Ciudad_Destino')['Rating_Producto'].mean().sort_values(ascending=False).head(10)
+                            geo_rating = consultar_cubo(cubo, ['Ciudad_Destino'], {'Rating_Producto': 'mean'})['Rating_Producto'].sort_values(ascending=False).head(10)
                             fig_geo_rating = px.bar(
                                 x=geo_rating.values,
                                 y=geo_rating.index,
@@ -706,7 +761,8 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_geo_rating, use_container_width=True)
                         
                         with col2:
-                            geo_entrega_pct = df_dash[df_dash['Estado_Envio'] == 'Entregado'].groupby('Ciudad_Destino').size() / df_dash.groupby('Ciudad_Destino').size() * 100
+                            entregas_ciudad = tabla_cruzada(cubo, 'Ciudad_Destino', 'Estado_Envio')
+                            geo_entrega_pct = entregas_ciudad.get('Entregado', 0) / conteos(cubo, 'Ciudad_Destino') * 100
                             geo_entrega_pct = geo_entrega_pct.sort_values(ascending=False).head(10)
                             fig_geo_entrega_pct = px.bar(
                                 x=geo_entrega_pct.values,
@@ -733,7 +789,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col1:
                             # Timeline Revenue Acumulado
-                            timeline_rev = df_dash.groupby(df_dash['Fecha_Venta'].dt.date)['Revenue'].sum().reset_index()
+                            timeline_rev = consultar_cubo(cubo, ['Fecha_Venta'], {'Revenue': 'sum'}).reset_index()
                             timeline_rev['Revenue_Acumulado'] = timeline_rev['Revenue'].cumsum()
                             
                             fig_timeline_rev = px.line(
@@ -751,7 +807,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col2:
                             # Timeline Ganancia Acumulada
-                            timeline_gan = df_dash.groupby(df_dash['Fecha_Venta'].dt.date)['Ganancia_Neta_Total'].sum().reset_index()
+                            timeline_gan = consultar_cubo(cubo, ['Fecha_Venta'], {'Ganancia_Neta_Total': 'sum'}).reset_index()
                             timeline_gan.columns = ['Fecha_Venta', 'Ganancia_Diaria']
                             timeline_gan['Ganancia_Acumulada'] = timeline_gan['Ganancia_Diaria'].cumsum()
                             
@@ -772,7 +828,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col1:
                             # % Entregas por estado
-                            estado_dist = df_dash['Estado_Envio'].value_counts()
+                            estado_dist = conteos(cubo, 'Estado_Envio')
                             estado_pct = (estado_dist / estado_dist.sum() * 100)
                             fig_estado_pct = px.pie(
                                 values=estado_dist.values,
@@ -786,10 +842,10 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col2:
                             # Tickets vs Revenue por estado
-                            estado_metricas = df_dash.groupby('Estado_Envio').agg({
+                            estado_metricas = consultar_cubo(cubo, ['Estado_Envio'], {
                                 'Revenue': 'sum',
                                 'Rating_Producto': 'mean',
-                                'Transaccion_ID': 'count'
+                                'Transaccion_ID': 'size'
                             }).round(2)
                             
                             fig_estado_rev = px.bar(
@@ -816,7 +872,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col1:
                             # Treemap: Revenue por Categoría y Ciudad
-                            treemap_data = df_dash.groupby(['Categoria', 'Ciudad_Destino'])['Revenue'].sum().reset_index()
+                            treemap_data = consultar_cubo(cubo, ['Categoria', 'Ciudad_Destino'], {'Revenue': 'sum'}).reset_index()
                             
                             # Simplificado para Treemap
                             fig_treemap = px.treemap(
@@ -832,9 +888,9 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col2:
                             # Sunburst: Revenue por Canal → Categoría
-                            sunburst_data = df_dash.groupby(['Canal_Venta', 'Categoria'])['Revenue'].sum().reset_index()
+                            sunburst_data = consultar_cubo(cubo, ['Canal_Venta', 'Categoria'], {'Revenue': 'sum'}).reset_index()
                             sunburst_data = pd.concat([
-                                pd.DataFrame({'Canal_Venta': sunburst_data['Canal_Venta'].unique(), 'Categoria': '', 'Revenue': sunburst_data.groupby('Canal_Venta')['Revenue'].sum().values}),
+                                consultar_cubo(cubo, ['Canal_Venta'], {'Revenue': 'sum'}).reset_index().assign(Categoria=''),
                                 sunburst_data
                             ], ignore_index=True)
                             
@@ -860,7 +916,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         col1, col2 = st.columns(2)
                         
                         with col1:
-                            inv_ventas = df_dash.groupby('SKU_ID').agg({
+                            inv_ventas = consultar_cubo(cubo, ['SKU_ID'], {
                                 'Stock_Actual': 'first',
                                 'Cantidad_Vendida': 'sum',
                                 'Revenue': 'sum',
@@ -883,7 +939,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col2:
                             # Rotación por categoría
-                            rotacion = df_dash.groupby('Categoria').agg({
+                            rotacion = consultar_cubo(cubo, ['Categoria'], {
                                 'Cantidad_Vendida': 'sum',
                                 'Stock_Actual': 'first'
                             })
@@ -904,7 +960,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             st.plotly_chart(fig_rotacion, use_container_width=True)
                         
                         # Matriz Categoría vs Estado Envío
-                        matriz_cat_estado = pd.crosstab(df_dash['Categoria'], df_dash['Estado_Envio'])
+                        matriz_cat_estado = tabla_cruzada(cubo, 'Categoria', 'Estado_Envio')
                         fig_matriz = px.imshow(
                             matriz_cat_estado,
                             title='🔥 Matriz: Categoría vs Estado de Envío',
@@ -924,7 +980,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         # Crear matriz de KPIs por Canal, Categoría y Ciudad
                         st.subheader("📊 KPIs por Canal de Venta")
-                        canal_kpis = df_dash.groupby('Canal_Venta').agg({
+                        canal_kpis = consultar_cubo(cubo, ['Canal_Venta'], {
                             'Revenue': 'sum',
                             'Ganancia_Neta_Total': 'sum',
                             'Cantidad_Vendida': 'sum',
@@ -943,7 +999,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         st.dataframe(canal_kpis, use_container_width=True)
                         
                         st.subheader("📊 Top KPIs por Categoría")
-                        cat_kpis = df_dash.groupby('Categoria').agg({
+                        cat_kpis = consultar_cubo(cubo, ['Categoria'], {
                             'Revenue': 'sum',
                             'Ganancia_Neta_Total': 'sum',
                             'Cantidad_Vendida': 'sum',
@@ -962,7 +1018,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         st.dataframe(cat_kpis, use_container_width=True)
                         
                         st.subheader("📊 Top KPIs por Ciudad")
-                        ciudad_kpis = df_dash.groupby('Ciudad_Destino').agg({
+                        ciudad_kpis = consultar_cubo(cubo, ['Ciudad_Destino'], {
                             'Revenue': 'sum',
                             'Ganancia_Neta_Total': 'sum',
                             'Cantidad_Vendida': 'sum',
@@ -1041,7 +1097,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         col1, col2 = st.columns(2)
                         
                         with col1:
-                            top_gan_real = df_dash.groupby('SKU_ID').agg({
+                            top_gan_real = consultar_cubo(cubo, ['SKU_ID'], {
                                 'Ganancia_Neta_Total': 'sum',
                                 'Cantidad_Vendida': 'sum',
                                 'Revenue': 'sum'
@@ -1081,7 +1137,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col1:
                             # Ganancia total acumulada por Categoría
-                            gan_cat = df_dash.groupby('Categoria').agg({
+                            gan_cat = consultar_cubo(cubo, ['Categoria'], {
                                 'Ganancia_Neta_Total': 'sum',
                                 'Revenue': 'sum'
                             }).sort_values('Ganancia_Neta_Total', ascending=False)
@@ -1102,7 +1158,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col2:
                             # Rating_Servicio promedio por Categoría
-                            rating_cat = df_dash.groupby('Categoria').agg({
+                            rating_cat = consultar_cubo(cubo, ['Categoria'], {
                                 'Rating_Servicio': 'mean',
                                 'Ganancia_Neta_Total': 'sum'
                             }).sort_values('Rating_Servicio', ascending=False)
@@ -1126,12 +1182,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         # Matriz Correlación: Margen vs Rating_Servicio por Categoría
                         st.markdown("### 13️⃣ Análisis Cruzado - Margen vs Satisfacción")
                         
-                        matriz_margen_rating = pd.crosstab(
-                            df_dash['Categoria'],
-                            df_dash['Canal_Venta'],
-                            values=df_dash['Rating_Servicio'],
-                            aggfunc='mean'
-                        ).fillna(0)
+                        matriz_margen_rating = tabla_cruzada(cubo, 'Categoria', 'Canal_Venta', 'Rating_Servicio', 'mean').fillna(0)
                         
                         fig_matriz_cr = px.imshow(
                             matriz_margen_rating,
@@ -1153,7 +1204,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         
                         with col1:
                             # Ganancia promedio por canal
-                            gan_canal = df_dash.groupby('Canal_Venta').agg({
+                            gan_canal = consultar_cubo(cubo, ['Canal_Venta'], {
                                 'Ganancia_Neta_Total': ['sum', 'mean', 'count'],
                                 'Rating_Servicio': 'mean',
                                 'Margen_Real_Pct': 'mean'
@@ -1164,7 +1215,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                         with col2:
                             # Tabla de mejores SKUs por ganancia real
                             st.subheader("🏆 Top SKUs - Rentabilidad")
-                            top_sku_gan = df_dash.groupby('SKU_ID').agg({
+                            top_sku_gan = consultar_cubo(cubo, ['SKU_ID'], {
                                 'Ganancia_Neta_Total': 'sum',
                                 'Rating_Servicio': 'mean',
                                 'Cantidad_Vendida': 'sum',
@@ -1178,6 +1229,7 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                                 'Categoria': '🏷️ Categoría'
                             })
                             st.dataframe(top_sku_gan, use_container_width=True)
+                        terminar_traza(span_graficos)
                         
                         st.markdown("---")
                         
@@ -1245,103 +1297,20 @@ if st.session_state.get('inventario_file') is not None and st.session_state.get(
                             if not groq_api_key:
                                 st.error("⚠️ Por favor ingresa tu API Key de Groq")
                             else:
-                                # Barra de progreso animada
-                                progress_bar = st.progress(0)
                                 status_text = st.empty()
                                 
                                 try:
-                                    from groq import Groq
-                                    
-                                    # Simular progreso
-                                    for i in range(20):
-                                        progress_bar.progress(i * 5)
-                                        status_text.text(f"🔄 Conectando con Llama 3.3... {i*5}%")
-                                        time.sleep(0.05)
-                                    
-                                    client = Groq(api_key=groq_api_key)
-                                    
-                                    # Preparar resumen del MERGE integrado
-                                    resumen = f"""
-Análisis Integrado - Data Validation & Integration Report
-
-Total de Registros Integrados: {len(df_dash)}
-Fecha de Análisis: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-📊 MÉTRICAS FINANCIERAS:
-- Revenue Total: ${df_dash['Revenue'].sum():,.2f}
-- Ganancia Neta Total: ${df_dash['Ganancia_Neta_Total'].sum():,.2f}
-- Margen Real Promedio: {df_dash['Margen_Real_Pct'].mean():.1f}%
-- AOV (Average Order Value): ${df_dash['Revenue'].mean():,.2f}
-
-📦 ANÁLISIS DE INVENTARIO:
-- Stock Promedio: {df_dash['Stock_Actual'].mean():.0f} unidades
-- Cantidad Vendida Total: {df_dash['Cantidad_Vendida'].sum():.0f} unidades
-- Top Categorías: {', '.join(df_dash['Categoria'].value_counts().head(3).index.tolist())}
-- Rotación Promedio: {(df_dash['Cantidad_Vendida'].sum() / (df_dash['Stock_Actual'].mean() + 1)):.2f}x
-
-⭐ SATISFACCIÓN DEL CLIENTE:
-- Rating Promedio Producto: {df_dash['Rating_Producto'].mean():.2f}/5
-- Rating Promedio Logística: {df_dash['Rating_Logistica'].mean():.2f}/5
-- NPS Promedio: {df_dash['Satisfaccion_NPS'].mean():.1f}
-- Rating Servicio: {df_dash['Rating_Servicio'].mean():.2f}/5
-
-🚚 ANÁLISIS LOGÍSTICO (Entregas):
-- Estado Principal: {df_dash['Estado_Envio'].value_counts().index[0]} ({(df_dash['Estado_Envio'].value_counts().iloc[0]/len(df_dash)*100):.1f}%)
-- Costo Envío Promedio: ${df_dash['Costo_Envio'].mean():.2f}
-- Tiempo Entregar Promedio: {df_dash['Tiempo_Entrega'].mean():.1f} días
-- Entregas Exitosas: {(df_dash['Estado_Envio'] == 'Entregado').sum()} ({((df_dash['Estado_Envio'] == 'Entregado').sum()/len(df_dash)*100):.1f}%)
-
-🏘️ DISTRIBUCIÓN GEOGRÁFICA:
-- Top Ciudades: {', '.join(df_dash['Ciudad_Destino'].value_counts().head(3).index.tolist())}
-- Ciudades Únicas: {df_dash['Ciudad_Destino'].nunique()}
-
-💻 ANÁLISIS DE CANALES:
-- Canal Físico: {(df_dash['Canal_Venta'] == 'Físico').sum()} transacciones ({((df_dash['Canal_Venta'] == 'Físico').sum()/len(df_dash)*100):.1f}%)
-- Canal Online: {(df_dash['Canal_Venta'] == 'Online').sum()} transacciones ({((df_dash['Canal_Venta'] == 'Online').sum()/len(df_dash)*100):.1f}%)
-- Revenue Físico: ${df_dash[df_dash['Canal_Venta'] == 'Físico']['Revenue'].sum():,.2f}
-- Revenue Online: ${df_dash[df_dash['Canal_Venta'] == 'Online']['Revenue'].sum():,.2f}
-
-🏥 SALUD DE DATOS:
-- Health Score Integrado: {calcular_health_score(df_integrado):.1f}/100
-- Valores Nulos: {int(df_integrado.isna().sum().sum())}
-- Columnas Totales: {len(df_integrado.columns)}
-"""
+                                    # Resumen del dataset e instrucciones para el modelo
+                                    prompt = prompt_merge(df_integrado, cubo, merge['health_merge'])
                                     
                                     status_text.text("🧠 Analizando datos integrados...")
-                                    progress_bar.progress(60)
-                                    
-                                    response = client.chat.completions.create(
-                                        model="llama-3.3-70b-versatile",
-                                        messages=[{
-                                            "role": "user",
-                                            "content": f"""Eres un consultor estratégico senior especializado en análisis de datos integrados, logística y e-commerce.
-
-Analiza estos datos integrados de validación y limpieza:
-
-{resumen}
-
-Genera exactamente 3 párrafos de recomendaciones estratégicas accionables y específicas.
-
-Formato requerido:
-- Párrafo 1: Análisis ejecutivo del desempeño integrado (salud operativa, rentabilidad, satisfacción)
-- Párrafo 2: Recomendación táctica inmediata para optimizar la integración (corto plazo, 1-3 meses)
-- Párrafo 3: Recomendación estratégica para escalar el negocio (mediano-largo plazo, 3-12 meses)
-
-Escribe los 3 párrafos separados por línea en blanco, sin títulos ni numeración."""
-                                        }],
-                                        temperature=0.7,
-                                        max_tokens=1500
-                                    )
-                                    
-                                    status_text.text("✍️ Generando recomendaciones...")
-                                    progress_bar.progress(90)
-                                    
-                                    recomendaciones = response.choices[0].message.content
-                                    
-                                    progress_bar.progress(100)
-                                    time.sleep(0.3)
+                                    # El texto aparece a medida que el modelo lo genera; un resumen ya
+                                    # consultado con los mismos parámetros sale de la caché del servicio
+                                    vista_previa = st.empty()
+                                    with vista_previa.container():
+                                        recomendaciones = st.write_stream(generar_reporte_stream(prompt, groq_api_key))
+                                    vista_previa.empty()
                                     status_text.empty()
-                                    progress_bar.empty()
                                     
                                     # Mostrar resultados con diseño mejorado
                                     st.markdown("""
@@ -1423,7 +1392,6 @@ Escribe los 3 párrafos separados por línea en blanco, sin títulos ni numeraci
                                     """, unsafe_allow_html=True)
                                     
                                 except Exception as e:
-                                    progress_bar.empty()
                                     status_text.empty()
                                     
                                     st.markdown("""
@@ -0,0 +1,131 @@
+import streamlit as st
+import pandas as pd
+import time
+from utils.data_loader import load_clean_csv_file
+from utils.session_init import init_session_state
+from utils.data_cleaning import limpiar_inventario, limpiar_feedback, limpiar_transacciones
+from utils.data_integration import preparar_dashboard_merge
+from utils.report_prompts import (
+    TITULOS_REPORTES, prompt_inventario, prompt_feedback, prompt_transacciones, prompt_merge, armar_reporte_completo
+)
+from utils.report_service import generar_reportes, MAX_CONCURRENCIA
+from utils.session_store import clave_entradas, obtener_resultado, guardar_resultado
+
+# Inicializar session state
+init_session_state("Reportes")
+
+st.set_page_config(
+    page_title="Reportes",
+    page_icon="📑",
+    layout="wide"
+)
+
+st.header("📑 Reportes con IA")
+st.write("Genera en un solo paso los reportes de recomendaciones de todos los dashboards y descárgalos en un único documento.")
+
+# Dataset -> (archivo, función de limpieza, prompt)
+fuentes = {
+    'inventario': (st.session_state.get('inventario_file'), limpiar_inventario, prompt_inventario),
+    'feedback': (st.session_state.get('feedback_file'), limpiar_feedback, prompt_feedback),
+    'transacciones': (st.session_state.get('transacciones_file'), limpiar_transacciones, prompt_transacciones),
+}
+cargados = [nombre for nombre, (archivo, _, _) in fuentes.items() if archivo is not None]
+
+if cargados:
+    # El reporte integrado solo se puede generar con los tres archivos
+    disponibles = cargados + (['merge'] if len(cargados) == len(fuentes) else [])
+    st.info("📋 Reportes a generar: " + ", ".join(TITULOS_REPORTES[nombre] for nombre in disponibles))
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        groq_api_key = st.text_input(
+            "API Key de Groq",
+            type="password",
+            placeholder="Ingresa tu API key aquí...",
+            help="Tu API key se mantiene privada y no se almacena",
+            key="groq_key_reportes"
+        )
+    with col2:
+        max_concurrencia = st.number_input(
+            "Solicitudes simultáneas",
+            min_value=1,
+            max_value=len(disponibles),
+            value=min(MAX_CONCURRENCIA, len(disponibles)),
+            key="concurrencia_reportes"
+        )
+
+    # Los reportes generados se guardan en la sesión asociados a los archivos de origen
+    clave_reportes = (tuple(cargados), clave_entradas(*(fuentes[nombre][0] for nombre in cargados)))
+
+    if st.button("✨ Generar Todos los Reportes", type="primary", disabled=not groq_api_key, key="btn_generar_reportes"):
+        try:
+            with st.spinner("🧹 Preparando resúmenes..."):
+                # Datos limpios desde la caché de DataFrames (los mismos que usan las páginas)
+                limpios = {nombre: load_clean_csv_file(fuentes[nombre][0], fuentes[nombre][1]) for nombre in cargados}
+                prompts = {nombre: fuentes[nombre][2](limpios[nombre]) for nombre in cargados}
+
+                if 'merge' in disponibles:
+                    # Se reutiliza la integración de la página Merge si ya se ejecutó con estos archivos
+                    clave_merge = clave_entradas(*(fuentes[nombre][0] for nombre in ('inventario', 'feedback', 'transacciones')))
+                    merge = obtener_resultado(st.session_state, 'merge_integrado', clave_merge)
+                    if merge is None:
+                        merge = guardar_resultado(
+                            st.session_state, 'merge_integrado', clave_merge,
+                            preparar_dashboard_merge(
+                                limpios['transacciones'], limpios['feedback'], limpios['inventario'], version=clave_merge,
+                            ),
+                        )
+                    prompts['merge'] = prompt_merge(merge['df_integrado'], merge['cubo'], merge['health_merge'])
+
+            with st.spinner(f"🤖 Generando {len(prompts)} reportes en paralelo con Llama 3.3..."):
+                inicio = time.perf_counter()
+                reportes = generar_reportes(prompts, groq_api_key, max_concurrencia=int(max_concurrencia))
+                segundos = time.perf_counter() - inicio
+
+            guardar_resultado(st.session_state, 'reportes_ia', clave_reportes, {
+                'reportes': reportes,
+                'segundos': segundos,
+                'documento': armar_reporte_completo(reportes),
+            })
+        except Exception as e:
+            st.error(f"❌ Error al generar los reportes: {e}")
+
+    paquete = obtener_resultado(st.session_state, 'reportes_ia', clave_reportes)
+    if paquete is not None:
+        reportes = paquete['reportes']
+        fallidos = [nombre for nombre, resultado in reportes.items() if isinstance(resultado, Exception)]
+        if fallidos:
+            st.warning(f"⚠️ {len(fallidos)} de {len(reportes)} reportes no se pudieron generar")
+        else:
+            st.success(f"✅ {len(reportes)} reportes generados en {paquete['segundos']:.1f}s")
+
+        st.download_button(
+            "📥 Descargar Reporte Completo",
+            paquete['documento'],
+            file_name=f"reporte_completo_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.md",
+            mime="text/markdown",
+            key="download_reportes"
+        )
+
+        tabs = st.tabs([TITULOS_REPORTES[nombre] for nombre in reportes])
+        for tab, (nombre, resultado) in zip(tabs, reportes.items()):
+            with tab:
+                if isinstance(resultado, Exception):
+                    st.error(f"**Detalles del error:** {resultado}")
+                else:
+                    st.markdown(resultado)
+
+        st.markdown("""
+        <div style='background: #fff3cd;
+                    border-left: 4px solid #ffc107;
+                    padding: 1rem;
+                    border-radius: 8px;
+                    margin-top: 2rem;'>
+            <small style='color: #856404;'>
+                ⚠️ <strong>Nota:</strong> Estas recomendaciones son generadas por IA y deben ser
+                revisadas por un experto antes de implementarlas.
+            </small>
+        </div>
+        """, unsafe_allow_html=True)
+else:
+    st.warning("⚠️ No hay archivos cargados. Por favor, carga al menos un archivo CSV en la barra lateral")
@@ -0,0 +1,136 @@
+import streamlit as st
+import time
+import plotly.express as px
+from utils.session_init import init_session_state
+from utils.performance import CLAVE_REGISTRO, tabla_spans, resumen_por_etapa, memoria_session_state
+from utils.cache import estadisticas_cache
+from utils.data_cleaning import estadisticas_cache_health_score
+from utils.report_service import estadisticas_cache_reportes
+from utils.pipeline import estadisticas_cache_pasos
+
+# Inicializar session state
+init_session_state("Rendimiento")
+
+st.set_page_config(
+    page_title="Rendimiento",
+    page_icon="⏱️",
+    layout="wide"
+)
+
+st.header("⏱️ Rendimiento de la Sesión")
+st.write("Cuánto tardó cada etapa (carga, limpieza, health score, merge, métricas y gráficas) en las páginas que abriste en esta sesión, si el resultado salió de la caché y cuánta memoria ocupa la sesión.")
+
+registro = st.session_state.get(CLAVE_REGISTRO)
+tabla = tabla_spans(registro.spans if registro is not None else [])
+tabla = tabla[tabla['pagina'] != "Rendimiento"]
+
+if tabla.empty:
+    st.info("📭 Todavía no hay mediciones. Abre alguna página del dashboard con archivos cargados y vuelve aquí.")
+else:
+    # ========== EJECUCIONES ==========
+    superiores = tabla[tabla['nivel'] == 0]
+    ejecuciones = superiores.groupby('ejecucion', sort=False).agg(
+        pagina=('pagina', 'first'),
+        inicio=('inicio', 'min'),
+        segundos=('segundos', 'sum'),
+    ).sort_index(ascending=False)
+    ejecuciones['hora'] = ejecuciones['inicio'].map(lambda t: time.strftime('%H:%M:%S', time.localtime(t)))
+
+    ejecucion = st.selectbox(
+        "Ejecución de página",
+        ejecuciones.index.tolist(),
+        format_func=lambda n: f"#{n} · {ejecuciones.at[n, 'pagina']} · {ejecuciones.at[n, 'hora']} · {ejecuciones.at[n, 'segundos']:.2f} s",
+        key="ejecucion_rendimiento"
+    )
+    spans = tabla[tabla['ejecucion'] == ejecucion]
+    resumen = resumen_por_etapa(spans)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("⏱️ Tiempo Medido", f"{resumen['segundos'].sum():.2f} s")
+    with col2:
+        etapa_lenta = resumen.loc[resumen['segundos'].idxmax()]
+        st.metric("🐢 Etapa Más Lenta", etapa_lenta['etapa'], f"{etapa_lenta['segundos']:.2f} s", delta_color="off")
+    with col3:
+        st.metric("✅ Hits de Caché", int(resumen['hits'].sum()))
+    with col4:
+        st.metric("❌ Misses de Caché", int(resumen['misses'].sum()))
+
+    errores = spans[spans['error'].notna()]
+    if not errores.empty:
+        st.warning("⚠️ Pasos con error: " + "; ".join(f"**{fila.nombre}** ({fila.error})" for fila in errores.itertuples()))
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.markdown("#### ⏳ Tiempo por Etapa")
+        fig_etapas = px.bar(
+            resumen,
+            x='segundos',
+            y='etapa',
+            orientation='h',
+            color='etapa',
+            text=resumen['segundos'].map(lambda s: f"{s:.3f} s"),
+            labels={'segundos': 'Segundos', 'etapa': 'Etapa'},
+        )
+        fig_etapas.update_layout(height=350, showlegend=False, yaxis={'categoryorder': 'array', 'categoryarray': resumen['etapa'].tolist()[::-1]})
+        st.plotly_chart(fig_etapas, use_container_width=True)
+    with col2:
+        st.markdown("#### 📋 Resumen")
+        st.dataframe(
+            resumen.rename(columns={'etapa': 'Etapa', 'segundos': 'Segundos', 'cpu_segundos': 'CPU (s)',
+                                    'spans': 'Llamadas', 'hits': 'Hits', 'misses': 'Misses'}).round(3),
+            use_container_width=True,
+            hide_index=True
+        )
+
+    st.markdown("#### 🔍 Detalle de Pasos")
+    detalle = spans.assign(
+        paso=spans['nivel'].map(lambda n: " " * n + ("└ " if n else "")) + spans['nombre'],
+        cache=spans['cache'].fillna('—'),
+        error=spans['error'].fillna(''),
+    )
+    st.dataframe(
+        detalle[['paso', 'etapa', 'segundos', 'cpu_segundos', 'cache', 'filas_entrada', 'filas_salida', 'error']].rename(columns={
+            'paso': 'Paso', 'etapa': 'Etapa', 'segundos': 'Segundos', 'cpu_segundos': 'CPU (s)', 'cache': 'Caché',
+            'filas_entrada': 'Filas Entrada', 'filas_salida': 'Filas Salida', 'error': 'Error'
+        }).round(4),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    with st.expander("🕒 Historial de ejecuciones"):
+        st.dataframe(
+            ejecuciones[['pagina', 'hora', 'segundos']].rename(columns={'pagina': 'Página', 'hora': 'Hora', 'segundos': 'Segundos'}).round(3),
+            use_container_width=True
+        )
+
+    if st.button("🗑️ Borrar mediciones", key="btn_borrar_mediciones"):
+        registro.limpiar()
+        st.rerun()
+
+# ========== CACHÉS ==========
+st.markdown("---")
+st.markdown("### 🗄️ Cachés (compartidas por todas las sesiones)")
+col1, col2, col3, col4 = st.columns(4)
+for columna, titulo, estadisticas in [
+    (col1, "📊 DataFrames", estadisticas_cache()),
+    (col2, "🧹 Pasos de Limpieza", estadisticas_cache_pasos()),
+    (col3, "🏥 Health Score", estadisticas_cache_health_score()),
+    (col4, "🤖 Reportes IA", estadisticas_cache_reportes()),
+]:
+    with columna:
+        consultas = estadisticas['hits'] + estadisticas['misses']
+        st.markdown(f"**{titulo}**")
+        st.metric("Tasa de aciertos", f"{estadisticas['hits'] / consultas * 100:.0f}%" if consultas else "—")
+        st.caption(f"{estadisticas['hits']} hits · {estadisticas['misses']} misses · {estadisticas['entradas']} entradas")
+
+# ========== MEMORIA DE LA SESIÓN ==========
+st.markdown("---")
+st.markdown("### 💾 Memoria en st.session_state")
+memoria = memoria_session_state(st.session_state)
+st.metric("Total", f"{memoria['megabytes'].sum():.2f} MB")
+st.dataframe(
+    memoria.rename(columns={'clave': 'Clave', 'tipo': 'Tipo', 'megabytes': 'MB'}).round(3),
+    use_container_width=True,
+    hide_index=True
+)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Pipeline batch sin Streamlit: limpieza → integración → métricas.
+
+Uso:
+    python pipeline_batch.py \
+        --inventario data/inventario_central_v2.csv \
+        --feedback data/feedback_clientes_v2.csv \
+        --transacciones data/transacciones_logistica_v2.csv \
+        --salida salida/merge.parquet \
+        --auditoria salida/auditoria.json \
+        --workers 3 \
+        --trazas salida/trazas.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from utils.columnar_store import cargar_ruta_columnar, configurar_almacen
+from utils.data_cleaning import (
+    limpiar_inventario, limpiar_feedback, limpiar_transacciones, generar_audit_summary, limpiar_datasets_en_paralelo
+)
+from utils.data_integration import integrar_datos, crear_metricas_nuevas
+from utils.tracing import configurar_trazas, SinkJSONL
+
+DATASETS = [
+    ('inventario', 'Inventario', limpiar_inventario),
+    ('feedback', 'Feedback', limpiar_feedback),
+    ('transacciones', 'Transacciones', limpiar_transacciones),
+]
+
+
+def _formato_salida(ruta, formato):
+    if formato:
+        return formato
+    return 'csv' if ruta.lower().endswith('.csv') else 'parquet'
+
+
+def _a_json(valor):
+    """Convierte escalares de numpy/pandas a tipos nativos para json.dump."""
+    return valor.item() if hasattr(valor, 'item') else str(valor)
+
+
+def ejecutar_pipeline(rutas, ruta_salida, formato=None, ruta_auditoria=None, workers=1):
+    """
+    Ejecuta el pipeline completo sobre los tres archivos y escribe los resultados.
+
+    Parámetros:
+    -----------
+    rutas : dict
+        Rutas de los CSV con las claves 'inventario', 'feedback' y 'transacciones'
+    ruta_salida : str
+        Ruta del dataset integrado con métricas
+    formato : str, opcional
+        'parquet' o 'csv'. Si es None se deduce de la extensión de ruta_salida
+    ruta_auditoria : str, opcional
+        Ruta del JSON con los resúmenes de auditoría y los tiempos por etapa
+    workers : int
+        Número de procesos (o hilos, si los datos son muy grandes) para limpiar en paralelo
+
+    Retorna:
+    --------
+    dict : Resúmenes de auditoría, tiempos por etapa (segundos) y tamaño del resultado
+    """
+    tiempos = {}
+
+    crudos = {}
+    for nombre, _, _ in DATASETS:
+        inicio = time.perf_counter()
+        crudos[nombre] = cargar_ruta_columnar(rutas[nombre], nombre)
+        tiempos[f'carga_{nombre}'] = time.perf_counter() - inicio
+
+    limpios, tiempos_limpieza = limpiar_datasets_en_paralelo(
+        {nombre: (funcion, crudos[nombre]) for nombre, _, funcion in DATASETS},
+        modo='auto' if workers > 1 else 'secuencial',
+        max_workers=workers,
+    )
+    tiempos.update({f'limpieza_{nombre}': segundos for nombre, segundos in tiempos_limpieza.items()})
+
+    inicio = time.perf_counter()
+    auditorias = [
+        generar_audit_summary(crudos[nombre], limpios[nombre], titulo)
+        for nombre, titulo, _ in DATASETS
+    ]
+    tiempos['auditoria'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    df_integrado = integrar_datos(limpios['transacciones'], limpios['feedback'], limpios['inventario'])
+    tiempos['integracion'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    df_integrado = crear_metricas_nuevas(df_integrado, copiar=False, usar_cache=False)
+    tiempos['metricas'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    directorio = os.path.dirname(os.path.abspath(ruta_salida))
+    os.makedirs(directorio, exist_ok=True)
+    if _formato_salida(ruta_salida, formato) == 'csv':
+        df_integrado.to_csv(ruta_salida, index=False)
+    else:
+        df_integrado.to_parquet(ruta_salida, index=False)
+    tiempos['escritura'] = time.perf_counter() - inicio
+
+    resultado = {
+        'auditoria': auditorias,
+        'tiempos_segundos': tiempos,
+        'registros_integrados': len(df_integrado),
+        'columnas_integradas': len(df_integrado.columns),
+        'salida': ruta_salida,
+    }
+
+    if ruta_auditoria:
+        os.makedirs(os.path.dirname(os.path.abspath(ruta_auditoria)), exist_ok=True)
+        with open(ruta_auditoria, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2, default=_a_json)
+
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Limpieza, integración y métricas sin Streamlit")
+    parser.add_argument('--inventario', required=True, help="CSV de inventario")
+    parser.add_argument('--feedback', required=True, help="CSV de feedback de clientes")
+    parser.add_argument('--transacciones', required=True, help="CSV de transacciones logísticas")
+    parser.add_argument('--salida', required=True, help="Ruta del dataset integrado (.parquet o .csv)")
+    parser.add_argument('--formato', choices=['parquet', 'csv'], help="Formato de salida (por defecto según la extensión)")
+    parser.add_argument('--auditoria', help="Ruta del JSON con auditoría y tiempos por etapa")
+    parser.add_argument('--workers', type=int, default=1, help="Procesos para limpiar los datasets en paralelo")
+    parser.add_argument('--sin-cache', action='store_true', help="No usar el almacén columnar en disco")
+    parser.add_argument('--trazas', help="Archivo JSON lines con una traza por etapa y paso de limpieza "
+                                         "(tiempo, CPU, pico de memoria, filas y errores)")
+    args = parser.parse_args(argv)
+
+    if args.sin_cache:
+        configurar_almacen(activo=False)
+    if args.trazas:
+        configurar_trazas(SinkJSONL(args.trazas), memoria=True)
+
+    rutas = {'inventario': args.inventario, 'feedback': args.feedback, 'transacciones': args.transacciones}
+    try:
+        resultado = ejecutar_pipeline(rutas, args.salida, args.formato, args.auditoria, args.workers)
+    finally:
+        if args.trazas:
+            configurar_trazas()
+
+    print(f"\n✅ {resultado['registros_integrados']} registros integrados → {resultado['salida']}")
+    print("\n⏱️ Tiempos por etapa:")
+    for etapa, segundos in resultado['tiempos_segundos'].items():
+        print(f"   {etapa:<25} {segundos:8.3f} s")
+    for auditoria in resultado['auditoria']:
+        print(f"\n📋 {auditoria['dataset']}: health score "
+              f"{auditoria['health_score_antes']:.1f} → {auditoria['health_score_despues']:.1f}")
+        for error in auditoria['errores_limpieza']:
+            print(f"   ⚠️ Paso '{error['paso']}' omitido ({error['tipo']}: {error['mensaje']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
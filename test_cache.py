@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la caché LRU de DataFrames
+"""
+import pandas as pd
+from utils.cache import CacheLRU, hash_contenido, clave_cache, obtener_o_calcular, limpiar_cache, estadisticas_cache
+
+
+def test_expulsa_por_presupuesto_de_memoria():
+    cache = CacheLRU(memoria_maxima_bytes=100)
+    cache.guardar('a', 1, 40)
+    cache.guardar('b', 2, 40)
+    cache.obtener('a')  # 'a' pasa a ser la más reciente
+    cache.guardar('c', 3, 40)
+
+    assert cache.obtener('b') is None
+    assert cache.obtener('a') == 1
+    assert cache.obtener('c') == 3
+    assert cache.estadisticas()['bytes_usados'] == 80
+
+
+def test_clave_depende_del_contenido_y_parametros():
+    assert clave_cache(b'a,b\n1,2\n', 'csv') == clave_cache(b'a,b\n1,2\n', 'csv')
+    assert clave_cache(b'a,b\n1,2\n', 'csv') != clave_cache(b'a,b\n1,3\n', 'csv')
+    assert clave_cache(b'x', 'limpiar', metodo='Mediana') != clave_cache(b'x', 'limpiar', metodo='Media')
+
+
+def test_obtener_o_calcular_reutiliza_el_dataframe():
+    limpiar_cache()
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        return pd.DataFrame({'a': [1, 2, 3]})
+
+    clave = clave_cache(b'contenido', 'csv')
+    df1 = obtener_o_calcular(clave, calcular)
+    df1['nueva'] = 0  # agregar columnas no altera la copia cacheada
+    df2 = obtener_o_calcular(clave, calcular)
+
+    assert len(llamadas) == 1
+    assert list(df2.columns) == ['a']
+    assert estadisticas_cache()['hits'] == 1
+
+
+def test_hashes_recordados_cuentan_en_el_presupuesto():
+    limpiar_cache()
+    contenido = b'x' * 1000
+    hash_contenido(contenido)
+    assert estadisticas_cache()['bytes_usados'] == 1000
+    assert estadisticas_cache()['hits'] == 0
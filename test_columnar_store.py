@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Pruebas del almacén columnar en disco
+"""
+import os
+
+import pandas as pd
+
+from utils import columnar_store
+
+
+def _almacen_temporal(monkeypatch, directorio):
+    """Almacén activo en directorio; monkeypatch restaura la configuración al terminar."""
+    monkeypatch.setattr(columnar_store, 'DIRECTORIO_ALMACEN', str(directorio))
+    monkeypatch.setattr(columnar_store, 'ALMACEN_ACTIVO', True)
+    monkeypatch.setattr(columnar_store, 'MEMORIA_ALMACEN_MB', columnar_store.MEMORIA_ALMACEN_MB)
+
+
+def test_segunda_lectura_sale_del_almacen(tmp_path, monkeypatch):
+    _almacen_temporal(monkeypatch, tmp_path / 'almacen')
+    ruta = tmp_path / 'transacciones.csv'
+    ruta.write_text(
+        'Transaccion_ID,SKU_ID,Fecha_Venta,Cantidad_Vendida,Estado_Envio\n'
+        'TRX-1,PROD-1,25/04/2025,-5,Entregado\n'
+        'TRX-2,PROD-2,29/07/2025,12,\n',
+        encoding='utf-8'
+    )
+    primera = columnar_store.cargar_ruta_columnar(str(ruta))
+    segunda = columnar_store.cargar_ruta_columnar(str(ruta))
+
+    assert segunda.equals(primera)
+    assert segunda.attrs['esquema'] == 'transacciones'
+    assert len(list((tmp_path / 'almacen').glob('*.crudo.*.arrow'))) == 1
+
+
+def test_version_limpia_no_vuelve_a_cargar_el_crudo(tmp_path, monkeypatch):
+    _almacen_temporal(monkeypatch, tmp_path)
+    cargas = []
+
+    def cargar():
+        cargas.append(1)
+        return columnar_store.leer_csv_con_esquema(b'SKU_ID,Stock_Actual\nPROD-1,-3\n')
+
+    def limpiar(df):
+        df['Stock_Actual'] = df['Stock_Actual'].abs()
+        return df
+
+    primera = columnar_store.limpiar_columnar('hash-de-prueba', limpiar, cargar)
+    segunda = columnar_store.limpiar_columnar('hash-de-prueba', limpiar, cargar)
+
+    assert len(cargas) == 1
+    assert segunda['Stock_Actual'].tolist() == [3]
+    assert segunda.equals(primera)
+
+
+def test_poda_elimina_los_menos_usados(tmp_path, monkeypatch):
+    _almacen_temporal(monkeypatch, tmp_path)
+    df = pd.DataFrame({'a': range(1000)})
+    for i, hash_contenido in enumerate(['h1', 'h2']):
+        columnar_store.obtener_o_guardar(hash_contenido, 'crudo', lambda: df)
+        ruta, = tmp_path.glob(f'{hash_contenido}.*.arrow')
+        os.utime(ruta, ns=(i, i))
+    # Caben dos archivos; leer h1 lo marca como el más reciente
+    monkeypatch.setattr(columnar_store, 'MEMORIA_ALMACEN_MB', 2.5 * ruta.stat().st_size / 1024 ** 2)
+    assert columnar_store.obtener_o_guardar('h1', 'crudo', lambda: None).equals(df)
+
+    columnar_store.obtener_o_guardar('h3', 'crudo', lambda: df)
+
+    assert sorted(p.name.split('.')[0] for p in tmp_path.glob('*.arrow')) == ['h1', 'h3']
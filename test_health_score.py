@@ -0,0 +1,100 @@
+"""
+Pruebas del health score vectorizado
+"""
+import numpy as np
+import pandas as pd
+
+from utils.data_cleaning import (
+    calcular_health_score, calcular_health_score_detallado, generar_audit_summary,
+    estadisticas_cache_health_score, limpiar_cache_health_score,
+)
+from utils.schemas import leer_csv_con_esquema
+
+ARCHIVOS = {
+    'inventario': 'data/inventario_central_v2.csv',
+    'feedback': 'data/feedback_clientes_v2.csv',
+    'transacciones': 'data/transacciones_logistica_v2.csv',
+}
+
+
+def health_score_referencia(df):
+    """Versión original (bucle por columna, modifica df), usada como referencia."""
+    n_rows, n_cols = df.shape
+    if 'Comentario_Texto' in df.columns:
+        df.loc[df['Comentario_Texto'] == "---", 'Comentario_Texto'] = np.nan
+    if 'Categoria' in df.columns:
+        df.loc[df['Categoria'] == "???", 'Categoria'] = np.nan
+    null_global_pct = df.isna().sum().sum() / (n_rows * n_cols) * 100
+    dup_ratio = int(df.duplicated().sum()) / n_rows * 100
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    total_outliers = 0
+    for col in numeric_cols:
+        s = pd.to_numeric(df[col], errors='coerce').dropna()
+        if len(s) > 0:
+            q1, q3 = s.quantile(0.25), s.quantile(0.75)
+            iqr = q3 - q1
+            if iqr > 0:
+                total_outliers += ((s < q1 - 1.5 * iqr) | (s > q3 + 1.5 * iqr)).sum()
+    outlier_ratio = total_outliers / (n_rows * len(numeric_cols)) * 100 if len(numeric_cols) else 0.0
+    negative_count = 0
+    for col in ['Stock_Actual', 'Cantidad_Vendida']:
+        if col in df.columns:
+            negative_count += (pd.to_numeric(df[col], errors='coerce') < 0).sum()
+    negative_ratio = negative_count / n_rows * 100
+    score = 100 - (null_global_pct * 5 + dup_ratio * 7 + outlier_ratio * 3 + negative_ratio * 7)
+    return float(max(0, min(100, score)))
+
+
+def health_score_referencia_nulos(df):
+    """Nulos que contaba la versión original (después de convertir centinelas)."""
+    health_score_referencia(df)
+    return df.isna().sum().sum()
+
+
+def _cargar(nombre):
+    with open(ARCHIVOS[nombre], 'rb') as f:
+        return leer_csv_con_esquema(f.read(), nombre)
+
+
+def test_health_score_igual_a_referencia_y_sin_modificar_entrada():
+    for nombre in ARCHIVOS:
+        df = _cargar(nombre)
+        # Filas repetidas en las que solo cambia un centinela por un nulo
+        df = pd.concat([df, df.head(20)], ignore_index=True)
+        original = df.copy()
+
+        detalle = calcular_health_score_detallado(df)
+
+        pd.testing.assert_frame_equal(df, original)
+        assert detalle['score'] == health_score_referencia(df.copy())
+        assert detalle['duplicados'] == 20
+        assert detalle['nulos'] == health_score_referencia_nulos(df.copy())
+
+
+def test_audit_summary_cuenta_centinelas_como_nulos():
+    df = pd.DataFrame({'Categoria': ['???', 'Laptops', None], 'Stock_Actual': [1.0, -2.0, 3.0]})
+    audit = generar_audit_summary(df, df.dropna(), "Prueba")
+    assert audit['nulos_antes'] == 2
+    assert audit['valores_invalidos_antes'] == 1
+    assert audit['health_score_antes'] == calcular_health_score(df)
+    assert df['Categoria'].iloc[0] == '???'
+
+
+def test_cache_health_score_por_version():
+    limpiar_cache_health_score()
+    df = _cargar('transacciones')
+
+    primero = calcular_health_score_detallado(df, 'v1')
+    audit = generar_audit_summary(df, df, "Transacciones", version_antes='v1', version_despues='v1')
+    stats = estadisticas_cache_health_score()
+    assert (stats['misses'], stats['hits']) == (1, 2)
+    assert audit['health_score_antes'] == primero['score']
+
+    # Sin versión se recalcula siempre: un reemplazo de texto que no cambia forma ni
+    # sumas se refleja en el score
+    feedback = _cargar('feedback')
+    antes = calcular_health_score(feedback)
+    centinelas = feedback.index[feedback['Comentario_Texto'] == '---'][:39]
+    feedback.loc[centinelas, 'Comentario_Texto'] = 'Lento'
+    assert calcular_health_score(feedback) > antes
+    assert estadisticas_cache_health_score()['entradas'] == 1
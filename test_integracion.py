@@ -0,0 +1,118 @@
+"""
+Pruebas de la integración de datasets (claves codificadas y merges)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_cleaning import FUNCIONES_LIMPIEZA
+from utils.data_integration import integrar_datos, crear_metricas_nuevas
+from utils.join_keys import codificar_claves, primera_posicion, reporte_join
+from utils.schemas import leer_csv_con_esquema
+
+ARCHIVOS = {
+    'inventario': 'data/inventario_central_v2.csv',
+    'feedback': 'data/feedback_clientes_v2.csv',
+    'transacciones': 'data/transacciones_logistica_v2.csv',
+}
+
+
+def _cargar_limpios():
+    limpios = {}
+    for nombre, ruta in ARCHIVOS.items():
+        with open(ruta, 'rb') as f:
+            limpios[nombre] = FUNCIONES_LIMPIEZA[nombre](leer_csv_con_esquema(f.read(), nombre))
+    return limpios
+
+
+def test_integrar_datos_con_claves_codificadas_igual_a_merge_por_texto():
+    limpios = _cargar_limpios()
+    fuentes = (limpios['transacciones'], limpios['feedback'], limpios['inventario'])
+    pd.testing.assert_frame_equal(integrar_datos(*fuentes), integrar_datos(*fuentes, codificar_claves=False))
+
+
+def test_codificar_claves_prefijo_entero_y_diccionario():
+    (a, b), modo = codificar_claves(pd.Series(['TRX-10', None, 'TRX-7'], dtype='str'),
+                                    pd.Series(['TRX-7'], dtype='str'))
+    assert modo == 'prefijo_entero'
+    assert a.tolist() == [10, -1, 7] and b.tolist() == [7]
+
+    # '007' y '7' darían el mismo entero: se usa el diccionario compartido
+    (a, b), modo = codificar_claves(pd.Series(['TRX-7', 'TRX-007'], dtype='str'),
+                                    pd.Series(['TRX-007', 'X-1'], dtype='str'))
+    assert modo == 'diccionario'
+    assert a[1] == b[0] and a[0] != a[1] and b[1] not in a
+    assert np.issubdtype(a.dtype, np.int64)
+
+
+def test_busqueda_inventario_igual_a_merge_y_respaldo_con_sku_repetido():
+    hechos = pd.DataFrame({'SKU_ID': pd.array(['P-2', 'P-9', 'P-1', 'P-2', None], dtype='str'),
+                           'Cantidad_Vendida': [1, 2, 3, 4, 5]})
+    inventario = pd.DataFrame({'SKU_ID': pd.array(['P-1', 'P-2', None], dtype='str'),
+                               'Costo_Unitario_USD': [10.0, 20.0, 30.0]})
+    feedback = pd.DataFrame({'Transaccion_ID': pd.array(['T-1', 'T-2', 'T-3', 'T-4', 'T-5'], dtype='str')})
+    transacciones = hechos.assign(Transaccion_ID=feedback['Transaccion_ID'])
+
+    for inv in [inventario, pd.concat([inventario, inventario.head(1)], ignore_index=True)]:
+        for codificar in [True, False]:
+            esperado = integrar_datos(transacciones, feedback, inv, codificar_claves=codificar, busqueda_inventario=False)
+            if len(inv) > len(inventario):
+                with pytest.warns(RuntimeWarning, match='SKU_ID repetido'):
+                    obtenido = integrar_datos(transacciones, feedback, inv, codificar_claves=codificar)
+            else:
+                obtenido = integrar_datos(transacciones, feedback, inv, codificar_claves=codificar)
+            pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+def test_reporte_join_cuenta_huerfanas_y_repetidas_como_merge():
+    izquierda = pd.Series(['A', 'B', 'B', 'C', None], dtype='str')
+    derecha = pd.Series(['B', 'B', 'D', None, 'A'], dtype='str')
+    reporte = reporte_join(izquierda, derecha)
+    esperado = len(pd.merge(izquierda.to_frame('k'), derecha.to_frame('k'), on='k'))
+    assert reporte['filas_resultado'] == esperado == 6
+    assert (reporte['claves_coincidentes'], reporte['claves_solo_izquierda'], reporte['claves_solo_derecha']) == (3, 1, 1)
+    assert reporte['huerfanas_izquierda'].tolist() == ['C'] and reporte['huerfanas_derecha'].tolist() == ['D']
+    assert reporte['claves_repetidas_izquierda'] == reporte['claves_repetidas_derecha'] == 1
+    assert reporte['filas_extra_por_repetidas'] == 2
+    # Primera aparición de cada código con índices repetidos (el 3 no aparece)
+    codigos = np.array([2, 0, 2, 0, 1])
+    assert primera_posicion(codigos, 4).tolist() == [1, 4, 0, 5]
+    assert primera_posicion(codigos, 4, np.arange(5) > 0).tolist() == [1, 4, 2, 5]
+
+    limpios = _cargar_limpios()
+    fuentes = (limpios['transacciones'], limpios['feedback'], limpios['inventario'])
+    for codificar in [True, False]:
+        df, reportes = integrar_datos(*fuentes, codificar_claves=codificar, reporte=True)
+        assert reportes['inventario']['filas_resultado'] == len(df)
+        assert reportes['transaccion_feedback']['filas_solo_izquierda'] > 0
+
+
+def _metricas_referencia(df):
+    """Cálculo original de crear_metricas_nuevas con operaciones de pandas."""
+    df = df.copy()
+    df['Rating_Servicio'] = (df['Rating_Producto'] * df['Rating_Logistica']) / 5
+    df['Margen_Unitario_Pct'] = ((df['Precio_Venta_Final'] - df['Costo_Unitario_USD'])
+                                 / df['Precio_Venta_Final'] * 100).fillna(0).clip(lower=0)
+    cantidad = df['Cantidad_Vendida'].replace(0, 1)
+    ganancia_unitaria = df['Precio_Venta_Final'] - df['Costo_Unitario_USD'] - df['Costo_Envio'].fillna(0) / cantidad
+    df['Ganancia_Neta_Total'] = (ganancia_unitaria * cantidad).clip(lower=0).fillna(0)
+    df['Margen_Real_Pct'] = (df['Ganancia_Neta_Total'] / (df['Precio_Venta_Final'] * cantidad) * 100
+                             ).fillna(0).clip(lower=-100, upper=100)
+    return df
+
+
+def test_crear_metricas_nuevas_igual_a_referencia_y_copiar():
+    df = pd.DataFrame({
+        'Rating_Producto': [5, 3, 1, 4, 2],
+        'Rating_Logistica': [4, 5, 2, 1, 3],
+        'Precio_Venta_Final': [100.0, 0.0, 50.0, np.nan, 10.0],
+        'Costo_Unitario_USD': [40.0, 10.0, 80.0, 5.0, 0.0],
+        'Cantidad_Vendida': [2, 0, 3, 1, 0],
+        'Costo_Envio': [10.0, np.nan, 5.0, 2.0, 0.0],
+    })
+    original = df.copy()
+    pd.testing.assert_frame_equal(crear_metricas_nuevas(df), _metricas_referencia(df))
+    pd.testing.assert_frame_equal(df, original)
+
+    resultado = crear_metricas_nuevas(df, copiar=False)
+    assert resultado is df and 'Margen_Real_Pct' in df.columns
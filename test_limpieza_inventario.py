@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Pruebas de las funciones vectorizadas de limpieza de inventario
+"""
+import numpy as np
+import pandas as pd
+from limpieza_datos_inventario import imputar_valores_columna_categoria, limpiar_atipicos_costo_unitario
+
+
+def _imputar_categoria_referencia(df, remplazo):
+    """Versión fila por fila original, usada como referencia."""
+    df['Categoria'] = df['Categoria'].replace({'LAPTOP': 'Laptops', 'smart-phone': 'Smartphones', '???': np.nan})
+    df['Categoria'] = df['Categoria'].astype(str)
+    mask_desconocidos = df['Categoria'].isna() | (df['Categoria'] == 'nan')
+    categorias_validas = df.loc[~mask_desconocidos, 'Categoria'].unique()
+    medidas = {}
+    for cat in categorias_validas:
+        datos_cat = df[df['Categoria'] == cat]['Costo_Unitario_USD']
+        if remplazo == 'moda':
+            medidas[cat] = datos_cat.mode()[0]
+        elif remplazo == 'mediana':
+            medidas[cat] = datos_cat.median()
+        else:
+            medidas[cat] = datos_cat.mean()
+    for idx in df[mask_desconocidos].index:
+        costo = df.loc[idx, 'Costo_Unitario_USD']
+        df.loc[idx, 'Categoria'] = min(medidas.keys(), key=lambda cat: abs(medidas[cat] - costo))
+    return df
+
+
+def _inventario_aleatorio(n, semilla):
+    rng = np.random.default_rng(semilla)
+    categorias = np.array(['Laptops', 'LAPTOP', 'Monitores', 'smart-phone', 'Tablets', 'Accesorios', '???'])
+    return pd.DataFrame({
+        'Categoria': rng.choice(categorias, n),
+        # Costos enteros para forzar empates exactos entre categorías
+        'Costo_Unitario_USD': rng.integers(0, 40, n).astype(float),
+    })
+
+
+def test_imputacion_categoria_igual_a_la_referencia():
+    for remplazo in ['moda', 'mediana', 'media']:
+        for semilla in range(5):
+            df = _inventario_aleatorio(300, semilla)
+            df.loc[df.index[::37], 'Costo_Unitario_USD'] = np.nan
+            esperado = _imputar_categoria_referencia(df.copy(), remplazo)
+            obtenido = imputar_valores_columna_categoria(df.copy(), remplazo)
+            assert obtenido['Categoria'].tolist() == esperado['Categoria'].tolist(), (remplazo, semilla)
+
+
+def test_empate_favorece_la_primera_categoria():
+    df = pd.DataFrame({
+        'Categoria': ['B', 'A', '???', '???'],
+        'Costo_Unitario_USD': [20.0, 10.0, 15.0, np.nan],
+    })
+    resultado = imputar_valores_columna_categoria(df, 'media')
+    assert resultado['Categoria'].tolist() == ['B', 'A', 'B', 'B']
+
+
+def test_atipicos_costo_unitario_igual_a_la_referencia():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        'Categoria': rng.choice(['Laptops', 'Monitores', 'Tablets', 'Accesorios'], 500),
+        'Costo_Unitario_USD': rng.choice([5.0, 20.0, 100.0, 250.5, 800.0, 15000.0], 500),
+    })
+    costo = df['Costo_Unitario_USD']
+    for remplazo in ['moda', 'mediana', 'media']:
+        esperado = costo.copy()
+        for cat in df['Categoria'].unique():
+            datos = costo[df['Categoria'] == cat]
+            medida = {'moda': datos.mode()[0], 'mediana': datos.median(), 'media': datos.mean()}[remplazo]
+            esperado[(df['Categoria'] == cat) & ((costo > 10000) | (costo < 30))] = medida
+        obtenido = limpiar_atipicos_costo_unitario(df.copy(), remplazo)['Costo_Unitario_USD']
+        np.testing.assert_allclose(obtenido.to_numpy(), esperado.to_numpy(), rtol=1e-12)
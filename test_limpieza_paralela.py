@@ -0,0 +1,40 @@
+"""
+Pruebas de la limpieza concurrente de datasets
+"""
+import pandas as pd
+import pytest
+
+from utils.data_cleaning import limpiar_datasets_en_paralelo, FUNCIONES_LIMPIEZA
+from utils.schemas import leer_csv_con_esquema
+
+ARCHIVOS = {
+    'inventario': 'data/inventario_central_v2.csv',
+    'feedback': 'data/feedback_clientes_v2.csv',
+    'transacciones': 'data/transacciones_logistica_v2.csv',
+}
+
+
+def _cargar_crudos():
+    crudos = {}
+    for nombre, ruta in ARCHIVOS.items():
+        with open(ruta, 'rb') as f:
+            crudos[nombre] = leer_csv_con_esquema(f.read(), nombre)
+    return crudos
+
+
+def test_limpieza_paralela_igual_a_secuencial():
+    crudos = _cargar_crudos()
+    esperados = {nombre: FUNCIONES_LIMPIEZA[nombre](df) for nombre, df in crudos.items()}
+
+    for modo in ['procesos', 'hilos', 'auto']:
+        limpios, tiempos = limpiar_datasets_en_paralelo(crudos, modo=modo)
+        assert set(tiempos) == set(ARCHIVOS)
+        for nombre, df in limpios.items():
+            pd.testing.assert_frame_equal(df, esperados[nombre])
+
+
+def test_limpieza_paralela_usa_hilos_si_la_funcion_no_se_puede_serializar():
+    df = pd.DataFrame({'a': [1, 2, 3]})
+    with pytest.warns(RuntimeWarning, match="usando hilos"):
+        limpios, _ = limpiar_datasets_en_paralelo({'x': (lambda d: d * 2, df)}, modo='procesos')
+    assert limpios['x']['a'].tolist() == [2, 4, 6]
@@ -0,0 +1,54 @@
+"""
+Pruebas del registro de rendimiento por sesión
+"""
+import pandas as pd
+import pytest
+
+from utils import columnar_store
+from utils.cache import limpiar_cache
+from utils.data_cleaning import limpiar_inventario
+from utils.data_loader import load_clean_csv_file
+from utils.performance import CLAVE_REGISTRO, iniciar_ejecucion, memoria_session_state, resumen_por_etapa, tabla_spans
+from utils.tracing import fijar_sinks_contexto
+
+INVENTARIO = "data/inventario_central_v2.csv"
+
+
+def test_registro_por_ejecucion_con_hits_y_pasos_anidados(tmp_path, monkeypatch):
+    # Almacén columnar vacío: la primera carga tiene que limpiar (y trazar sus pasos)
+    monkeypatch.setattr(columnar_store, 'DIRECTORIO_ALMACEN', str(tmp_path))
+    monkeypatch.setattr(columnar_store, 'ALMACEN_ACTIVO', True)
+    with open(INVENTARIO, 'rb') as f:
+        contenido = f.read()
+    limpiar_cache()
+    session_state = {}
+    try:
+        iniciar_ejecucion(session_state, "Inventario")
+        load_clean_csv_file(contenido, limpiar_inventario)
+        iniciar_ejecucion(session_state, "Inventario")
+        load_clean_csv_file(contenido, limpiar_inventario)
+    finally:
+        fijar_sinks_contexto()
+
+    tabla = tabla_spans(session_state[CLAVE_REGISTRO].spans)
+    primera, segunda = tabla[tabla['ejecucion'] == 1], tabla[tabla['ejecucion'] == 2]
+
+    # Los pasos de limpieza cuelgan de cargar_limpio y heredan su etapa
+    paso = primera[primera['nombre'] == 'imputar_valores_columna_categoria'].iloc[0]
+    assert paso['nivel'] == 2 and paso['etapa'] == 'Limpieza'
+    assert (primera['pagina'] == "Inventario").all()
+
+    # El resumen solo suma el span de nivel 0 de cada etapa
+    resumen = resumen_por_etapa(primera).set_index('etapa')
+    nivel_0 = primera.loc[primera['nivel'] == 0, 'segundos'].sum()
+    assert resumen['segundos'].sum() == pytest.approx(nivel_0)
+    assert resumen.at['Limpieza', 'misses'] == 1
+    assert resumen_por_etapa(segunda).set_index('etapa').at['Limpieza', 'hits'] == 1
+    assert segunda['nombre'].tolist() == ['cargar_limpio']
+
+
+def test_memoria_session_state_ordenada_por_tamano():
+    session_state = {'df': pd.DataFrame({'a': range(10_000)}), 'nombre': "Inventario"}
+    memoria = memoria_session_state(session_state)
+    assert memoria['clave'].tolist() == ['df', 'nombre']
+    assert memoria.at[0, 'megabytes'] > 0.07
@@ -0,0 +1,65 @@
+"""
+Pruebas del motor declarativo de las pipelines de limpieza
+"""
+import pandas as pd
+
+from limpieza_datos_feedback import manejar_outliers_edad_cliente
+from limpieza_datos_transacciones import corregir_valores_negativos_cantidad_vendida
+from utils.data_cleaning import PIPELINE_FEEDBACK, PIPELINE_INVENTARIO, errores_limpieza, limpiar_feedback
+from utils.pipeline import limpiar_cache_pasos
+from utils.schemas import leer_csv_con_esquema
+from utils.tracing import capturar_trazas
+
+INVENTARIO = "data/inventario_central_v2.csv"
+
+
+def test_etapas_y_errores_por_paso():
+    # Los pasos de feedback no comparten columnas: se ejecutan en una sola etapa
+    assert len(PIPELINE_FEEDBACK.etapas) == 1
+    # La imputación de categoría lee el costo que corrige limpiar_atipicos_costo_unitario
+    assert [paso.nombre for paso in PIPELINE_INVENTARIO.etapas[1]][0] == 'imputar_valores_columna_categoria'
+
+    df = pd.DataFrame({
+        'Rating_Producto': [1, 5, 99, 4, 3], 'Edad_Cliente': [20, 30, 195, 40, 50],
+        'Ticket_Soporte_Abierto': ['1', '0', 'Sí', 'No', 'No'], 'Comentario_Texto': ['---', 'Lento', 'Lento', 'N/A', 'N/A'],
+    })
+    limpio, errores = PIPELINE_FEEDBACK.ejecutar(df, {'manejar_outliers_edad_cliente': {'medida': 'Rango'}})
+
+    assert [(e['paso'], e['columnas'], e['tipo']) for e in errores] == [
+        ('manejar_outliers_edad_cliente', ['Edad_Cliente'], 'ValueError'),
+        ('imputar_valores_recomienda_marca', ['Recomienda_Marca'], 'KeyError'),
+    ]
+    # Las columnas de un paso que falla quedan como estaban; el resto se limpia
+    assert limpio['Edad_Cliente'].tolist() == [20, 30, 195, 40, 50]
+    assert limpio['Rating_Producto'].tolist()[2] == 4
+    assert df['Comentario_Texto'].tolist()[0] == '---'
+
+    # La función pública deja los errores en el dataframe limpio
+    assert [e['paso'] for e in errores_limpieza(limpiar_feedback(df))] == ['imputar_valores_recomienda_marca']
+
+
+def test_cambiar_un_parametro_solo_recalcula_los_pasos_que_dependen_de_el():
+    with open(INVENTARIO, 'rb') as f:
+        crudo = leer_csv_con_esquema(f.read(), 'inventario')
+    limpiar_cache_pasos()
+    PIPELINE_INVENTARIO.ejecutar(crudo, version='inventario-v2')
+
+    parametros = {'limpiar_atipicos_costo_unitario': {'remplazo': 'media'}}
+    with capturar_trazas() as sink:
+        limpio, errores = PIPELINE_INVENTARIO.ejecutar(crudo, parametros, version='inventario-v2')
+
+    misses = {span['nombre'] for span in sink.spans if span['cache'] == 'miss'}
+    assert misses == {'limpiar_atipicos_costo_unitario', 'imputar_valores_columna_categoria'}
+    assert not errores
+    pd.testing.assert_frame_equal(limpio, PIPELINE_INVENTARIO.ejecutar(crudo, parametros)[0])
+
+
+def test_funciones_de_limpieza_copian_salvo_inplace():
+    df = pd.DataFrame({'Edad_Cliente': [20, 30, 195, 40, 50], 'Cantidad_Vendida': [1, -5, 2, 3, 4]})
+    limpio = manejar_outliers_edad_cliente(df)
+    assert df['Edad_Cliente'].tolist()[2] == 195 and limpio['Edad_Cliente'].tolist()[2] == 40
+
+    assert corregir_valores_negativos_cantidad_vendida(df)['Cantidad_Vendida'].min() == 1
+    assert df['Cantidad_Vendida'].min() == -5
+    assert corregir_valores_negativos_cantidad_vendida(df, inplace=True) is df
+    assert df['Cantidad_Vendida'].min() == 1
@@ -0,0 +1,33 @@
+"""
+Pruebas del pipeline por línea de comandos
+"""
+import json
+
+import pandas as pd
+
+from pipeline_batch import main
+from utils import columnar_store
+
+ARGUMENTOS_DATOS = [
+    '--inventario', 'data/inventario_central_v2.csv',
+    '--feedback', 'data/feedback_clientes_v2.csv',
+    '--transacciones', 'data/transacciones_logistica_v2.csv',
+]
+
+
+def test_pipeline_batch_escribe_dataset_y_auditoria(tmp_path, monkeypatch):
+    # --sin-cache desactiva el almacén del proceso; monkeypatch lo restaura al terminar
+    monkeypatch.setattr(columnar_store, 'ALMACEN_ACTIVO', columnar_store.ALMACEN_ACTIVO)
+    salida = tmp_path / 'merge.csv'
+    auditoria = tmp_path / 'auditoria.json'
+
+    codigo = main(ARGUMENTOS_DATOS + ['--salida', str(salida), '--auditoria', str(auditoria), '--sin-cache'])
+
+    assert codigo == 0
+    df = pd.read_csv(salida)
+    assert 'Ganancia_Neta_Total' in df.columns
+    resumen = json.loads(auditoria.read_text(encoding='utf-8'))
+    assert resumen['registros_integrados'] == len(df)
+    assert [a['dataset'] for a in resumen['auditoria']] == ['Inventario', 'Feedback', 'Transacciones']
+    assert all(a['errores_limpieza'] == [] for a in resumen['auditoria'])
+    assert {'limpieza_inventario', 'integracion', 'metricas', 'escritura'} <= set(resumen['tiempos_segundos'])
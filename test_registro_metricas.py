@@ -0,0 +1,89 @@
+"""
+Pruebas del registro de métricas (resolución de dependencias, alternativas y caché)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.metrics_registry import (
+    REGISTRO_METRICAS,
+    calcular_metricas,
+    agregar_metricas,
+    registrar_metrica,
+    estadisticas_cache_metricas,
+    limpiar_cache_metricas,
+)
+
+
+def _merge_prueba():
+    return pd.DataFrame({
+        'Rating_Producto': [5, 3, 1],
+        'Rating_Logistica': [4, 5, 2],
+        'Precio_Venta_Final': [100.0, 80.0, 150.0],
+        'Costo_Unitario_USD': [40.0, 90.0, 50.0],
+        'Cantidad_Vendida': [2, 0, 1],
+        'Costo_Envio': [10.0, np.nan, 8.0],
+    })
+
+
+def test_calcula_solo_lo_pedido_y_sus_dependencias():
+    llamadas = []
+
+    @registrar_metrica('Prueba_Ticket', ['Revenue', 'Cantidad_Efectiva'])
+    def _ticket(revenue, cantidad):
+        llamadas.append('ticket')
+        return revenue / cantidad
+
+    @registrar_metrica('Prueba_No_Pedida', ['Precio_Venta_Final'])
+    def _no_pedida(precio):
+        llamadas.append('no_pedida')
+        return precio
+
+    try:
+        limpiar_cache_metricas()
+        df = _merge_prueba()
+        metricas = calcular_metricas(df, ['Prueba_Ticket'], version='v1')
+        assert list(metricas.columns) == ['Prueba_Ticket'] and llamadas == ['ticket']
+        assert metricas['Prueba_Ticket'].tolist() == [100.0, 0.0, 150.0]
+        assert 'Revenue' not in df.columns
+
+        # Rerun sobre la misma versión: sale de la caché
+        calcular_metricas(df.copy(), ['Prueba_Ticket'], version='v1')
+        assert llamadas == ['ticket'] and estadisticas_cache_metricas()['hits'] >= 1
+
+        # Sin versión no se usa la caché: intercambiar precios entre filas (mismas sumas)
+        # se refleja en el resultado
+        df[['Precio_Venta_Final']] = df[['Precio_Venta_Final']].iloc[[1, 0, 2]].to_numpy()
+        assert calcular_metricas(df, ['Prueba_Ticket'])['Prueba_Ticket'].iloc[0] == 80.0
+        assert llamadas == ['ticket', 'ticket']
+        with pytest.raises(ValueError, match="versión"):
+            calcular_metricas(df, ['Prueba_Ticket'], usar_cache=True)
+    finally:
+        REGISTRO_METRICAS.pop('Prueba_Ticket')
+        REGISTRO_METRICAS.pop('Prueba_No_Pedida')
+
+
+def test_alternativas_columnas_existentes_y_errores():
+    df = _merge_prueba().drop(columns=['Rating_Logistica', 'Precio_Venta_Final'])
+    resultado = agregar_metricas(df, ['Rating_Servicio', 'Margen_Unitario_Pct', 'Ganancia_Neta_Total'])
+    # Alternativas reducidas; Ganancia_Neta_Total se omite porque falta el precio
+    assert resultado['Rating_Servicio'].tolist() == [5, 3, 1]
+    assert resultado['Margen_Unitario_Pct'].tolist() == [40.0, 90.0, 50.0]
+    assert 'Ganancia_Neta_Total' not in resultado.columns and 'Rating_Servicio' not in df.columns
+
+    # Una métrica que ya es columna se toma del dataframe salvo que se pida recalcular
+    df = _merge_prueba().assign(Revenue=1.0)
+    assert calcular_metricas(df, ['Revenue'])['Revenue'].tolist() == [1.0, 1.0, 1.0]
+    assert calcular_metricas(df, ['Revenue'], recalcular=True)['Revenue'].tolist() == [200.0, 0.0, 150.0]
+
+    with pytest.raises(ValueError, match="no registradas"):
+        calcular_metricas(df, ['No_Existe'])
+
+    registrar_metrica('Prueba_A', ['Prueba_B'])(lambda b: b)
+    registrar_metrica('Prueba_B', ['Prueba_A'])(lambda a: a)
+    try:
+        with pytest.raises(ValueError, match="circular"):
+            calcular_metricas(df, ['Prueba_A'])
+    finally:
+        REGISTRO_METRICAS.pop('Prueba_A')
+        REGISTRO_METRICAS.pop('Prueba_B')
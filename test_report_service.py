@@ -0,0 +1,68 @@
+"""
+Pruebas del servicio de reportes contra el servidor simulado de chat completions
+"""
+import pytest
+
+from utils.mock_llm_server import ServidorLLMSimulado
+from utils.report_prompts import armar_reporte_completo
+from utils.report_service import (
+    ErrorServicioLLM,
+    generar_reporte,
+    generar_reporte_stream,
+    generar_reportes,
+    estadisticas_cache_reportes,
+    limpiar_cache_reportes,
+)
+
+
+def test_stream_y_cache_por_prompt_y_parametros():
+    limpiar_cache_reportes()
+    with ServidorLLMSimulado(respuesta="Primer párrafo.\n\nSegundo párrafo con acción.") as servidor:
+        fragmentos = list(generar_reporte_stream("Resumen de prueba", "clave", url=servidor.url))
+        assert len(fragmentos) > 1
+        assert ''.join(fragmentos) == "Primer párrafo.\n\nSegundo párrafo con acción."
+        assert servidor.solicitudes[0]['stream'] is True
+        assert servidor.solicitudes[0]['messages'] == [{'role': 'user', 'content': "Resumen de prueba"}]
+
+        # Mismo prompt y parámetros: sale de la caché sin consultar al servidor
+        assert generar_reporte("Resumen de prueba", "clave", url=servidor.url) == ''.join(fragmentos)
+        assert len(servidor.solicitudes) == 1 and estadisticas_cache_reportes()['hits'] == 1
+
+        # Otros parámetros del modelo forman otra clave
+        generar_reporte("Resumen de prueba", "clave", temperatura=0.2, url=servidor.url)
+        generar_reporte("Resumen de prueba", "clave", usar_cache=False, url=servidor.url)
+        assert len(servidor.solicitudes) == 3
+        assert servidor.solicitudes[1]['temperature'] == 0.2
+
+
+def test_errores_de_la_api_no_se_guardan():
+    limpiar_cache_reportes()
+    with ServidorLLMSimulado(errores=[429]) as servidor:
+        with pytest.raises(ErrorServicioLLM) as error:
+            generar_reporte("Otro resumen", "clave", url=servidor.url)
+        assert error.value.estado == 429
+        assert generar_reporte("Otro resumen", "clave", url=servidor.url)
+        assert len(servidor.solicitudes) == 2
+
+
+def test_reportes_concurrentes_con_limite_y_reintentos():
+    limpiar_cache_reportes()
+    prompts = {nombre: f"Resumen de {nombre}" for nombre in ['inventario', 'feedback', 'transacciones', 'merge']}
+    # Dos 429 con Retry-After: 0 antes de responder normalmente
+    with ServidorLLMSimulado(retraso=0.01, errores=[429, 429], reintentar_en=0) as servidor:
+        reportes = generar_reportes(prompts, "clave", max_concurrencia=2, url=servidor.url)
+        assert list(reportes) == list(prompts)
+        assert all(texto == servidor.respuesta for texto in reportes.values())
+        assert len(servidor.solicitudes) == 6
+        assert servidor.max_simultaneas == 2
+
+    # Un error que no se reintenta queda en el resultado de ese reporte sin cancelar los demás
+    limpiar_cache_reportes()
+    with ServidorLLMSimulado(errores=[401]) as servidor:
+        reportes = generar_reportes(prompts, "clave", max_concurrencia=1, url=servidor.url)
+        assert isinstance(reportes['inventario'], ErrorServicioLLM) and reportes['inventario'].estado == 401
+        assert sum(isinstance(r, str) for r in reportes.values()) == 3 and len(servidor.solicitudes) == 4
+
+    documento = armar_reporte_completo(reportes)
+    assert documento.index("## 📦 Inventario") < documento.index("## 🔗 Análisis Integrado")
+    assert "No se pudo generar este reporte" in documento
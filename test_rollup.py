@@ -0,0 +1,76 @@
+"""
+Pruebas del cubo de agregados: cada consulta debe coincidir con el groupby / crosstab de pandas
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.rollup import construir_cubo, consultar_cubo, conteos, tabla_cruzada, total_cubo
+
+
+def _dashboard_prueba():
+    rng = np.random.default_rng(7)
+    n = 500
+    df = pd.DataFrame({
+        'Transaccion_ID': [f'TRX-{i}' for i in range(n)],
+        'SKU_ID': rng.choice(['PROD-1', 'PROD-2', 'PROD-3', 'PROD-4'], n),
+        'Fecha_Venta': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 10 * 24, n), unit='h'),
+        'Canal_Venta': rng.choice(['Físico', 'Online', 'App'], n),
+        'Categoria': rng.choice(['Laptops', 'Monitores', 'Tablets'], n),
+        'Ciudad_Destino': rng.choice(['Bogotá', 'Cali', 'Medellín'], n),
+        'Estado_Envio': rng.choice(['Entregado', 'Perdido', 'Retrasado'], n),
+        'Cantidad_Vendida': rng.integers(1, 10, n),
+        'Revenue': rng.uniform(10, 1000, n),
+        'Rating_Producto': rng.integers(1, 6, n).astype(float),
+        'Stock_Actual': rng.integers(0, 100, n).astype(float),
+    })
+    # Nulos en una dimensión y en medidas
+    df.loc[rng.choice(n, 20, replace=False), 'Ciudad_Destino'] = None
+    df.loc[rng.choice(n, 30, replace=False), 'Rating_Producto'] = np.nan
+    df.loc[:5, 'Stock_Actual'] = np.nan
+    return df
+
+
+def test_consultas_coinciden_con_pandas():
+    df = _dashboard_prueba()
+    cubo = construir_cubo(df)
+    agregados = {'Revenue': 'sum', 'Cantidad_Vendida': 'sum', 'Rating_Producto': 'mean', 'Stock_Actual': 'first'}
+
+    for dimensiones in (['Canal_Venta'], ['Ciudad_Destino'], ['Categoria', 'Ciudad_Destino'], ['SKU_ID']):
+        esperado = df.groupby(dimensiones).agg(agregados)
+        pd.testing.assert_frame_equal(consultar_cubo(cubo, dimensiones, agregados), esperado,
+                                      check_dtype=False, check_index_type=False)
+
+    pd.testing.assert_frame_equal(
+        consultar_cubo(cubo, ['Canal_Venta'], {'Revenue': ['sum', 'mean', 'count']}),
+        df.groupby('Canal_Venta').agg({'Revenue': ['sum', 'mean', 'count']}),
+        check_index_type=False,
+    )
+    pd.testing.assert_series_equal(conteos(cubo, 'Ciudad_Destino'), df['Ciudad_Destino'].value_counts(),
+                                   check_index_type=False)
+    pd.testing.assert_frame_equal(
+        tabla_cruzada(cubo, 'Ciudad_Destino', 'Estado_Envio'),
+        pd.crosstab(df['Ciudad_Destino'], df['Estado_Envio']),
+        check_names=False, check_index_type=False, check_column_type=False,
+    )
+    pd.testing.assert_frame_equal(
+        tabla_cruzada(cubo, 'Categoria', 'Canal_Venta', 'Rating_Producto', 'mean'),
+        pd.crosstab(df['Categoria'], df['Canal_Venta'], values=df['Rating_Producto'], aggfunc='mean'),
+        check_names=False, check_index_type=False, check_column_type=False,
+    )
+
+    # Las fechas se agrupan por día
+    por_dia = df.groupby(df['Fecha_Venta'].dt.normalize())['Revenue'].sum()
+    np.testing.assert_allclose(consultar_cubo(cubo, ['Fecha_Venta'], {'Revenue': 'sum'})['Revenue'], por_dia)
+
+    assert total_cubo(cubo, 'Revenue') == pytest.approx(df['Revenue'].sum())
+    assert total_cubo(cubo, 'Rating_Producto', 'mean') == pytest.approx(df['Rating_Producto'].mean())
+    assert total_cubo(cubo, 'Transaccion_ID', 'size') == len(df)
+
+
+def test_consultas_fuera_del_cubo():
+    cubo = construir_cubo(_dashboard_prueba())
+    with pytest.raises(ValueError, match="dimensiones"):
+        consultar_cubo(cubo, ['SKU_ID', 'Canal_Venta'], {'Revenue': 'sum'})
+    with pytest.raises(ValueError, match="medida"):
+        consultar_cubo(cubo, ['Canal_Venta'], {'Transaccion_ID': 'sum'})
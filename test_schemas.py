@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Pruebas de la lectura tipada de CSV con esquemas declarados
+"""
+import pandas as pd
+from limpieza_datos_transacciones import corregir_canal_venta, corregir_nombres_ciudad_destino
+from utils.schemas import leer_csv_con_esquema, detectar_esquema
+
+
+def test_detecta_esquema_por_encabezado():
+    assert detectar_esquema(['Feedback_ID', 'Transaccion_ID', 'Rating_Producto', 'Edad_Cliente', 'Satisfaccion_NPS']) == 'feedback'
+    assert detectar_esquema(['a', 'b']) is None
+
+
+def test_aplica_tipos_y_conserva_columnas_que_no_encajan():
+    contenido = (
+        b'Transaccion_ID,SKU_ID,Fecha_Venta,Cantidad_Vendida,Costo_Envio,Estado_Envio,Tiempo_Entrega_Real\n'
+        b'TRX-1,PROD-1,25/04/2025,-5,,Entregado,999\n'
+        b'TRX-2,PROD-2,29/07/2025,12,67.16,N/A,rapido\n'
+    )
+    df = leer_csv_con_esquema(contenido)
+
+    assert df.attrs['esquema'] == 'transacciones'
+    assert df['Fecha_Venta'].tolist() == [pd.Timestamp('2025-04-25'), pd.Timestamp('2025-07-29')]
+    assert df['Cantidad_Vendida'].dtype == 'int64'
+    assert df['Costo_Envio'].dtype == 'float64'
+    assert df['Estado_Envio'].isna().tolist() == [False, True]
+    # 'rapido' no es un entero: la columna se deja como texto
+    assert df.attrs['columnas_sin_convertir'] == ['Tiempo_Entrega_Real']
+    assert df['Tiempo_Entrega_Real'].tolist() == ['999', 'rapido']
+
+
+def test_categoricas_incluyen_valores_no_declarados():
+    contenido = b'Transaccion_ID,SKU_ID,Canal_Venta,Ciudad_Destino,Estado_Envio\nTRX-1,PROD-1,WhatsApp,BOG,Entregado\n'
+    df = leer_csv_con_esquema(contenido, usar_categoricas=True)
+    assert list(df['Canal_Venta'].cat.categories) == ['App', 'Físico', 'Online', 'WhatsApp']
+    assert df['Canal_Venta'].tolist() == ['WhatsApp']
+
+    # Los reemplazos de la limpieza funden categorías sin perder el dtype
+    df = corregir_nombres_ciudad_destino(corregir_canal_venta(df))
+    assert list(df['Canal_Venta'].cat.categories) == ['App', 'Físico', 'Online']
+    assert df['Canal_Venta'].tolist() == ['Online']
+    assert df['Ciudad_Destino'].dtype == 'category' and df['Ciudad_Destino'].tolist() == ['Bogotá']
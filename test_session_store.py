@@ -0,0 +1,24 @@
+"""
+Pruebas de los resultados guardados en sesión (reutilización e invalidación por hash de entradas)
+"""
+from utils.session_store import clave_entradas, obtener_resultado, guardar_resultado, descartar_resultado
+
+
+def test_resultado_se_reutiliza_hasta_que_cambian_las_entradas():
+    sesion = {}
+    inventario, feedback = b"SKU_ID\nPROD-1\n", b"Transaccion_ID\nTRX-1\n"
+    clave = clave_entradas(inventario, feedback)
+    assert obtener_resultado(sesion, 'merge', clave) is None
+
+    valores = guardar_resultado(sesion, 'merge', clave, {'filas': 1})
+    # Mismo contenido (aunque sea otro objeto bytes): misma clave
+    assert obtener_resultado(sesion, 'merge', clave_entradas(bytes(inventario), feedback)) is valores
+
+    # Un archivo distinto invalida y elimina el resultado guardado
+    assert obtener_resultado(sesion, 'merge', clave_entradas(inventario, b"Transaccion_ID\nTRX-2\n")) is None
+    assert 'merge' not in sesion
+
+    guardar_resultado(sesion, 'merge', clave, valores)
+    descartar_resultado(sesion, 'merge')
+    descartar_resultado(sesion, 'merge')
+    assert sesion == {}
@@ -0,0 +1,39 @@
+"""
+Pruebas del generador de datos sintéticos: mismos patrones de suciedad que data/*_v2.csv
+"""
+import pandas as pd
+
+from utils.data_cleaning import limpiar_inventario, limpiar_feedback, limpiar_transacciones
+from utils.data_integration import integrar_datos
+from utils.schemas import leer_csv_con_esquema
+from utils.synthetic_data import generar_csv, generar_datasets
+
+
+def test_datasets_con_la_suciedad_de_los_originales():
+    datasets = generar_datasets(20_000, semilla=3)
+    inventario, feedback, transacciones = datasets['inventario'], datasets['feedback'], datasets['transacciones']
+    assert (len(inventario), len(feedback), len(transacciones)) == (5_000, 9_000, 20_000)
+
+    assert inventario['SKU_ID'].is_unique
+    assert (inventario['Categoria'] == '???').any() and (inventario['Lead_Time_Dias'] == '25-30 días').any()
+    assert inventario['Stock_Actual'].isna().any() and (inventario['Stock_Actual'] < 0).any()
+    assert (transacciones['Cantidad_Vendida'] == -5).any() and (transacciones['Tiempo_Entrega_Real'] == 999).any()
+    assert (transacciones['Estado_Envio'] == '').any()
+    assert pd.to_datetime(transacciones['Fecha_Venta'], format='%d/%m/%Y').notna().all()
+    assert (feedback['Comentario_Texto'] == '---').any() and feedback['Feedback_ID'].duplicated().any()
+
+    # Misma semilla, mismos datos
+    assert generar_datasets(20_000, semilla=3)['feedback'].equals(feedback)
+
+
+def test_csv_pasa_por_el_pipeline():
+    archivos = generar_csv(10_000)
+    crudos = {nombre: leer_csv_con_esquema(contenido, nombre) for nombre, contenido in archivos.items()}
+    assert all(not df.attrs['columnas_sin_convertir'] for df in crudos.values())
+
+    transacciones = limpiar_transacciones(crudos['transacciones'])
+    assert (transacciones['Cantidad_Vendida'] > 0).all() and transacciones['Tiempo_Entrega_Real'].max() < 999
+
+    integrado = integrar_datos(transacciones, limpiar_feedback(crudos['feedback']), limpiar_inventario(crudos['inventario']))
+    # Con los archivos originales se integran 3.719 de 10.000 transacciones
+    assert 3_000 < len(integrado) < 4_500
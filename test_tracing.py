@@ -0,0 +1,77 @@
+"""
+Pruebas de las trazas de las etapas del pipeline
+"""
+import json
+
+import pandas as pd
+import pytest
+
+from pipeline_batch import main
+from test_pipeline_batch import ARGUMENTOS_DATOS
+from utils import columnar_store
+from utils.data_cleaning import limpiar_feedback
+from utils.tracing import capturar_trazas, descartar_trazas_abiertas, iniciar_traza, terminar_traza, traza
+
+
+def test_spans_de_limpieza_con_pasos_anidados_y_errores():
+    df = pd.DataFrame({
+        'Rating_Producto': [1, 5, 99, 4], 'Edad_Cliente': [20, 30, 195, 40],
+        'Ticket_Soporte_Abierto': ['1', '0', 'Sí', 'No'], 'Comentario_Texto': ['---', 'Lento', 'Lento', 'N/A'],
+    })
+    with capturar_trazas() as sink:
+        # Sin Recomienda_Marca el último paso falla: se omite y su error queda en la traza
+        limpio = limpiar_feedback(df)
+
+    spans = {span['nombre']: span for span in sink.spans}
+    assert 'Recomienda_Marca' not in limpio.columns and limpio['Comentario_Texto'].tolist()[0] == 'Lento'
+    assert spans['limpiar_feedback']['filas_entrada'] == spans['limpiar_feedback']['filas_salida'] == 4
+    assert spans['limpiar_feedback']['error'] is None
+    assert spans['manejar_outliers_rating_producto']['padre_id'] == spans['limpiar_feedback']['id']
+    assert spans['manejar_outliers_edad_cliente']['outliers'] == 1
+    assert spans['imputar_valores_recomienda_marca']['error'].startswith('KeyError')
+    assert all(span['segundos'] >= 0 and span['cpu_segundos'] >= 0 for span in sink.spans)
+
+    # Fuera del bloque no se registra nada
+    limpiar_feedback(df)
+    assert len(sink.spans) == len(spans)
+
+
+def test_excepcion_se_registra_y_se_propaga():
+    with capturar_trazas() as sink:
+        with pytest.raises(ValueError):
+            with traza('etapa', filas_entrada=3):
+                raise ValueError("dato inválido")
+    assert sink.spans[0]['error'] == "ValueError: dato inválido"
+
+
+def test_traza_sin_bloque_with():
+    with capturar_trazas() as sink:
+        span = iniciar_traza('graficos')
+        with traza('grafica'):
+            pass
+        terminar_traza(span)
+
+        # Una sección interrumpida no queda como padre de los spans siguientes
+        iniciar_traza('interrumpida')
+        descartar_trazas_abiertas()
+        with traza('siguiente'):
+            pass
+
+    spans = {span['nombre']: span for span in sink.spans}
+    assert spans['grafica']['padre_id'] == spans['graficos']['id']
+    assert spans['graficos']['segundos'] >= spans['grafica']['segundos']
+    assert 'interrumpida' not in spans and spans['siguiente']['padre_id'] is None
+
+
+def test_pipeline_batch_escribe_trazas_jsonl(tmp_path, monkeypatch):
+    # --sin-cache desactiva el almacén del proceso; monkeypatch lo restaura al terminar
+    monkeypatch.setattr(columnar_store, 'ALMACEN_ACTIVO', columnar_store.ALMACEN_ACTIVO)
+    trazas = tmp_path / 'trazas.jsonl'
+    main(ARGUMENTOS_DATOS + ['--salida', str(tmp_path / 'merge.csv'), '--trazas', str(trazas), '--sin-cache'])
+
+    spans = [json.loads(linea) for linea in trazas.read_text(encoding='utf-8').splitlines()]
+    nombres = {span['nombre'] for span in spans}
+    assert {'limpiar_inventario', 'limpiar_atipicos_costo_unitario', 'integrar_datos', 'crear_metricas_nuevas'} <= nombres
+    assert not [span for span in spans if span['error']]
+    integracion = next(span for span in spans if span['nombre'] == 'integrar_datos')
+    assert integracion['filas_entrada'] == 10000 and integracion['memoria_pico_mb'] > 0
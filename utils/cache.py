@@ -0,0 +1,161 @@
+"""
+Caché en memoria de DataFrames cargados y limpiados, compartido entre reruns de Streamlit
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Presupuesto de memoria por defecto para la caché de DataFrames (en MB)
+MEMORIA_MAXIMA_MB = 512
+
+
+class CacheLRU:
+    """
+    Caché LRU limitada por memoria.
+
+    Cada entrada guarda el valor junto con su tamaño en bytes. Cuando la suma de
+    tamaños supera el presupuesto, se expulsan las entradas usadas hace más tiempo.
+    """
+
+    def __init__(self, memoria_maxima_bytes):
+        self.memoria_maxima_bytes = int(memoria_maxima_bytes)
+        self._entradas = OrderedDict()
+        self._bytes_usados = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obtener(self, clave, contar=True):
+        """
+        Retorna el valor asociado a la clave o None si no está en caché. Con contar=False
+        la consulta no suma a hits ni a misses.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.misses += contar
+                return None
+            self._entradas.move_to_end(clave)
+            self.hits += contar
+            return entrada[0]
+
+    def guardar(self, clave, valor, tamano_bytes):
+        """Guarda un valor y expulsa entradas antiguas hasta respetar el presupuesto."""
+        tamano_bytes = int(tamano_bytes)
+        with self._lock:
+            if clave in self._entradas:
+                self._bytes_usados -= self._entradas.pop(clave)[1]
+            # Un valor más grande que todo el presupuesto no se guarda
+            if tamano_bytes > self.memoria_maxima_bytes:
+                return
+            self._entradas[clave] = (valor, tamano_bytes)
+            self._bytes_usados += tamano_bytes
+            self._expulsar()
+
+    def configurar(self, memoria_maxima_bytes):
+        """Cambia el presupuesto de memoria y expulsa lo necesario."""
+        with self._lock:
+            self.memoria_maxima_bytes = int(memoria_maxima_bytes)
+            self._expulsar()
+
+    def limpiar(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes_usados = 0
+            self.hits = 0
+            self.misses = 0
+
+    def estadisticas(self):
+        """Retorna un diccionario con el estado de la caché."""
+        with self._lock:
+            return {
+                'entradas': len(self._entradas),
+                'bytes_usados': self._bytes_usados,
+                'memoria_maxima_bytes': self.memoria_maxima_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _expulsar(self):
+        while self._bytes_usados > self.memoria_maxima_bytes and self._entradas:
+            _, (_, tamano) = self._entradas.popitem(last=False)
+            self._bytes_usados -= tamano
+
+
+_CACHE_DATAFRAMES = CacheLRU(MEMORIA_MAXIMA_MB * 1024 * 1024)
+
+
+def hash_contenido(file_bytes):
+    """
+    Calcula el hash del contenido de un archivo subido.
+
+    Streamlit conserva el mismo objeto bytes en session_state entre reruns, así que
+    el hash se recuerda por identidad del objeto para no recorrer el archivo en cada
+    interacción. La entrada guarda una referencia al objeto (para que su id no se
+    reutilice mientras esté recordado) y vive en la caché de DataFrames con el tamaño
+    del archivo: los bytes retenidos cuentan dentro de su presupuesto de memoria.
+    """
+    clave = ('hash_contenido', id(file_bytes))
+    recordado = _CACHE_DATAFRAMES.obtener(clave, contar=False)
+    if recordado is not None and recordado[0] is file_bytes:
+        return recordado[1]
+
+    digest = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+    _CACHE_DATAFRAMES.guardar(clave, (file_bytes, digest), len(file_bytes))
+    return digest
+
+
+def tamano_dataframe(df):
+    """Retorna la memoria ocupada por el dataframe en bytes (incluye strings)."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def clave_cache(file_bytes, etapa, **parametros):
+    """
+    Construye la clave de caché a partir del hash del archivo, la etapa
+    ('csv', nombre de la función de limpieza, ...) y sus parámetros. Los parámetros entran
+    por su repr para admitir valores no hashables (p. ej. los argumentos por paso de la
+    limpieza).
+    """
+    return (hash_contenido(file_bytes), etapa, tuple(sorted((k, repr(v)) for k, v in parametros.items())))
+
+
+def obtener_o_calcular(clave, calcular):
+    """
+    Retorna el DataFrame cacheado para la clave o lo calcula y lo guarda.
+
+    Parámetros:
+    -----------
+    clave : tuple
+        Clave construida con clave_cache
+    calcular : callable
+        Función sin argumentos que produce el DataFrame si no está en caché
+
+    Retorna:
+    --------
+    DataFrame : Copia superficial del DataFrame cacheado (o None si calcular retorna None).
+        La copia superficial permite que la página agregue columnas sin alterar la caché.
+    """
+    df = _CACHE_DATAFRAMES.obtener(clave)
+    if df is None:
+        df = calcular()
+        if df is None:
+            return None
+        _CACHE_DATAFRAMES.guardar(clave, df, tamano_dataframe(df))
+    return df.copy(deep=False)
+
+
+def configurar_memoria_cache(megabytes):
+    """Cambia el presupuesto de memoria (en MB) de la caché de DataFrames."""
+    _CACHE_DATAFRAMES.configurar(megabytes * 1024 * 1024)
+
+
+def estadisticas_cache():
+    """Retorna hits, misses, entradas y memoria usada por la caché de DataFrames."""
+    return _CACHE_DATAFRAMES.estadisticas()
+
+
+def limpiar_cache():
+    """Vacía la caché de DataFrames."""
+    _CACHE_DATAFRAMES.limpiar()
@@ -0,0 +1,270 @@
+"""
+Almacén columnar en disco (Arrow IPC / Feather) para versiones crudas y limpias de los datasets.
+
+El almacén tiene un presupuesto de bytes: al guardar un archivo nuevo se eliminan los
+menos usados recientemente (la fecha de modificación se actualiza en cada lectura) hasta
+que el total vuelve a caber.
+"""
+import functools
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+from utils.schemas import leer_csv_con_esquema
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # sin pyarrow el almacén queda desactivado
+    pa = None
+    feather = None
+
+_RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Directorio donde se guardan los archivos columnares (configurable por variable de entorno)
+DIRECTORIO_ALMACEN = os.environ.get('COLUMNAR_CACHE_DIR', os.path.join(_RAIZ_PROYECTO, '.cache', 'columnar'))
+ALMACEN_ACTIVO = os.environ.get('COLUMNAR_CACHE', '1') != '0'
+# Presupuesto de disco del almacén (en MB)
+MEMORIA_ALMACEN_MB = int(os.environ.get('COLUMNAR_CACHE_MB', '1024'))
+
+_CLAVE_ATTRS = b'validacion.attrs'
+_BLOQUE_LECTURA = 8 * 1024 * 1024
+
+
+def configurar_almacen(directorio=None, activo=None, memoria_mb=None):
+    """Cambia el directorio del almacén columnar, lo activa/desactiva o cambia su presupuesto."""
+    global DIRECTORIO_ALMACEN, ALMACEN_ACTIVO, MEMORIA_ALMACEN_MB
+    if directorio is not None:
+        DIRECTORIO_ALMACEN = directorio
+    if activo is not None:
+        ALMACEN_ACTIVO = activo
+    if memoria_mb is not None:
+        MEMORIA_ALMACEN_MB = memoria_mb
+
+
+def almacen_disponible():
+    """Indica si el almacén está activo y pyarrow está instalado."""
+    return ALMACEN_ACTIVO and feather is not None
+
+
+# Módulos que definen el parseo y la limpieza de lo que se guarda en el almacén
+_MODULOS_VERSIONADOS = ('utils/schemas.py', 'utils/pipeline.py', 'utils/data_cleaning.py', 'limpieza_datos_*.py')
+
+
+@functools.lru_cache(maxsize=1)
+def _version_codigo():
+    """
+    Huella de los módulos de parseo y limpieza. Forma parte de la clave de todo lo
+    guardado para que un cambio en ellos invalide las versiones anteriores; editar
+    páginas u otras utilidades no descarta el almacén.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for patron in _MODULOS_VERSIONADOS:
+        for ruta in sorted(glob.glob(os.path.join(_RAIZ_PROYECTO, patron))):
+            with open(ruta, 'rb') as f:
+                h.update(os.path.basename(ruta).encode())
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def hash_archivo(ruta):
+    """
+    Calcula el hash del contenido de un archivo leyéndolo por bloques.
+
+    El resultado se recuerda en un índice del almacén junto con el tamaño y la fecha de
+    modificación del archivo, así que un archivo sin cambios no se vuelve a recorrer.
+    """
+    ruta = os.path.abspath(ruta)
+    info = os.stat(ruta)
+    firma = [info.st_size, info.st_mtime_ns]
+    ruta_indice = os.path.join(DIRECTORIO_ALMACEN, 'indice_rutas.json')
+    indice = {}
+    if almacen_disponible() and os.path.exists(ruta_indice):
+        try:
+            with open(ruta_indice, encoding='utf-8') as f:
+                indice = json.load(f)
+        except (OSError, ValueError):
+            indice = {}
+        recordado = indice.get(ruta)
+        if recordado is not None and recordado['firma'] == firma:
+            return recordado['hash']
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(_BLOQUE_LECTURA), b''):
+            h.update(bloque)
+    digest = h.hexdigest()
+
+    if almacen_disponible():
+        indice[ruta] = {'firma': firma, 'hash': digest}
+        try:
+            os.makedirs(DIRECTORIO_ALMACEN, exist_ok=True)
+            with open(ruta_indice, 'w', encoding='utf-8') as f:
+                json.dump(indice, f)
+        except OSError:
+            pass
+    return digest
+
+
+def _ruta_almacen(hash_contenido, etapa, parametros):
+    sufijo = hashlib.blake2b(repr(sorted(parametros.items())).encode(), digest_size=6).hexdigest()
+    nombre = f"{hash_contenido}.{etapa}.{sufijo}"
+    return os.path.join(DIRECTORIO_ALMACEN, nombre + '.arrow')
+
+
+def _leer_columnar(ruta):
+    """Lee un archivo Feather mapeándolo en memoria en lugar de cargarlo completo."""
+    tabla = feather.read_table(ruta, memory_map=True)
+    df = tabla.to_pandas()
+    metadatos = tabla.schema.metadata or {}
+    if _CLAVE_ATTRS in metadatos:
+        df.attrs.update(json.loads(metadatos[_CLAVE_ATTRS]))
+    return df
+
+
+def _escribir_columnar(df, ruta):
+    """Escribe el dataframe sin compresión (requisito para mapearlo en memoria) de forma atómica."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    metadatos = dict(tabla.schema.metadata or {})
+    metadatos[_CLAVE_ATTRS] = json.dumps(df.attrs, default=str).encode()
+    tabla = tabla.replace_schema_metadata(metadatos)
+
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+    os.close(descriptor)
+    try:
+        feather.write_feather(tabla, temporal, compression='uncompressed')
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _podar_almacen(conservar=None):
+    """
+    Elimina los archivos menos usados recientemente hasta que el almacén quepa en
+    MEMORIA_ALMACEN_MB. El archivo conservar (el recién escrito) no se elimina.
+    """
+    archivos = []
+    try:
+        with os.scandir(DIRECTORIO_ALMACEN) as entradas:
+            for entrada in entradas:
+                if entrada.name.endswith('.arrow') and entrada.is_file():
+                    info = entrada.stat()
+                    archivos.append((info.st_mtime_ns, info.st_size, entrada.path))
+    except OSError:
+        return
+    total = sum(tamano for _, tamano, _ in archivos)
+    limite = MEMORIA_ALMACEN_MB * 1024 * 1024
+    for _, tamano, ruta in sorted(archivos):
+        if total <= limite:
+            break
+        if ruta == conservar:
+            continue
+        try:
+            os.remove(ruta)
+            total -= tamano
+        except OSError:
+            pass
+
+
+def obtener_o_guardar(hash_contenido, etapa, calcular, parametros=None):
+    """
+    Retorna el dataframe guardado para (hash, etapa, parámetros) o lo calcula y lo guarda.
+
+    Parámetros:
+    -----------
+    hash_contenido : str
+        Hash del archivo de origen
+    etapa : str
+        'crudo' o el nombre de la función de limpieza
+    calcular : callable
+        Función sin argumentos que produce el dataframe si no está en disco
+    parametros : dict, opcional
+        Parámetros que distinguen versiones de la misma etapa
+
+    Retorna:
+    --------
+    DataFrame : Dataframe leído del almacén o recién calculado (None si calcular retorna None)
+    """
+    if not almacen_disponible():
+        return calcular()
+
+    # La huella del código invalida lo guardado cuando cambian el parseo o la limpieza
+    ruta = _ruta_almacen(hash_contenido, etapa, {**(parametros or {}), '_codigo': _version_codigo()})
+    if os.path.exists(ruta):
+        try:
+            df = _leer_columnar(ruta)
+        except (OSError, pa.ArrowException):
+            # Archivo dañado o incompleto: se regenera
+            os.remove(ruta)
+        else:
+            try:
+                # Marca el archivo como usado recientemente para la poda
+                os.utime(ruta)
+            except OSError:
+                pass
+            return df
+
+    df = calcular()
+    if df is not None:
+        try:
+            _escribir_columnar(df, ruta)
+        except (OSError, pa.ArrowException, TypeError, ValueError):
+            # Columnas que Arrow no sabe representar: se sigue sin almacén
+            return df
+        _podar_almacen(conservar=ruta)
+    return df
+
+
+def cargar_csv_columnar(file_bytes, hash_contenido, nombre_esquema=None):
+    """Lee un CSV desde bytes usando la versión columnar guardada si ya existe."""
+    return obtener_o_guardar(
+        hash_contenido,
+        'crudo',
+        lambda: leer_csv_con_esquema(file_bytes, nombre_esquema),
+        parametros={'esquema': nombre_esquema} if nombre_esquema else None,
+    )
+
+
+def cargar_ruta_columnar(ruta, nombre_esquema=None):
+    """
+    Lee un CSV en disco (por ejemplo los archivos de data/) usando la versión columnar
+    guardada si ya existe, en lugar de volver a tokenizar el texto.
+    """
+    hash_contenido = hash_archivo(ruta)
+
+    def leer():
+        with open(ruta, 'rb') as f:
+            return leer_csv_con_esquema(f.read(), nombre_esquema)
+
+    return obtener_o_guardar(
+        hash_contenido,
+        'crudo',
+        leer,
+        parametros={'esquema': nombre_esquema} if nombre_esquema else None,
+    )
+
+
+def limpiar_columnar(hash_contenido, funcion_limpieza, cargar, version=None, **parametros):
+    """
+    Aplica la función de limpieza usando la versión limpia guardada si ya existe.
+    `cargar` produce el dataframe crudo y solo se llama si hay que limpiar. `version` se
+    pasa a la función de limpieza (caché por paso) y no forma parte de la clave.
+    """
+    def calcular():
+        df = cargar()
+        if df is None:
+            return None
+        if version is not None:
+            return funcion_limpieza(df, version=version, **parametros)
+        return funcion_limpieza(df, **parametros)
+
+    return obtener_o_guardar(
+        hash_contenido,
+        funcion_limpieza.__name__,
+        calcular,
+        parametros=parametros,
+    )
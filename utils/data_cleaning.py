@@ -27,75 +27,193 @@ from limpieza_datos_transacciones import (
     imputar_estado_envio
 )
 
+import contextvars
+import multiprocessing
+import pickle
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import pandas as pd
 import numpy as np
 
+from utils.cache import CacheLRU
+from utils.pipeline import Paso, PipelineLimpieza
+from utils.tracing import traza, trazar
+
+# Por encima de este tamaño total, copiar los dataframes hacia y desde los procesos
+# cuesta más que lo que se gana limpiando en paralelo: se usan hilos
+UMBRAL_BYTES_PROCESOS = 256 * 1024 * 1024
+# Por debajo de este tamaño arrancar procesos o hilos tarda más que limpiar en serie
+UMBRAL_BYTES_PARALELO = 16 * 1024 * 1024
+
+
+# Número máximo de resultados de health score recordados (cada entrada ocupa una unidad)
+MAX_ENTRADAS_HEALTH = 256
+
+_CACHE_HEALTH = CacheLRU(MAX_ENTRADAS_HEALTH)
+
+# Textos que representan un valor faltante en columnas de texto
+VALORES_CENTINELA = {'Comentario_Texto': '---', 'Categoria': '???'}
+
+# Clave de df.attrs con los pasos de limpieza que fallaron (ver errores_limpieza)
+CLAVE_ERRORES_LIMPIEZA = 'errores_limpieza'
+
+# Columnas en las que un valor negativo es inválido
+COLUMNAS_NO_NEGATIVAS = ['Stock_Actual', 'Cantidad_Vendida']
+
+# Multiplicador de 64 bits para combinar los hashes de las columnas de cada fila
+_MULTIPLICADOR_HASH = np.uint64(0x100000001B3)
+
+# Columnas iniciales (normalmente los IDs) en las que se busca una clave única antes de
+# calcular los hashes de fila: si una columna no repite valores no hay filas duplicadas
+_COLUMNAS_CLAVE_CANDIDATAS = 3
+
+
+def _contar_centinelas(df):
+    """Cuenta los textos centinela (no nulos) de VALORES_CENTINELA sin modificar df."""
+    total = 0
+    for col, centinela in VALORES_CENTINELA.items():
+        if col in df.columns:
+            total += int((df[col] == centinela).sum())
+    return total
+
+
+def _mezclar_bits(bits):
+    """Finalizador splitmix64: dispersa los bits de un arreglo uint64."""
+    bits = bits ^ (bits >> np.uint64(30))
+    bits = bits * np.uint64(0xBF58476D1CE4E5B9)
+    bits = bits ^ (bits >> np.uint64(27))
+    bits = bits * np.uint64(0x94D049BB133111EB)
+    return bits ^ (bits >> np.uint64(31))
 
-def calcular_health_score(df):
+
+def _hash_columna(serie):
+    """Hash uint64 por valor, comparable solo dentro de la misma columna."""
+    tipo = serie.dtype
+    if isinstance(tipo, np.dtype) and tipo.kind in 'iub':
+        return _mezclar_bits(serie.to_numpy().astype(np.int64).view(np.uint64))
+    if isinstance(tipo, np.dtype) and tipo.kind == 'f':
+        valores = serie.to_numpy().astype(np.float64)
+        # Un único patrón para NaN y +0.0 para -0.0, como la igualdad de duplicated()
+        valores = np.where(np.isnan(valores), np.nan, valores + 0.0)
+        return _mezclar_bits(valores.view(np.uint64))
+    # Texto, categorías y fechas: basta el código de factorize (igual valor, igual código;
+    # los nulos comparten el código -1), sin hashear el contenido de cada texto
+    codigos, _ = pd.factorize(serie)
+    return _mezclar_bits(codigos.astype(np.int64).view(np.uint64))
+
+
+def _hash_filas(df):
     """
-    Calcula el health score de un dataframe basado en:
-    - Porcentaje de valores nulos
-    - Duplicados completos
-    - Proporción de outliers (usando IQR)
-    - Valores negativos en columnas que no deberían tenerlos
-    
-    Retorna un score entre 0 y 100
+    Hash de 64 bits por fila. Los textos centinela se tratan como nulos, de modo que
+    dos filas que solo difieren en '---' vs NaN cuentan como duplicadas.
     """
-    no_negative_colums = ['Stock_Actual', 'Cantidad_Vendida']
-    if df.empty or len(df) == 0:
-        return 0.0
-    
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for col in df.columns:
+            serie = df[col]
+            if col in VALORES_CENTINELA:
+                # Solo se copia esta columna, no el dataframe
+                serie = serie.mask(serie == VALORES_CENTINELA[col])
+            hashes = hashes * _MULTIPLICADOR_HASH + _hash_columna(serie)
+    return hashes
+
+
+def _contar_duplicados(df):
+    """Filas completas repetidas (como df.duplicated().sum() tratando centinelas como nulos)."""
+    for col in df.columns[:_COLUMNAS_CLAVE_CANDIDATAS]:
+        if col not in VALORES_CENTINELA and df[col].is_unique:
+            return 0
+    return len(df) - len(pd.unique(_hash_filas(df)))
+
+
+def _contar_negativos(df):
+    total = 0
+    for col in COLUMNAS_NO_NEGATIVAS:
+        if col in df.columns:
+            try:
+                s = pd.to_numeric(df[col], errors='coerce')
+                total += int((s < 0).sum())
+            except (TypeError, ValueError):
+                pass
+    return total
+
+
+def _cuantil_ordenado(ordenados, validos, q):
+    """
+    Cuantil q de cada fila de un arreglo ordenado (NaN al final), con la interpolación
+    lineal de numpy/pandas: mismo resultado que Series.quantile(q) sobre cada columna.
+    """
+    posicion = (validos - 1) * q
+    inferior = np.floor(posicion).astype(np.int64).clip(0)
+    superior = np.minimum(inferior + 1, np.maximum(validos - 1, 0))
+    fraccion = posicion - inferior
+    filas = np.arange(ordenados.shape[0])
+    a, b = ordenados[filas, inferior], ordenados[filas, superior]
+    diferencia = b - a
+    resultado = np.where(fraccion >= 0.5, b - diferencia * (1 - fraccion), a + diferencia * fraccion)
+    resultado[validos == 0] = np.nan
+    return resultado
+
+
+def _contar_outliers_iqr(numericos):
+    """
+    Cuenta los valores fuera de [Q1 - 1.5·IQR, Q3 + 1.5·IQR] en todas las columnas
+    numéricas (las columnas con IQR = 0 no aportan outliers).
+
+    Se ordena una sola vez el bloque numérico (una fila por columna): de ahí salen los
+    cuartiles de todas las columnas y, con searchsorted, los valores fuera de los límites.
+    """
+    ordenados = numericos.to_numpy(dtype=np.float64, na_value=np.nan).T.copy()
+    ordenados.sort(axis=1)
+    validos = (~np.isnan(ordenados)).sum(axis=1)
+    q1 = _cuantil_ordenado(ordenados, validos, 0.25)
+    q3 = _cuantil_ordenado(ordenados, validos, 0.75)
+    iqr = q3 - q1
+    total = 0
+    for i in np.flatnonzero(iqr > 0):
+        columna = ordenados[i, :validos[i]]
+        total += int(np.searchsorted(columna, q1[i] - 1.5 * iqr[i], side='left'))
+        total += int(validos[i] - np.searchsorted(columna, q3[i] + 1.5 * iqr[i], side='right'))
+    return total
+
+
+def _calcular_health_score_detallado(df):
+    """Cálculo del health score sin caché (ver calcular_health_score_detallado)."""
     n_rows, n_cols = df.shape
-    
-    # Calcular nulidad global
-    if 'Comentario_Texto' in df.columns:
-        df.loc[df['Comentario_Texto'] == "---", 'Comentario_Texto'] = np.nan
-    if 'Categoria' in df.columns:
-        df.loc[df['Categoria'] == "???", 'Categoria'] = np.nan
-    null_global_pct = (df.isna().sum().sum() / (n_rows * n_cols) * 100) if (n_rows and n_cols) else 0.0
-    
-    # Calcular duplicados
-    dup_rows = int(df.duplicated().sum())
+    detalle = {
+        'score': 0.0,
+        'nulos': 0, 'pct_nulos': 0.0,
+        'duplicados': 0, 'pct_duplicados': 0.0,
+        'outliers': 0, 'pct_outliers': 0.0,
+        'negativos': 0, 'pct_negativos': 0.0,
+        'penalizaciones': {'nulos': 0.0, 'duplicados': 0.0, 'outliers': 0.0, 'negativos': 0.0},
+    }
+    if df.empty or len(df) == 0:
+        return detalle
+
+    # Nulidad global
+    nulos = int(df.isna().sum().sum()) + _contar_centinelas(df)
+    null_global_pct = (nulos / (n_rows * n_cols) * 100) if (n_rows and n_cols) else 0.0
+
+    # Duplicados
+    dup_rows = _contar_duplicados(df)
     dup_ratio = (dup_rows / n_rows * 100) if n_rows else 0.0
-    
-    # Calcular outliers en columnas numéricas usando IQR
+
+    # Outliers en columnas numéricas usando IQR
     outlier_ratio = 0.0
+    total_outliers = 0
     numeric_cols = df.select_dtypes(include=[np.number]).columns
-    
     if len(numeric_cols) > 0:
-        total_outliers = 0
-        for col in numeric_cols:
-            try:
-                s = pd.to_numeric(df[col], errors='coerce').dropna()
-                if len(s) > 0:
-                    q1 = s.quantile(0.25)
-                    q3 = s.quantile(0.75)
-                    iqr = q3 - q1
-                    if iqr > 0:
-                        lower = q1 - 1.5 * iqr
-                        upper = q3 + 1.5 * iqr
-                        mask = (s < lower) | (s > upper)
-                        total_outliers += mask.sum()
-            except:
-                pass
-        
+        total_outliers = _contar_outliers_iqr(df[numeric_cols])
         outlier_ratio = (total_outliers / (n_rows * len(numeric_cols)) * 100) if (n_rows and len(numeric_cols)) else 0.0
-    
-    # Calcular valores negativos en columnas que no deberían tenerlos
-    negative_ratio = 0.0
-    negative_count = 0
-    for col in no_negative_colums:
-        if col in df.columns:
-            try:
-                s = pd.to_numeric(df[col], errors='coerce')
-                negative_in_col = (s < 0).sum()
-                negative_count += negative_in_col
-            except:
-                pass
-    
-    if negative_count > 0:
-        negative_ratio = (negative_count / n_rows * 100)
-    
+
+    # Valores negativos en columnas que no deberían tenerlos
+    negative_count = _contar_negativos(df)
+    negative_ratio = (negative_count / n_rows * 100) if negative_count > 0 else 0.0
+
     # Calcular health score con pesos basados en severidad
     # Los pesos representan independientemente cuán grave es cada problema
     # No necesitan sumar 100 porque los errores son acumulativos
@@ -103,158 +221,310 @@ def calcular_health_score(df):
     penalty_dup = dup_ratio * 7                   # Grave (datos redundantes)
     penalty_outliers = outlier_ratio * 3          # Muy grave (sesgan análisis y modelos)
     penalty_negatives = negative_ratio * 7        # Muy grave (valores inválidos claros)
-    
+
     score = 100 - (penalty_nulls + penalty_dup + penalty_outliers + penalty_negatives)
-    score = float(max(0, min(100, score)))
-    
-    return score
 
+    detalle.update({
+        'score': float(max(0, min(100, score))),
+        'nulos': nulos, 'pct_nulos': null_global_pct,
+        'duplicados': dup_rows, 'pct_duplicados': dup_ratio,
+        'outliers': total_outliers, 'pct_outliers': outlier_ratio,
+        'negativos': negative_count, 'pct_negativos': negative_ratio,
+        'penalizaciones': {
+            'nulos': penalty_nulls,
+            'duplicados': penalty_dup,
+            'outliers': penalty_outliers,
+            'negativos': penalty_negatives,
+        },
+    })
+    return detalle
 
-def contar_valores_invalidos(df):
+
+def calcular_health_score_detallado(df, version=None):
+    """
+    Calcula el health score y el detalle de cada componente sin modificar df.
+
+    Si se pasa la versión de los datos, el resultado se recuerda por ella: las páginas y
+    generar_audit_summary piden el mismo detalle en cada rerun y solo el primero lo calcula.
+
+    Componentes:
+    - Porcentaje de valores nulos (los textos de VALORES_CENTINELA cuentan como nulos)
+    - Duplicados completos (comparando un hash por fila)
+    - Proporción de outliers (IQR con un solo ordenamiento del bloque numérico)
+    - Valores negativos en columnas que no deberían tenerlos
+
+    Parámetros:
+    -----------
+    df : DataFrame
+        Dataframe a evaluar
+    version : hashable, opcional
+        Identificador de los datos de df (p. ej. clave_cache del archivo y la etapa).
+        Quien llama garantiza que datos distintos tienen versiones distintas; sin
+        versión se recalcula siempre
+
+    Retorna:
+    --------
+    dict : score (0 a 100), conteos y porcentajes de cada componente y sus penalizaciones
+    """
+    with traza('calcular_health_score', filas_entrada=len(df), cache=None if version is None else 'hit') as span:
+        if version is None:
+            return _calcular_health_score_detallado(df)
+        clave = (version, df.shape)
+        detalle = _CACHE_HEALTH.obtener(clave)
+        if detalle is None:
+            span['cache'] = 'miss'
+            detalle = _calcular_health_score_detallado(df)
+            _CACHE_HEALTH.guardar(clave, detalle, 1)
+    # Copia para que quien llama pueda modificar el resultado sin alterar la caché
+    return {**detalle, 'penalizaciones': dict(detalle['penalizaciones'])}
+
+
+def estadisticas_cache_health_score():
+    """Retorna hits, misses y entradas de la caché de health score."""
+    return _CACHE_HEALTH.estadisticas()
+
+
+def limpiar_cache_health_score():
+    """Vacía la caché de health score y reinicia sus contadores."""
+    _CACHE_HEALTH.limpiar()
+
+
+def calcular_health_score(df, version=None):
+    """
+    Calcula el health score de un dataframe (entre 0 y 100).
+    Ver calcular_health_score_detallado para el desglose por componente y la caché por versión.
+    """
+    return calcular_health_score_detallado(df, version)['score']
+
+
+def contar_valores_invalidos(df, version=None):
     """
     Cuenta los valores negativos en columnas que no deberían tenerlos
-    Retorna el total de valores inválidos encontrados
+    Retorna el total de valores inválidos encontrados (reutiliza el detalle del
+    health score si ya se calculó para esta versión de los datos)
     """
-    no_negative_colums = ['Stock_Actual', 'Cantidad_Vendida']
-    invalid_count = 0
-    
-    for col in no_negative_colums:
-        if col in df.columns:
-            try:
-                s = pd.to_numeric(df[col], errors='coerce')
-                invalid_count += (s < 0).sum()
-            except:
-                pass
-    
-    return invalid_count
+    return calcular_health_score_detallado(df, version)['negativos']
 
 
-def generar_audit_summary(df_antes, df_despues, dataset_name="Dataset"):
+def generar_audit_summary(df_antes, df_despues, dataset_name="Dataset", detalle_antes=None, detalle_despues=None,
+                          version_antes=None, version_despues=None):
     """
     Genera un resumen de auditoría comparativo antes y después de limpieza
     Retorna un diccionario con las métricas
+
+    detalle_antes / detalle_despues: resultados de calcular_health_score_detallado ya
+    calculados por quien llama (evita recalcularlos).
+    version_antes / version_despues: versiones de los datos para la caché del health score
+    (ver calcular_health_score_detallado).
     """
+    if detalle_antes is None:
+        detalle_antes = calcular_health_score_detallado(df_antes, version_antes)
+    if detalle_despues is None:
+        detalle_despues = calcular_health_score_detallado(df_despues, version_despues)
     return {
         'dataset': dataset_name,
         'registros_antes': len(df_antes),
         'registros_despues': len(df_despues),
         'registros_eliminados': len(df_antes) - len(df_despues),
         'pct_registros_perdidos': ((len(df_antes) - len(df_despues)) / len(df_antes) * 100) if len(df_antes) > 0 else 0.0,
-        'health_score_antes': calcular_health_score(df_antes),
-        'health_score_despues': calcular_health_score(df_despues),
+        'health_score_antes': detalle_antes['score'],
+        'health_score_despues': detalle_despues['score'],
         'columnas': len(df_antes.columns),
-        'nulos_antes': df_antes.isna().sum().sum(),
-        'nulos_despues': df_despues.isna().sum().sum(),
-        'valores_invalidos_antes': contar_valores_invalidos(df_antes),
-        'valores_invalidos_despues': contar_valores_invalidos(df_despues),
+        'nulos_antes': detalle_antes['nulos'],
+        'nulos_despues': detalle_despues['nulos'],
+        'valores_invalidos_antes': detalle_antes['negativos'],
+        'valores_invalidos_despues': detalle_despues['negativos'],
+        'errores_limpieza': errores_limpieza(df_despues),
     }
 
 
 
 
 
-def limpiar_inventario(df):
-    """Aplica todas las funciones de limpieza para datos de Inventario"""
-    df = df.copy()
-    
-    try:
-        df = imputar_valores_columna_stock_actual(df, 'mediana')
-    except:
-        pass
-    
-    try:
-        df = imputar_valores_columna_lead_time_dias(df)
-    except:
-        pass
-    
-    try:
-        df = corregir_tipos_datos_punto_reorden(df)
-    except:
-        pass
-    
-    try:
-        df = corregir_nombres_bodega_origen(df)
-    except:
-        pass
-    
-    try:
-        df = limpiar_atipicos_costo_unitario(df, 'Mediana')
-    except:
-        pass
-    
-    try:
-        df = imputar_valores_columna_categoria(df, 'mediana')
-    except:
-        pass
-    
-    try:
-        df = limpiezar_fecha_ultima_revision(df)
-    except:
-        pass
-    
-    return df
+PIPELINE_INVENTARIO = PipelineLimpieza('inventario', [
+    Paso(imputar_valores_columna_stock_actual, lee=['Stock_Actual'], escribe=['Stock_Actual'], remplazo='mediana'),
+    Paso(imputar_valores_columna_lead_time_dias, lee=['Lead_Time_Dias'], escribe=['Lead_Time_Dias']),
+    Paso(corregir_tipos_datos_punto_reorden, lee=['Punto_Reorden'], escribe=['Punto_Reorden']),
+    Paso(corregir_nombres_bodega_origen, lee=['Bodega_Origen'], escribe=['Bodega_Origen']),
+    Paso(limpiar_atipicos_costo_unitario, lee=['Categoria', 'Costo_Unitario_USD'], escribe=['Costo_Unitario_USD'],
+         remplazo='mediana'),
+    Paso(imputar_valores_columna_categoria, lee=['Categoria', 'Costo_Unitario_USD'], escribe=['Categoria'],
+         remplazo='mediana'),
+    Paso(limpiezar_fecha_ultima_revision, lee=['Ultima_Revision'], escribe=['Ultima_Revision']),
+])
 
+PIPELINE_FEEDBACK = PipelineLimpieza('feedback', [
+    Paso(manejar_outliers_rating_producto, lee=['Rating_Producto', 'Ticket_Soporte_Abierto'],
+         escribe=['Rating_Producto', 'Ticket_Soporte_Abierto'], medida='Mediana'),
+    Paso(manejar_outliers_edad_cliente, lee=['Edad_Cliente'], escribe=['Edad_Cliente'], medida='Mediana'),
+    Paso(imputar_valores_comentario_texto, lee=['Comentario_Texto'], escribe=['Comentario_Texto']),
+    Paso(imputar_valores_recomienda_marca, lee=['Recomienda_Marca'], escribe=['Recomienda_Marca']),
+])
 
-def limpiar_feedback(df):
-    """Aplica todas las funciones de limpieza para datos de Feedback"""
-    df = df.copy()
-    print("Manejando outliers en Rating_Producto...")
-    try:
-        df = manejar_outliers_rating_producto(df, 'Mediana')
-    except:
-        pass
-    print("Manejando outliers en Edad_Cliente...")
-    try:
-        df = manejar_outliers_edad_cliente(df, 'Mediana')
-    except:
-        pass
-    print("Imputando valores en Comentario_Texto...")
-    try:
-        df = imputar_valores_comentario_texto(df)
-    except:
-        print("Error imputando Comentario_Texto")
-        pass
-    print("Imputando valores en Recomienda_Marca...")
-    try:
-        df = imputar_valores_recomienda_marca(df)
-    except:
-        pass
-    
-    return df
+PIPELINE_TRANSACCIONES = PipelineLimpieza('transacciones', [
+    Paso(corregir_nombres_ciudad_destino, lee=['Ciudad_Destino'], escribe=['Ciudad_Destino']),
+    Paso(corregir_canal_venta, lee=['Canal_Venta'], escribe=['Canal_Venta']),
+    Paso(corregir_valores_negativos_cantidad_vendida, lee=['Cantidad_Vendida'], escribe=['Cantidad_Vendida']),
+    Paso(reemplazar_outliers_tiempo_entrega_real, lee=['Tiempo_Entrega_Real'], escribe=['Tiempo_Entrega_Real'],
+         metodo='Mediana'),
+    Paso(imputar_costo_envio, lee=['Costo_Envio'], escribe=['Costo_Envio'], remplzar_por='Mediana'),
+    Paso(imputar_estado_envio, lee=['Estado_Envio'], escribe=['Estado_Envio'], remplazo='Moda'),
+])
+
+PIPELINES_LIMPIEZA = {
+    'inventario': PIPELINE_INVENTARIO,
+    'feedback': PIPELINE_FEEDBACK,
+    'transacciones': PIPELINE_TRANSACCIONES,
+}
 
 
-def limpiar_transacciones(df):
-    """Aplica todas las funciones de limpieza para datos de Transacciones"""
-    df = df.copy()
-    
-    try:
-        df = corregir_nombres_ciudad_destino(df)
-    except:
-        pass
-    
-    try:
-        df = corregir_canal_venta(df)
-    except:
-        pass
-    
-    try:
-        df = corregir_valores_negativos_cantidad_vendida(df)
-    except:
-        pass
-    
-    try:
-        df = reemplazar_outliers_tiempo_entrega_real(df, 'Mediana')
-    except:
-        pass
-    
-    try:
-        df = imputar_costo_envio(df, 'Mediana')
-    except:
-        pass
-    
-    try:
-        df = imputar_estado_envio(df, 'Moda')
-    except:
-        pass
-    
+def _con_errores(resultado):
+    """Deja la lista de errores de la pipeline en df.attrs (ver errores_limpieza)."""
+    df, errores = resultado
+    df.attrs[CLAVE_ERRORES_LIMPIEZA] = errores
     return df
+
+
+def errores_limpieza(df):
+    """
+    Pasos de limpieza que fallaron al producir df (lista vacía si no hubo errores o si df
+    no salió de un limpiar_*). Cada error es un dict con paso, columnas, tipo y mensaje.
+    """
+    return list(df.attrs.get(CLAVE_ERRORES_LIMPIEZA, []))
+
+
+@trazar()
+def limpiar_inventario(df, parametros=None, version=None):
+    """
+    Aplica todas las funciones de limpieza para datos de Inventario.
+
+    `parametros` reemplaza los argumentos de los pasos de PIPELINE_INVENTARIO (nombre del
+    paso -> argumentos) y `version` activa la caché por paso (ver utils.pipeline). Los
+    pasos que fallan se omiten y quedan en errores_limpieza(df_limpio).
+    """
+    return _con_errores(PIPELINE_INVENTARIO.ejecutar(df, parametros, version))
+
+
+@trazar()
+def limpiar_feedback(df, parametros=None, version=None):
+    """Aplica todas las funciones de limpieza para datos de Feedback (ver limpiar_inventario)"""
+    return _con_errores(PIPELINE_FEEDBACK.ejecutar(df, parametros, version))
+
+
+@trazar()
+def limpiar_transacciones(df, estadisticas=None, parametros=None, version=None):
+    """
+    Aplica todas las funciones de limpieza para datos de Transacciones.
+
+    `estadisticas` (opcional) trae los límites y valores de reemplazo ya calculados sobre
+    el archivo completo (ver utils.limpieza_streaming); así un bloque del archivo se
+    limpia igual que si se limpiara el archivo entero. `parametros` y `version` como en
+    limpiar_inventario.
+    """
+    estadisticas = estadisticas or {}
+    parametros = parametros or {}
+    por_paso = {
+        'reemplazar_outliers_tiempo_entrega_real': estadisticas.get('tiempo_entrega', {}),
+        'imputar_costo_envio': estadisticas.get('costo_envio', {}),
+        'imputar_estado_envio': estadisticas.get('estado_envio', {}),
+    }
+    parametros = {
+        paso: {**por_paso.get(paso, {}), **parametros.get(paso, {})}
+        for paso in por_paso.keys() | parametros.keys()
+    }
+    return _con_errores(PIPELINE_TRANSACCIONES.ejecutar(df, parametros, version))
+
+
+FUNCIONES_LIMPIEZA = {
+    'inventario': limpiar_inventario,
+    'feedback': limpiar_feedback,
+    'transacciones': limpiar_transacciones,
+}
+
+
+def _limpiar_con_tiempo(funcion_limpieza, df):
+    inicio = time.perf_counter()
+    df_limpio = funcion_limpieza(df)
+    return df_limpio, time.perf_counter() - inicio
+
+
+def _ejecutar_en_pool(executor_cls, tareas, max_workers):
+    limpios, tiempos = {}, {}
+    opciones = {}
+    if executor_cls is ProcessPoolExecutor:
+        # 'spawn' y no el fork por defecto de Linux: un fork del servidor de Streamlit (con
+        # varios hilos) puede heredar locks tomados por otro hilo y bloquearse
+        opciones['mp_context'] = multiprocessing.get_context('spawn')
+    with executor_cls(max_workers=max_workers, **opciones) as executor:
+        if executor_cls is ThreadPoolExecutor:
+            # Cada hilo corre en una copia del contexto actual: sus trazas llegan a los
+            # mismos sinks de contexto (p. ej. el de la sesión de Streamlit)
+            futuros = {
+                nombre: executor.submit(contextvars.copy_context().run, _limpiar_con_tiempo, funcion, df)
+                for nombre, (funcion, df) in tareas.items()
+            }
+        else:
+            futuros = {
+                nombre: executor.submit(_limpiar_con_tiempo, funcion, df)
+                for nombre, (funcion, df) in tareas.items()
+            }
+        for nombre, futuro in futuros.items():
+            limpios[nombre], tiempos[nombre] = futuro.result()
+    return limpios, tiempos
+
+
+def limpiar_datasets_en_paralelo(datasets, modo='auto', max_workers=None):
+    """
+    Limpia varios datasets de forma concurrente.
+
+    Parámetros:
+    -----------
+    datasets : dict
+        nombre -> DataFrame (se limpia con FUNCIONES_LIMPIEZA[nombre]) o
+        nombre -> (funcion_limpieza, DataFrame)
+    modo : str
+        'auto', 'procesos', 'hilos' o 'secuencial'. En 'auto' se limpia en serie si los
+        dataframes suman menos de UMBRAL_BYTES_PARALELO, con hilos si suman más de
+        UMBRAL_BYTES_PROCESOS y con procesos en el resto de casos
+    max_workers : int, opcional
+        Número máximo de procesos o hilos (por defecto uno por dataset)
+
+    Retorna:
+    --------
+    tuple : (dict nombre -> DataFrame limpio, dict nombre -> segundos de limpieza)
+    """
+    if modo not in ['auto', 'procesos', 'hilos', 'secuencial']:
+        raise ValueError("El parámetro 'modo' debe ser 'auto', 'procesos', 'hilos' o 'secuencial'")
+
+    tareas = {
+        nombre: valor if isinstance(valor, tuple) else (FUNCIONES_LIMPIEZA[nombre], valor)
+        for nombre, valor in datasets.items()
+    }
+    max_workers = max_workers or len(tareas)
+
+    if modo == 'auto':
+        if len(tareas) <= 1 or max_workers <= 1:
+            modo = 'secuencial'
+        else:
+            tamano = sum(int(df.memory_usage(index=True, deep=True).sum()) for _, df in tareas.values())
+            if tamano < UMBRAL_BYTES_PARALELO:
+                modo = 'secuencial'
+            elif tamano > UMBRAL_BYTES_PROCESOS:
+                modo = 'hilos'
+            else:
+                modo = 'procesos'
+
+    if modo == 'secuencial':
+        limpios, tiempos = {}, {}
+        for nombre, (funcion, df) in tareas.items():
+            limpios[nombre], tiempos[nombre] = _limpiar_con_tiempo(funcion, df)
+        return limpios, tiempos
+
+    if modo == 'procesos':
+        try:
+            return _ejecutar_en_pool(ProcessPoolExecutor, tareas, max_workers)
+        except (BrokenProcessPool, pickle.PicklingError, AttributeError, OSError) as e:
+            # Funciones no serializables (lambdas) o entorno sin procesos: se usan hilos
+            warnings.warn(f"Limpieza en procesos no disponible ({e}), usando hilos", RuntimeWarning, stacklevel=2)
+
+    return _ejecutar_en_pool(ThreadPoolExecutor, tareas, max_workers)
@@ -1,9 +1,85 @@
 """
 Módulo de integración de datos de múltiples fuentes
 """
+import warnings
+
+import numpy as np
 import pandas as pd
 
-def integrar_datos(df_transaccion, df_feedback, df_inventario):
+from utils.data_cleaning import calcular_health_score
+from utils.join_keys import codificar_claves as codificar, claves_codificables, reporte_join
+from utils.metrics_registry import agregar_metricas
+from utils.rollup import construir_cubo
+from utils.tracing import trazar
+
+# Columnas temporales con las claves codificadas durante los merges
+_CODIGO_TRANSACCION = '__codigo_transaccion'
+_CODIGO_SKU = '__codigo_sku'
+
+
+def _merge_codificado(df_izquierda, df_derecha, clave, columna_codigo, codigos_derecha):
+    """
+    Merge inner sobre la clave ya codificada: df_izquierda trae los códigos en
+    columna_codigo y la columna de texto de la derecha se descarta (la de la izquierda
+    pasa tal cual), así el resultado tiene las mismas filas, orden y columnas que
+    pd.merge(df_izquierda, df_derecha, on=clave).
+    """
+    derecha = df_derecha.drop(columns=clave).assign(**{columna_codigo: codigos_derecha})
+    return pd.merge(df_izquierda, derecha, on=columna_codigo, how='inner')
+
+
+def _unir_dimension(df_hechos, df_dimension, clave, codigos_hechos=None, codigos_dimension=None):
+    """
+    Join inner contra una tabla de dimensión con clave única, sin pasar por pd.merge.
+
+    Se construye una vez el índice clave -> posición de la dimensión, se busca la
+    posición de cada fila de hechos (get_indexer) y las columnas de la dimensión se
+    copian con take. El resultado es el mismo que pd.merge(df_hechos, df_dimension,
+    on=clave, how='inner'): filas de hechos en su orden, clave de los hechos y columnas
+    de la dimensión a continuación.
+
+    Parámetros:
+    -----------
+    df_hechos : DataFrame
+        Tabla de hechos (lado izquierdo)
+    df_dimension : DataFrame
+        Tabla de dimensión, una fila por clave
+    clave : str
+        Columna de clave
+    codigos_hechos, codigos_dimension : array, opcional
+        Claves ya codificadas (utils.join_keys); si no se pasan se usan las columnas
+
+    Retorna:
+    --------
+    DataFrame : Resultado del join, o None si no se puede resolver con una búsqueda
+        (clave repetida en la dimensión o columnas con el mismo nombre en ambos lados)
+    """
+    columnas_dimension = [col for col in df_dimension.columns if col != clave]
+    if set(columnas_dimension) & set(df_hechos.columns):
+        # pd.merge agregaría sufijos _x/_y
+        return None
+
+    indice = pd.Index(df_dimension[clave] if codigos_dimension is None else codigos_dimension)
+    if not indice.is_unique:
+        warnings.warn(f"{clave} repetido en la tabla de dimensión: se usa merge", RuntimeWarning, stacklevel=2)
+        return None
+
+    claves_hechos = df_hechos[clave] if codigos_hechos is None else codigos_hechos
+    posiciones = indice.get_indexer(claves_hechos)
+    encontradas = posiciones >= 0
+    if encontradas.all():
+        izquierda = df_hechos.reset_index(drop=True)
+    else:
+        izquierda = df_hechos.iloc[np.flatnonzero(encontradas)].reset_index(drop=True)
+        posiciones = posiciones[encontradas]
+
+    derecha = df_dimension[columnas_dimension].take(posiciones).reset_index(drop=True)
+    return pd.concat([izquierda, derecha], axis=1)
+
+
+@trazar()
+def integrar_datos(df_transaccion, df_feedback, df_inventario, codificar_claves=True, busqueda_inventario=True,
+                   reporte=False):
     """
     Integra los dataframes de transacción, feedback e inventario en un solo dataframe.
     
@@ -15,32 +91,98 @@ def integrar_datos(df_transaccion, df_feedback, df_inventario):
         DataFrame de feedback de clientes
     df_inventario : DataFrame
         DataFrame de inventario central
+    codificar_claves : bool
+        Si es True, los merges por Transaccion_ID y SKU_ID se hacen sobre claves enteras
+        (prefijo + número, o diccionario compartido) en lugar de comparar textos
+    busqueda_inventario : bool
+        Si es True, el inventario se une como tabla de dimensión (índice SKU -> fila y
+        take) en lugar de con pd.merge. Si SKU_ID se repite en el inventario se usa el merge
+    reporte : bool
+        Si es True retorna también el diagnóstico de cada join (ver utils.join_keys.reporte_join)
     
     Retorna:
     --------
     DataFrame : Dataframe integrado con todas las fuentes de datos
+    (DataFrame, dict) : Si reporte=True, el dataframe y un diccionario con las claves
+        'transaccion_feedback' y 'inventario' (un reporte por join)
     """
-    # Merge transacción con feedback de clientes por Transaccion_ID
-    df_merged = pd.merge(df_transaccion, df_feedback, on='Transaccion_ID', how='inner')
-    print(f"Merge transacción + feedback: {len(df_merged)} filas")
-    
-    # Merge con inventario por SKU_ID
-    df_merged = pd.merge(df_merged, df_inventario, on='SKU_ID', how='inner')
-    print(f"Merge final con inventario: {len(df_merged)} filas")
+    reportes = {}
+    claves = [df_transaccion['Transaccion_ID'], df_feedback['Transaccion_ID'],
+              df_transaccion['SKU_ID'], df_inventario['SKU_ID']]
+    if codificar_claves and claves_codificables(*claves):
+        # Cada clave se codifica una sola vez sobre las tablas de origen; los códigos de
+        # SKU viajan con las transacciones a través del primer merge
+        (trx_transaccion, trx_feedback), _ = codificar(df_transaccion['Transaccion_ID'], df_feedback['Transaccion_ID'])
+        (sku_transaccion, sku_inventario), _ = codificar(df_transaccion['SKU_ID'], df_inventario['SKU_ID'])
+        df_merged = df_transaccion.assign(**{_CODIGO_TRANSACCION: trx_transaccion, _CODIGO_SKU: sku_transaccion})
+        if reporte:
+            reportes['transaccion_feedback'] = reporte_join(
+                df_transaccion['Transaccion_ID'], df_feedback['Transaccion_ID'], trx_transaccion, trx_feedback
+            )
+
+        df_merged = _merge_codificado(df_merged, df_feedback, 'Transaccion_ID', _CODIGO_TRANSACCION, trx_feedback)
+        print(f"Merge transacción + feedback: {len(df_merged)} filas")
+
+        df_merged = df_merged.drop(columns=_CODIGO_TRANSACCION)
+        if reporte:
+            reportes['inventario'] = reporte_join(
+                df_merged['SKU_ID'], df_inventario['SKU_ID'], df_merged[_CODIGO_SKU].to_numpy(), sku_inventario
+            )
+        df_unido = None
+        if busqueda_inventario:
+            df_unido = _unir_dimension(df_merged.drop(columns=_CODIGO_SKU), df_inventario, 'SKU_ID',
+                                       df_merged[_CODIGO_SKU].to_numpy(), sku_inventario)
+        if df_unido is None:
+            df_unido = _merge_codificado(df_merged, df_inventario, 'SKU_ID', _CODIGO_SKU, sku_inventario).drop(columns=_CODIGO_SKU)
+        df_merged = df_unido
+        print(f"Merge final con inventario: {len(df_merged)} filas")
+    else:
+        if reporte:
+            reportes['transaccion_feedback'] = reporte_join(df_transaccion['Transaccion_ID'], df_feedback['Transaccion_ID'])
+        # Merge transacción con feedback de clientes por Transaccion_ID
+        df_merged = pd.merge(df_transaccion, df_feedback, on='Transaccion_ID', how='inner')
+        print(f"Merge transacción + feedback: {len(df_merged)} filas")
+        
+        # Merge con inventario por SKU_ID
+        if reporte:
+            reportes['inventario'] = reporte_join(df_merged['SKU_ID'], df_inventario['SKU_ID'])
+        df_unido = _unir_dimension(df_merged, df_inventario, 'SKU_ID') if busqueda_inventario else None
+        if df_unido is None:
+            df_unido = pd.merge(df_merged, df_inventario, on='SKU_ID', how='inner')
+        df_merged = df_unido
+        print(f"Merge final con inventario: {len(df_merged)} filas")
     
     print("\nDatos integrados exitosamente")
     print(f"Columnas totales: {len(df_merged.columns)}")
     
+    if reporte:
+        return df_merged, reportes
     return df_merged
 
-def crear_metricas_nuevas(df_merged):
+# Métricas que agrega crear_metricas_nuevas (definidas en utils.metrics_registry)
+METRICAS_INTEGRADAS = ['Rating_Servicio', 'Margen_Unitario_Pct', 'Ganancia_Neta_Total', 'Margen_Real_Pct']
+
+
+@trazar()
+def crear_metricas_nuevas(df_merged, copiar=True, usar_cache=None, version=None):
     """
     Crea nuevas métricas en el dataframe integrado.
     
+    Las métricas se calculan con el registro de utils.metrics_registry: los intermedios
+    compartidos (cantidad sin ceros, envío imputado, precio - costo) se calculan una
+    vez y, si se pasa la versión de los datos, los resultados se reutilizan en los reruns.
+    
     Parámetros:
     -----------
     df_merged : DataFrame
         DataFrame integrado con todas las fuentes de datos
+    copiar : bool
+        Si es False las columnas se agregan directamente a df_merged (usar solo cuando
+        el llamador es dueño del dataframe, p. ej. el resultado de integrar_datos)
+    usar_cache : bool, opcional
+        Por defecto la caché de métricas se usa solo si se pasa version
+    version : hashable, opcional
+        Versión de los datos integrados (p. ej. los hashes de los tres archivos)
         
     Retorna:
     --------
@@ -50,65 +192,47 @@ def crear_metricas_nuevas(df_merged):
         - Ganancia_Neta_Total: Ganancia total REAL (considerando envío) en USD
         - Margen_Real_Pct: Margen porcentual REAL (considerando envío y cantidad)
     """
-    df_merged = df_merged.copy()
-    
-    # ============================================================
-    # 1. Rating_Servicio: Combinación de ratings
-    # ============================================================
-    if 'Rating_Producto' in df_merged.columns and 'Rating_Logistica' in df_merged.columns:
-        df_merged['Rating_Servicio'] = (df_merged['Rating_Producto'] * df_merged['Rating_Logistica']) / 5
-    elif 'Rating_Producto' in df_merged.columns:
-        df_merged['Rating_Servicio'] = df_merged['Rating_Producto']
-    
-    # ============================================================
-    # 2. Margen_Unitario_Pct: Margen por unidad (solo costo de producto)
-    # ============================================================
-    if 'Precio_Venta_Final' in df_merged.columns and 'Costo_Unitario_USD' in df_merged.columns:
-        df_merged['Margen_Unitario_Pct'] = (
-            (df_merged['Precio_Venta_Final'] - df_merged['Costo_Unitario_USD']) 
-            / df_merged['Precio_Venta_Final'] * 100
-        ).fillna(0).clip(lower=0)  # No permitir márgenes negativos
-    elif 'Costo_Unitario_USD' in df_merged.columns:
-        df_merged['Margen_Unitario_Pct'] = df_merged['Costo_Unitario_USD']
+    return agregar_metricas(df_merged, METRICAS_INTEGRADAS, copiar=copiar, recalcular=True,
+                            usar_cache=usar_cache, version=version)
+
+
+@trazar()
+def preparar_dashboard_merge(df_transaccion, df_feedback, df_inventario, version=None):
+    """
+    Integra los tres datasets limpios y prepara todo lo que usa el dashboard integrado.
     
-    # ============================================================
-    # 3. Ganancia_Neta_Total: Ganancia TOTAL considerando envío
-    # ============================================================
-    if 'Precio_Venta_Final' in df_merged.columns and 'Costo_Unitario_USD' in df_merged.columns:
-        # Garantizar que Cantidad_Vendida > 0 para evitar división por cero
-        cantidad_vendida = df_merged.get('Cantidad_Vendida', 1).copy()
-        cantidad_vendida = cantidad_vendida.replace(0, 1)  # Reemplazar 0 con 1 para evitar errores
-        
-        # Costo de envío por unidad
-        costo_envio = df_merged.get('Costo_Envio', 0).fillna(0)
-        costo_envio_unitario = costo_envio / cantidad_vendida
-        
-        # Ganancia por unidad (considerando costo de envío)
-        ganancia_unitaria = (
-            df_merged['Precio_Venta_Final'] 
-            - df_merged['Costo_Unitario_USD'] 
-            - costo_envio_unitario
-        )
+    Parámetros:
+    -----------
+    df_transaccion, df_feedback, df_inventario : DataFrame
+        Datasets limpios
+    version : hashable, opcional
+        Versión de los tres datasets (p. ej. clave_entradas de los archivos); con ella
+        las métricas y el health score se reutilizan de sus cachés
         
-        # Ganancia total = ganancia por unidad × cantidad vendida
-        df_merged['Ganancia_Neta_Total'] = (ganancia_unitaria * cantidad_vendida).clip(lower=0).fillna(0)
+    Retorna:
+    --------
+    dict : 
+        - df_integrado: Dataset integrado con las métricas nuevas
+        - reporte_joins: Diagnóstico de los joins (ver integrar_datos)
+        - health_merge: Health score del dataset integrado
+        - df_dash: df_integrado con Revenue y Fecha_Venta como fecha
+        - cubo: Cubo de agregados de df_dash (utils.rollup)
+    """
+    df_integrado, reporte_joins = integrar_datos(df_transaccion, df_feedback, df_inventario, reporte=True)
+    df_integrado = crear_metricas_nuevas(df_integrado, copiar=False, version=version)
     
-    # ============================================================
-    # 4. Margen_Real_Pct: Margen porcentual considerando TODOS los costos
-    # ============================================================
-    if 'Precio_Venta_Final' in df_merged.columns and 'Ganancia_Neta_Total' in df_merged.columns:
-        # Revenue total = Precio_Venta × Cantidad
-        cantidad_vendida = df_merged.get('Cantidad_Vendida', 1).copy()
-        cantidad_vendida = cantidad_vendida.replace(0, 1)
-        revenue_total = df_merged['Precio_Venta_Final'] * cantidad_vendida
-        
-        # Margen real = (Ganancia / Revenue) × 100
-        df_merged['Margen_Real_Pct'] = (
-            (df_merged['Ganancia_Neta_Total'] / revenue_total * 100)
-            .fillna(0)
-            .clip(lower=-100, upper=100)  # Limitar entre -100% y 100%
-        )
+    # Revenue se toma del registro de métricas (solo se calcula esa)
+    df_dash = agregar_metricas(df_integrado, ['Revenue'], version=version)
+    df_dash['Fecha_Venta'] = pd.to_datetime(df_dash['Fecha_Venta'], errors='coerce')
     
-    return df_merged
+    return {
+        'df_integrado': df_integrado,
+        'reporte_joins': reporte_joins,
+        'health_merge': calcular_health_score(df_integrado, version),
+        'df_dash': df_dash,
+        # Una pasada por conjunto de dimensiones; las gráficas y tablas agregadas se
+        # consultan sobre el cubo
+        'cubo': construir_cubo(df_dash),
+    }
 
-__all__ = ['integrar_datos', 'crear_metricas_nuevas']
+__all__ = ['integrar_datos', 'crear_metricas_nuevas', 'preparar_dashboard_merge']
@@ -1,6 +1,8 @@
-import pandas as pd
 import streamlit as st
-import io
+from utils.cache import clave_cache, obtener_o_calcular, hash_contenido
+from utils.columnar_store import cargar_csv_columnar, limpiar_columnar, obtener_o_guardar
+from utils.data_cleaning import errores_limpieza, limpiar_datasets_en_paralelo
+from utils.tracing import traza
 
 
 def display_dataframe_info(df, title="Información del Archivo"):
@@ -26,22 +28,116 @@ def display_dataframe_info(df, title="Información del Archivo"):
         st.error(f"Error al calcular estadísticas: {e}")
 
 
+def mostrar_errores_limpieza(df_limpio):
+    """Muestra una advertencia por cada paso de limpieza que falló y se omitió."""
+    for error in errores_limpieza(df_limpio):
+        st.warning(
+            f"⚠️ Paso de limpieza '{error['paso']}' omitido ({error['tipo']}: {error['mensaje']}). "
+            f"Columnas sin limpiar: {', '.join(error['columnas'])}"
+        )
+
+
 def load_csv_file(file_bytes):
-    """Carga un archivo CSV desde bytes y retorna el dataframe."""
+    """
+    Carga un archivo CSV desde bytes y retorna el dataframe con los tipos declarados
+    en utils.schemas (el esquema se detecta por el encabezado).
+    El resultado se cachea en memoria por hash del contenido, así que los reruns no vuelven
+    a parsear, y en el almacén columnar en disco para las siguientes sesiones.
+    La traza 'cargar_csv' indica si el DataFrame salió de la caché en memoria (cache='hit').
+    """
     try:
         if file_bytes is None:
             return None
-        # Convertir bytes a BytesIO para que pandas pueda leerlo
-        file_obj = io.BytesIO(file_bytes)
-        df = pd.read_csv(file_obj, na_filter=True)
-        # Limpiar columnas sin nombre
-        df.columns = df.columns.str.strip()
-        return df
+        with traza('cargar_csv', cache='hit') as span:
+            def calcular():
+                span['cache'] = 'miss'
+                return cargar_csv_columnar(file_bytes, hash_contenido(file_bytes))
+
+            df = obtener_o_calcular(clave_cache(file_bytes, 'csv'), calcular)
+            span['filas_salida'] = None if df is None else len(df)
+            return df
     except Exception as e:
         st.error(f"❌ Error al cargar: {e}")
         return None
 
 
+def load_clean_csv_file(file_bytes, funcion_limpieza, **parametros):
+    """
+    Carga un archivo CSV desde bytes y le aplica la función de limpieza indicada.
+    El DataFrame limpio se cachea (en memoria y en el almacén columnar) por hash del
+    contenido, función y parámetros de limpieza. El hash del contenido también es la
+    versión de la caché por paso: si solo cambian los parámetros, los pasos que no
+    dependen de ellos no se vuelven a ejecutar.
+    """
+    if file_bytes is None:
+        return None
+    clave = clave_cache(file_bytes, funcion_limpieza.__name__, **parametros)
+
+    with traza('cargar_limpio', limpieza=funcion_limpieza.__name__, cache='hit') as span:
+        def calcular():
+            span['cache'] = 'miss'
+            digest = hash_contenido(file_bytes)
+            return limpiar_columnar(
+                digest,
+                funcion_limpieza,
+                lambda: load_csv_file(file_bytes),
+                version=digest,
+                **parametros
+            )
+
+        df = obtener_o_calcular(clave, calcular)
+        span['filas_salida'] = None if df is None else len(df)
+        return df
+
+
+def load_clean_csv_files(archivos):
+    """
+    Carga y limpia varios archivos CSV; los que no están en caché se limpian en paralelo.
+
+    Parámetros:
+    -----------
+    archivos : dict
+        nombre -> (file_bytes, funcion_limpieza)
+
+    Retorna:
+    --------
+    tuple : (dict nombre -> DataFrame limpio, dict nombre -> segundos de limpieza).
+        Los datasets que ya estaban en caché tienen tiempo 0.
+    """
+    with traza('cargar_limpios', datasets=len(archivos)) as span:
+        limpios, tiempos = _cargar_limpios(archivos)
+        # 'hit' si todos los datasets limpios estaban en caché
+        span['cache'] = 'hit' if all(segundos == 0.0 for segundos in tiempos.values()) else 'miss'
+        return limpios, tiempos
+
+
+def _cargar_limpios(archivos):
+    limpios, tiempos, pendientes = {}, {}, {}
+    for nombre, (file_bytes, funcion_limpieza) in archivos.items():
+        clave = clave_cache(file_bytes, funcion_limpieza.__name__)
+        etapa = funcion_limpieza.__name__
+        # calcular retorna None: solo se consulta la caché en memoria y luego el almacén
+        df = obtener_o_calcular(clave, lambda: obtener_o_guardar(hash_contenido(file_bytes), etapa, lambda: None, {}))
+        if df is None:
+            df_crudo = load_csv_file(file_bytes)
+            if df_crudo is None:
+                limpios[nombre] = None
+                continue
+            pendientes[nombre] = (funcion_limpieza, df_crudo)
+        else:
+            limpios[nombre], tiempos[nombre] = df, 0.0
+
+    if pendientes:
+        nuevos, tiempos_nuevos = limpiar_datasets_en_paralelo(pendientes)
+        tiempos.update(tiempos_nuevos)
+        for nombre, df_limpio in nuevos.items():
+            file_bytes, funcion_limpieza = archivos[nombre]
+            obtener_o_guardar(hash_contenido(file_bytes), funcion_limpieza.__name__, lambda: df_limpio, {})
+            limpios[nombre] = obtener_o_calcular(clave_cache(file_bytes, funcion_limpieza.__name__), lambda: df_limpio)
+
+    return {nombre: limpios[nombre] for nombre in archivos}, tiempos
+
+
 def show_file_preview(df, num_rows=5):
     """Muestra una vista previa del archivo."""
     return df.head(num_rows)
@@ -0,0 +1,182 @@
+"""
+Codificación de claves de texto ('TRX-10001', 'PROD-1456') a enteros para los merges
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # sin pyarrow se usa siempre el diccionario compartido
+    pa = None
+    pc = None
+
+# Código de los valores nulos: nunca coincide con un entero parseado (son >= 0), pero sí
+# entre sí, igual que pd.merge empareja NaN con NaN
+CODIGO_NULO = -1
+
+# Potencias de 10 para contar dígitos de forma exacta con enteros
+_POTENCIAS_10 = 10 ** np.arange(1, 19, dtype=np.int64)
+
+_PATRON_PREFIJO_ENTERO = re.compile(r'^(.*?)(\d+)$')
+
+
+def _detectar_prefijo(series):
+    for serie in series:
+        no_nulos = serie.dropna()
+        if len(no_nulos) > 0:
+            coincidencia = _PATRON_PREFIJO_ENTERO.match(str(no_nulos.iloc[0]))
+            return coincidencia.group(1) if coincidencia else None
+    return None
+
+
+def _parsear_prefijo_entero(serie, prefijo):
+    """
+    Convierte 'PREFIJO123' a 123 (int64). Retorna None si algún valor no tiene el prefijo
+    o si la conversión no es biyectiva (ceros a la izquierda, signos, espacios...).
+    """
+    try:
+        arreglo = pa.array(serie.array if isinstance(serie, pd.Series) else serie, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columna object con valores que no son texto
+        return None
+    if not pa.types.is_string(arreglo.type) and not pa.types.is_large_string(arreglo.type):
+        return None
+    no_nulos = arreglo.drop_null()
+    if len(no_nulos) > 0 and not pc.all(pc.starts_with(no_nulos, prefijo)).as_py():
+        return None
+    digitos = pc.utf8_slice_codeunits(arreglo, len(prefijo))
+    try:
+        numeros = pc.cast(digitos, pa.int64())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+    validos = numeros.is_valid().to_numpy(zero_copy_only=False)
+    enteros = numeros.fill_null(CODIGO_NULO).to_numpy()
+    # '007' o '+7' también se convierten a 7: se exige que la cantidad de caracteres
+    # coincida con la cantidad de dígitos del número para que la codificación sea biyectiva
+    largo = pc.utf8_length(digitos).fill_null(0).to_numpy()
+    cantidad_digitos = np.searchsorted(_POTENCIAS_10, enteros, side='right') + 1
+    if ((enteros[validos] < 0) | (largo[validos] != cantidad_digitos[validos])).any():
+        return None
+    return enteros
+
+
+def codificar_claves(*series):
+    """
+    Codifica varias columnas de clave de texto con un mismo código entero por valor.
+
+    Si todos los valores siguen el patrón prefijo + entero ('TRX-10001') el código es el
+    propio entero, sin construir un diccionario. Si no, se usa un diccionario compartido
+    (pd.factorize sobre todas las columnas a la vez). Los nulos reciben CODIGO_NULO.
+
+    Parámetros:
+    -----------
+    *series : Series
+        Columnas de clave de los distintos dataframes
+
+    Retorna:
+    --------
+    tuple : (lista de arreglos int64, uno por serie; 'prefijo_entero' o 'diccionario')
+    """
+    if pa is not None:
+        prefijo = _detectar_prefijo(series)
+        if prefijo is not None:
+            codigos = [_parsear_prefijo_entero(serie, prefijo) for serie in series]
+            if all(c is not None for c in codigos):
+                return codigos, 'prefijo_entero'
+
+    unidas = pd.concat([pd.Series(serie).reset_index(drop=True) for serie in series], ignore_index=True)
+    codigos_unidos, _ = pd.factorize(unidas, use_na_sentinel=True)
+    codigos_unidos = codigos_unidos.astype(np.int64)
+    limites = np.cumsum([0] + [len(serie) for serie in series])
+    return [codigos_unidos[inicio:fin] for inicio, fin in zip(limites[:-1], limites[1:])], 'diccionario'
+
+
+def claves_codificables(*series):
+    """Indica si las columnas son de texto (las numéricas se unen directamente)."""
+    return all(
+        pd.api.types.is_string_dtype(serie.dtype) and not isinstance(serie.dtype, pd.CategoricalDtype)
+        for serie in series
+    )
+
+
+def primera_posicion(codigos, n_codigos, mascara=None):
+    """
+    Posición de la primera fila de cada código (0 .. n_codigos - 1). Si se pasa mascara
+    solo cuentan las filas donde es True; un código sin filas queda en len(codigos).
+    """
+    n = len(codigos)
+    posiciones = np.arange(n, dtype=np.int64)
+    if mascara is not None:
+        codigos, posiciones = codigos[mascara], posiciones[mascara]
+    primera = np.full(n_codigos, n, dtype=np.int64)
+    # minimum.at acumula sobre índices repetidos (una asignación con índices repetidos
+    # no garantiza cuál de los valores queda)
+    np.minimum.at(primera, codigos, posiciones)
+    return primera
+
+
+def reporte_join(claves_izquierda, claves_derecha, codigos_izquierda=None, codigos_derecha=None):
+    """
+    Diagnóstico de un join inner calculado en una sola pasada sobre las claves.
+
+    Las claves de ambos lados se factorizan juntas y se cuentan con bincount; de esos
+    conteos salen las claves coincidentes, las huérfanas de cada lado y las claves
+    repetidas que multiplican filas, sin ejecutar merges adicionales.
+
+    Parámetros:
+    -----------
+    claves_izquierda, claves_derecha : Series
+        Columnas de clave originales (se usan para listar las huérfanas)
+    codigos_izquierda, codigos_derecha : array, opcional
+        Claves ya codificadas con codificar_claves; si no se pasan se factorizan los valores
+
+    Retorna:
+    --------
+    dict : Conteos de filas y claves, filas extra por claves repetidas y las claves
+        huérfanas de cada lado (Series con el valor original, en orden de aparición)
+    """
+    izquierda = claves_izquierda if codigos_izquierda is None else codigos_izquierda
+    derecha = claves_derecha if codigos_derecha is None else codigos_derecha
+    n_izquierda, n_derecha = len(izquierda), len(derecha)
+
+    unidas = pd.concat([pd.Series(izquierda).reset_index(drop=True),
+                        pd.Series(derecha).reset_index(drop=True)], ignore_index=True)
+    # Sin centinela de nulos: pd.merge también empareja nulo con nulo
+    codigos, unicos = pd.factorize(unidas, use_na_sentinel=False)
+    total_claves = len(unicos)
+    conteo_izquierda = np.bincount(codigos[:n_izquierda], minlength=total_claves)
+    conteo_derecha = np.bincount(codigos[n_izquierda:], minlength=total_claves)
+
+    coinciden = (conteo_izquierda > 0) & (conteo_derecha > 0)
+    solo_izquierda = (conteo_izquierda > 0) & (conteo_derecha == 0)
+    solo_derecha = (conteo_izquierda == 0) & (conteo_derecha > 0)
+
+    # Primera posición de cada clave
+    primera = primera_posicion(codigos, total_claves)
+    originales = pd.concat([pd.Series(claves_izquierda).reset_index(drop=True),
+                            pd.Series(claves_derecha).reset_index(drop=True)], ignore_index=True)
+
+    def huerfanas(mascara):
+        posiciones = np.sort(primera[mascara])
+        return originales.iloc[posiciones].reset_index(drop=True)
+
+    filas_resultado = int((conteo_izquierda * conteo_derecha).sum())
+    return {
+        'filas_izquierda': n_izquierda,
+        'filas_derecha': n_derecha,
+        'filas_resultado': filas_resultado,
+        'claves_coincidentes': int(coinciden.sum()),
+        'claves_solo_izquierda': int(solo_izquierda.sum()),
+        'claves_solo_derecha': int(solo_derecha.sum()),
+        'filas_solo_izquierda': int(conteo_izquierda[solo_izquierda].sum()),
+        'filas_solo_derecha': int(conteo_derecha[solo_derecha].sum()),
+        'claves_repetidas_izquierda': int((coinciden & (conteo_izquierda > 1)).sum()),
+        'claves_repetidas_derecha': int((coinciden & (conteo_derecha > 1)).sum()),
+        # Filas que aparecen de más en el resultado porque su clave se repite en la derecha
+        'filas_extra_por_repetidas': filas_resultado - int(conteo_izquierda[coinciden].sum()),
+        'huerfanas_izquierda': huerfanas(solo_izquierda),
+        'huerfanas_derecha': huerfanas(solo_derecha),
+    }
@@ -0,0 +1,209 @@
+"""
+Limpieza por bloques (dos pasadas) para archivos de transacciones más grandes que la memoria
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from limpieza_datos_transacciones import calcular_limites_outliers_tiempo_entrega
+from utils.data_cleaning import limpiar_transacciones
+from utils.schemas import leer_csv_por_bloques
+
+# Filas por bloque por defecto: acota la memoria usada en cada pasada
+FILAS_POR_BLOQUE = 100_000
+
+# Máximo de valores distintos que guarda un conteo antes de compactarse
+MAX_VALORES_CONTEO = 200_000
+
+
+class ConteoValores:
+    """
+    Conteo de valores combinable entre bloques.
+
+    Guarda cuántas veces aparece cada valor, así que la moda, la mediana y los cuantiles
+    son exactos (con la misma interpolación lineal de pandas). Si una columna numérica
+    supera max_valores valores distintos, los valores vecinos se agrupan en su media
+    ponderada y los cuantiles pasan a ser aproximados (exacto = False).
+    """
+
+    def __init__(self, max_valores=MAX_VALORES_CONTEO):
+        self.max_valores = max_valores
+        self.conteos = pd.Series(dtype=np.int64)
+        self.nulos = 0
+        self.exacto = True
+
+    def actualizar(self, serie):
+        """Suma los valores de una serie (un bloque del archivo)."""
+        self.nulos += int(serie.isna().sum())
+        self._sumar(serie.value_counts(dropna=True))
+
+    def combinar(self, otro):
+        """Suma otro conteo (por ejemplo el de otro proceso o archivo)."""
+        self.nulos += otro.nulos
+        self.exacto = self.exacto and otro.exacto
+        self._sumar(otro.conteos)
+
+    @property
+    def total(self):
+        return int(self.conteos.sum())
+
+    def _sumar(self, conteos):
+        # value_counts de una columna categórica incluye las categorías sin filas
+        conteos = conteos[conteos > 0]
+        if len(conteos) == 0:
+            return
+        if len(self.conteos) == 0:
+            self.conteos = conteos.astype(np.int64)
+        else:
+            self.conteos = self.conteos.add(conteos, fill_value=0).astype(np.int64)
+        if len(self.conteos) > self.max_valores and pd.api.types.is_numeric_dtype(self.conteos.index):
+            self._compactar()
+
+    def _compactar(self):
+        ordenados = self.conteos.sort_index()
+        grupos = np.arange(len(ordenados)) * (self.max_valores // 2) // len(ordenados)
+        pesos = ordenados.to_numpy()
+        sumas = np.bincount(grupos, weights=ordenados.index.to_numpy(dtype=np.float64) * pesos)
+        cantidades = np.bincount(grupos, weights=pesos)
+        self.conteos = pd.Series(cantidades.astype(np.int64), index=sumas / cantidades)
+        self.exacto = False
+
+    def filtrar(self, inferior, superior):
+        """Retorna un conteo con solo los valores dentro de [inferior, superior]."""
+        filtrado = ConteoValores(self.max_valores)
+        indice = self.conteos.index
+        filtrado.conteos = self.conteos[(indice >= inferior) & (indice <= superior)]
+        filtrado.exacto = self.exacto
+        return filtrado
+
+    def cuantil(self, q):
+        """Cuantil q con interpolación lineal (como Series.quantile)."""
+        if self.total == 0:
+            return np.nan
+        ordenados = self.conteos.sort_index()
+        acumulado = np.cumsum(ordenados.to_numpy())
+        valores = ordenados.index.to_numpy(dtype=np.float64)
+        posicion = q * (acumulado[-1] - 1)
+        inferior, superior = np.floor(posicion), np.ceil(posicion)
+        valor_inferior = valores[np.searchsorted(acumulado, inferior, side='right')]
+        valor_superior = valores[np.searchsorted(acumulado, superior, side='right')]
+        return valor_inferior + (valor_superior - valor_inferior) * (posicion - inferior)
+
+    def mediana(self):
+        return self.cuantil(0.5)
+
+    def media(self):
+        if self.total == 0:
+            return np.nan
+        return float((self.conteos.index.to_numpy(dtype=np.float64) * self.conteos.to_numpy()).sum() / self.total)
+
+    def moda(self):
+        """Valor más frecuente; en empate el menor, como Series.mode()[0]. NaN si no hay valores."""
+        if self.total == 0:
+            return np.nan
+        ordenados = self.conteos.sort_index()
+        return ordenados.index[int(np.argmax(ordenados.to_numpy()))]
+
+
+def calcular_estadisticas_transacciones(bloques):
+    """
+    Primera pasada: recorre los bloques y calcula las estadísticas globales que usa
+    limpiar_transacciones (límites IQR y mediana de Tiempo_Entrega_Real, mediana de
+    Costo_Envio y moda de Estado_Envio) y el tipo de cada columna numérica en el archivo
+    completo.
+
+    Parámetros:
+    -----------
+    bloques : iterable
+        DataFrames con partes consecutivas del archivo de transacciones
+
+    Retorna:
+    --------
+    dict : Estadísticas en el formato que recibe limpiar_transacciones(df, estadisticas).
+        'tipos' tiene el tipo de cada columna numérica: float64 si algún bloque la trae
+        como decimal (p. ej. porque solo ese bloque tiene nulos), como en una sola lectura.
+    """
+    tiempo, costo, estado = ConteoValores(), ConteoValores(), ConteoValores()
+    filas = 0
+    tipos = {}
+    for df in bloques:
+        filas += len(df)
+        for col in df.columns:
+            if pd.api.types.is_numeric_dtype(df[col]) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                tipos[col] = np.result_type(tipos.get(col, df[col].dtype), df[col].dtype)
+        tiempo.actualizar(df['Tiempo_Entrega_Real'])
+        costo.actualizar(df['Costo_Envio'])
+        estado.actualizar(df['Estado_Envio'])
+
+    limites = calcular_limites_outliers_tiempo_entrega(tiempo.cuantil(0.25), tiempo.cuantil(0.75))
+    return {
+        'filas': filas,
+        'exactas': tiempo.exacto and costo.exacto,
+        'tipos': {col: str(tipo) for col, tipo in tipos.items()},
+        'tiempo_entrega': {
+            'limites': limites,
+            'valor_reemplazo': tiempo.filtrar(*limites).mediana(),
+        },
+        'costo_envio': {'valor': costo.mediana()},
+        'estado_envio': {'valor': estado.moda()},
+    }
+
+
+def limpiar_transacciones_por_bloques(ruta_entrada, ruta_salida, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Limpia un CSV de transacciones sin cargarlo completo en memoria.
+
+    Primera pasada: estadísticas globales con conteos combinables por bloque.
+    Segunda pasada: cada bloque se limpia con limpiar_transacciones usando esas
+    estadísticas y se agrega al CSV de salida. La memoria usada depende del tamaño
+    del bloque y del número de valores distintos, no del tamaño del archivo.
+
+    Parámetros:
+    -----------
+    ruta_entrada : str
+        CSV de transacciones original
+    ruta_salida : str
+        CSV limpio (se escribe en un archivo temporal y se renombra al terminar)
+    filas_por_bloque : int
+        Filas leídas en cada bloque
+
+    Retorna:
+    --------
+    dict : Estadísticas usadas en la limpieza y número de filas escritas
+    """
+    estadisticas = calcular_estadisticas_transacciones(
+        leer_csv_por_bloques(ruta_entrada, 'transacciones', filas_por_bloque)
+    )
+
+    directorio = os.path.dirname(os.path.abspath(ruta_salida))
+    os.makedirs(directorio, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    os.close(descriptor)
+    try:
+        primero = True
+        for df in leer_csv_por_bloques(ruta_entrada, 'transacciones', filas_por_bloque):
+            df_limpio = limpiar_transacciones(df, estadisticas)
+            # Mismos tipos en todos los bloques: un entero no se escribe como 3 en uno y 3.0 en otro
+            tipos = {col: tipo for col, tipo in estadisticas['tipos'].items() if col in df_limpio.columns}
+            df_limpio = df_limpio.astype(tipos)
+            df_limpio.to_csv(temporal, mode='w' if primero else 'a', header=primero, index=False)
+            primero = False
+        os.replace(temporal, ruta_salida)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+    print(f"Transacciones limpias: {estadisticas['filas']} filas → {ruta_salida}")
+    return estadisticas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Limpieza por bloques de un CSV de transacciones")
+    parser.add_argument('entrada', help="CSV de transacciones original")
+    parser.add_argument('salida', help="CSV limpio")
+    parser.add_argument('--filas-por-bloque', type=int, default=FILAS_POR_BLOQUE)
+    args = parser.parse_args()
+    limpiar_transacciones_por_bloques(args.entrada, args.salida, args.filas_por_bloque)
@@ -0,0 +1,289 @@
+"""
+Registro de métricas derivadas del dataset integrado.
+
+Cada métrica declara las columnas que necesita y una función vectorizada. Al pedir un
+conjunto de métricas se resuelven sus dependencias (columnas del dataframe u otras
+métricas) y se calcula solo lo necesario. Si quien llama pasa la versión de los datos (p. ej. los
+hashes de los archivos de origen), los resultados se recuerdan por esa versión y un rerun
+sobre los mismos datos no vuelve a calcularlos.
+
+Para agregar una métrica:
+
+    @registrar_metrica('Ticket_Promedio', ['Revenue', 'Cantidad_Efectiva'])
+    def _ticket_promedio(revenue, cantidad):
+        return revenue / cantidad
+"""
+import numpy as np
+import pandas as pd
+
+from utils.cache import CacheLRU
+
+# Presupuesto de memoria de la caché de métricas calculadas (en MB)
+MEMORIA_CACHE_METRICAS_MB = 256
+
+# nombre -> lista de definiciones alternativas, en orden de preferencia
+REGISTRO_METRICAS = {}
+
+_CACHE_METRICAS = CacheLRU(MEMORIA_CACHE_METRICAS_MB * 1024 * 1024)
+
+
+def registrar_metrica(nombre, entradas, descripcion='', intermedia=False):
+    """
+    Decorador que registra una función como definición de una métrica.
+
+    Registrar varias funciones con el mismo nombre agrega alternativas: se usa la
+    primera cuyas entradas estén disponibles (p. ej. una versión reducida cuando falta
+    una columna).
+
+    Parámetros:
+    -----------
+    nombre : str
+        Nombre de la columna que produce la métrica
+    entradas : list
+        Columnas del dataframe o nombres de otras métricas; la función las recibe como
+        Series en ese orden
+    descripcion : str
+        Texto corto para mostrar en las páginas
+    intermedia : bool
+        Si es True la métrica solo se usa como entrada de otras y no se agrega al
+        dataframe salvo que se pida explícitamente
+    """
+    def decorador(funcion):
+        REGISTRO_METRICAS.setdefault(nombre, []).append({
+            'entradas': tuple(entradas),
+            'funcion': funcion,
+            'descripcion': descripcion,
+            'intermedia': intermedia,
+        })
+        return funcion
+    return decorador
+
+
+def metricas_disponibles(incluir_intermedias=False):
+    """Retorna los nombres de las métricas registradas."""
+    return [
+        nombre for nombre, definiciones in REGISTRO_METRICAS.items()
+        if incluir_intermedias or not definiciones[0]['intermedia']
+    ]
+
+
+def _planificar(nombres, columnas, recalcular):
+    """
+    Ordena las métricas a calcular de forma que cada una aparezca después de sus
+    entradas. Retorna (plan: dict nombre -> definición en orden, faltantes).
+    """
+    plan = {}
+
+    def resolver(nombre, pila, forzar=False):
+        if nombre in plan or (nombre in columnas and not forzar):
+            return True
+        if nombre not in REGISTRO_METRICAS:
+            return False
+        if nombre in pila:
+            raise ValueError(f"Dependencia circular entre métricas: {' -> '.join(pila + [nombre])}")
+        for posicion, definicion in enumerate(REGISTRO_METRICAS[nombre]):
+            antes = dict(plan)
+            if all(resolver(entrada, pila + [nombre]) for entrada in definicion['entradas']):
+                plan[nombre] = (posicion, definicion)
+                return True
+            # Se descartan las dependencias agregadas por una alternativa incompleta
+            plan.clear()
+            plan.update(antes)
+        return False
+
+    faltantes = [nombre for nombre in nombres if not resolver(nombre, [], forzar=recalcular)]
+    return plan, faltantes
+
+
+def calcular_metricas(df, nombres=None, recalcular=False, usar_cache=None, version=None):
+    """
+    Calcula las métricas pedidas y sus dependencias, sin modificar df.
+
+    Parámetros:
+    -----------
+    df : DataFrame
+        Dataset integrado
+    nombres : list, opcional
+        Métricas a calcular; por defecto todas las no intermedias
+    recalcular : bool
+        Si es False, una métrica que ya es columna de df se toma de df; si es True se
+        vuelve a calcular a partir de sus entradas
+    usar_cache : bool, opcional
+        Reutiliza resultados calculados antes para la misma versión. Por defecto solo
+        se usa la caché si se pasa version
+    version : hashable, opcional
+        Identificador de la versión de los datos (p. ej. los hashes de los archivos de
+        origen). Quien llama garantiza que datos distintos tienen versiones distintas
+
+    Retorna:
+    --------
+    DataFrame : Una columna por métrica pedida que se pudo calcular (las que no tienen
+        sus entradas disponibles se omiten), con el índice de df
+    """
+    nombres = metricas_disponibles() if nombres is None else list(nombres)
+    desconocidas = [n for n in nombres if n not in REGISTRO_METRICAS and n not in df.columns]
+    if desconocidas:
+        raise ValueError(f"Métricas no registradas: {desconocidas}")
+    plan, faltantes = _planificar(nombres, df.columns, recalcular)
+
+    if usar_cache and version is None:
+        raise ValueError("usar_cache=True requiere la versión de los datos")
+    if usar_cache is False:
+        version = None
+
+    # Las intermedias no se guardan en caché: solo hacen falta para calcular las demás
+    en_cache = {
+        nombre: version is not None and (nombre in nombres or not definicion['intermedia'])
+        for nombre, (_, definicion) in plan.items()
+    }
+    valores = {}
+    for nombre, (posicion, definicion) in plan.items():
+        clave = (version, nombre, posicion)
+        valores[nombre] = _CACHE_METRICAS.obtener(clave) if en_cache[nombre] else None
+
+    # Se recorre el plan al revés para saber qué intermedias necesitan las métricas que faltan
+    necesarias = {nombre for nombre, valor in valores.items() if valor is None and nombre in nombres}
+    for nombre in reversed(list(plan)):
+        if nombre in necesarias:
+            necesarias.update(e for e in plan[nombre][1]['entradas'] if e in plan and valores[e] is None)
+
+    for nombre, (posicion, definicion) in plan.items():
+        if nombre not in necesarias:
+            continue
+        argumentos = [valores[e] if e in valores else df[e] for e in definicion['entradas']]
+        resultado = definicion['funcion'](*argumentos)
+        serie = pd.Series(resultado, index=df.index, name=nombre, copy=False) \
+            if not isinstance(resultado, pd.Series) else resultado.rename(nombre)
+        if en_cache[nombre]:
+            _CACHE_METRICAS.guardar((version, nombre, posicion), serie, serie.memory_usage(index=False, deep=True))
+        valores[nombre] = serie
+
+    # Sin copias: con copy-on-write, modificar el resultado no altera las series en caché
+    return pd.DataFrame(
+        {n: (valores[n] if n in valores else df[n]) for n in nombres if n not in faltantes},
+        index=df.index, copy=False,
+    )
+
+
+def agregar_metricas(df, nombres=None, copiar=True, recalcular=False, usar_cache=None, version=None):
+    """
+    Agrega al dataframe las métricas pedidas (ver calcular_metricas).
+
+    Parámetros:
+    -----------
+    copiar : bool
+        Si es False las columnas se agregan directamente a df (usar solo cuando el
+        llamador es dueño del dataframe)
+
+    Retorna:
+    --------
+    DataFrame : df (o su copia) con las columnas de las métricas
+    """
+    metricas = calcular_metricas(df, nombres, recalcular=recalcular, usar_cache=usar_cache, version=version)
+    if copiar:
+        df = df.copy()
+    for nombre in metricas.columns:
+        df[nombre] = metricas[nombre]
+    return df
+
+
+def estadisticas_cache_metricas():
+    """Retorna hits, misses y memoria usada por la caché de métricas."""
+    return _CACHE_METRICAS.estadisticas()
+
+
+def limpiar_cache_metricas():
+    """Vacía la caché de métricas y reinicia sus contadores."""
+    _CACHE_METRICAS.limpiar()
+
+
+# ============================================================
+# Métricas del dataset integrado
+# ============================================================
+
+def _a_float(serie):
+    """Serie como arreglo float64 (nulos como NaN)."""
+    return serie.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+@registrar_metrica('Cantidad_Efectiva', ['Cantidad_Vendida'], intermedia=True,
+                   descripcion="Cantidad vendida con 0 reemplazado por 1 para evitar divisiones por cero")
+def _cantidad_efectiva(cantidad_vendida):
+    cantidad = np.array(_a_float(cantidad_vendida))
+    cantidad[cantidad == 0] = 1
+    return cantidad
+
+
+@registrar_metrica('Costo_Envio_Imputado', ['Costo_Envio'], intermedia=True,
+                   descripcion="Costo de envío con nulos en 0")
+def _costo_envio_imputado(costo_envio):
+    costo = np.array(_a_float(costo_envio))
+    costo[np.isnan(costo)] = 0
+    return costo
+
+
+@registrar_metrica('Diferencia_Precio_Costo', ['Precio_Venta_Final', 'Costo_Unitario_USD'], intermedia=True,
+                   descripcion="Precio de venta menos costo unitario")
+def _diferencia_precio_costo(precio, costo):
+    return np.subtract(_a_float(precio), _a_float(costo))
+
+
+@registrar_metrica('Rating_Servicio', ['Rating_Producto', 'Rating_Logistica'],
+                   descripcion="Combinación normalizada de Rating_Producto y Rating_Logistica")
+def _rating_servicio(rating_producto, rating_logistica):
+    return (rating_producto * rating_logistica) / 5
+
+
+@registrar_metrica('Rating_Servicio', ['Rating_Producto'])
+def _rating_servicio_solo_producto(rating_producto):
+    return rating_producto
+
+
+@registrar_metrica('Margen_Unitario_Pct', ['Diferencia_Precio_Costo', 'Precio_Venta_Final'],
+                   descripcion="Margen por unidad (%) antes del costo de envío")
+def _margen_unitario_pct(diferencia, precio):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margen = np.divide(_a_float(diferencia), _a_float(precio))
+        np.multiply(margen, 100, out=margen)
+    margen[np.isnan(margen)] = 0
+    margen[margen < 0] = 0  # No permitir márgenes negativos
+    return margen
+
+
+@registrar_metrica('Margen_Unitario_Pct', ['Costo_Unitario_USD'])
+def _margen_unitario_sin_precio(costo):
+    return costo
+
+
+@registrar_metrica('Ganancia_Neta_Total',
+                   ['Diferencia_Precio_Costo', 'Costo_Envio_Imputado', 'Cantidad_Efectiva'],
+                   descripcion="Ganancia total en USD considerando costo de envío")
+def _ganancia_neta_total(diferencia, costo_envio, cantidad):
+    cantidad = _a_float(cantidad)
+    # (precio - costo - envío por unidad) × cantidad
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ganancia = np.divide(_a_float(costo_envio), cantidad)
+        np.subtract(_a_float(diferencia), ganancia, out=ganancia)
+        np.multiply(ganancia, cantidad, out=ganancia)
+    ganancia[ganancia < 0] = 0
+    ganancia[np.isnan(ganancia)] = 0
+    return ganancia
+
+
+@registrar_metrica('Margen_Real_Pct', ['Ganancia_Neta_Total', 'Precio_Venta_Final', 'Cantidad_Efectiva'],
+                   descripcion="Margen real (%) considerando todos los costos")
+def _margen_real_pct(ganancia, precio, cantidad):
+    # Margen real = Ganancia / (Precio_Venta × Cantidad) × 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margen = np.multiply(_a_float(precio), _a_float(cantidad))
+        np.divide(_a_float(ganancia), margen, out=margen)
+        np.multiply(margen, 100, out=margen)
+    margen[np.isnan(margen)] = 0
+    np.clip(margen, -100, 100, out=margen)  # Limitar entre -100% y 100%
+    return margen
+
+
+@registrar_metrica('Revenue', ['Cantidad_Vendida', 'Precio_Venta_Final'],
+                   descripcion="Ingreso de la transacción (cantidad × precio de venta)")
+def _revenue(cantidad_vendida, precio):
+    return cantidad_vendida * precio
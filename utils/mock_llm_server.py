@@ -0,0 +1,163 @@
+"""
+Servidor local que simula la API de chat completions (Groq / OpenAI) para pruebas y
+demostraciones sin API key ni conexión.
+
+Responde POST .../chat/completions con un texto fijo, en stream SSE si la solicitud pide
+"stream": true o como JSON completo si no. Uso desde la línea de comandos:
+
+    python -m utils.mock_llm_server --puerto 8765
+    GROQ_BASE_URL=http://127.0.0.1:8765/v1 streamlit run main.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPUESTA_POR_DEFECTO = (
+    "El análisis muestra oportunidades claras de mejora en los datos revisados.\n\n"
+    "En el corto plazo conviene priorizar los casos críticos identificados.\n\n"
+    "En el mediano plazo se recomienda automatizar el seguimiento de estos indicadores."
+)
+
+
+class ServidorLLMSimulado:
+    """
+    Servidor de chat completions simulado en un hilo de fondo.
+
+    Parámetros:
+    -----------
+    respuesta : str
+        Texto que se responde a cada solicitud (se envía palabra por palabra en stream)
+    retraso : float
+        Segundos de espera entre fragmentos del stream
+    errores : list
+        Códigos HTTP que se responden, en orden, a las primeras solicitudes (p. ej. [429])
+    reintentar_en : float, opcional
+        Valor de la cabecera Retry-After en las respuestas de error
+    puerto : int
+        Puerto local (0 elige uno libre)
+
+    Registra las solicitudes recibidas (solicitudes) y el máximo de solicitudes atendidas
+    al mismo tiempo (max_simultaneas). Se usa como context manager:
+
+        with ServidorLLMSimulado() as servidor:
+            generar_reporte(prompt, 'clave', url=servidor.url)
+    """
+
+    def __init__(self, respuesta=RESPUESTA_POR_DEFECTO, retraso=0.0, errores=None, reintentar_en=None, puerto=0):
+        self.respuesta = respuesta
+        self.retraso = retraso
+        self.errores = list(errores or [])
+        self.reintentar_en = reintentar_en
+        self.solicitudes = []
+        self.max_simultaneas = 0
+        self._en_curso = 0
+        self._lock = threading.Lock()
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', puerto), self._manejador())
+        self._servidor.daemon_threads = True
+        self._hilo = None
+
+    @property
+    def url(self):
+        """URL base para el servicio de reportes (equivalente a .../openai/v1)."""
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}/v1"
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *excepcion):
+        self.detener()
+
+    def _manejador(self):
+        simulador = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def log_message(self, formato, *argumentos):
+                pass
+
+            def _responder_json(self, estado, contenido):
+                datos = json.dumps(contenido).encode('utf-8')
+                self.send_response(estado)
+                self.send_header('Content-Type', 'application/json')
+                if estado >= 400 and simulador.reintentar_en is not None:
+                    self.send_header('Retry-After', str(simulador.reintentar_en))
+                self.send_header('Content-Length', str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def do_POST(self):
+                with simulador._lock:
+                    simulador._en_curso += 1
+                    simulador.max_simultaneas = max(simulador.max_simultaneas, simulador._en_curso)
+                try:
+                    self._atender()
+                finally:
+                    with simulador._lock:
+                        simulador._en_curso -= 1
+
+            def _atender(self):
+                if not self.path.endswith('/chat/completions'):
+                    return self._responder_json(404, {'error': {'message': 'Ruta no encontrada'}})
+                cuerpo = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with simulador._lock:
+                    simulador.solicitudes.append(cuerpo)
+                    error = simulador.errores.pop(0) if simulador.errores else None
+                if error is not None:
+                    return self._responder_json(error, {'error': {'message': f'Error simulado {error}'}})
+                if not self.headers.get('Authorization', '').startswith('Bearer '):
+                    return self._responder_json(401, {'error': {'message': 'Falta la API key'}})
+
+                if not cuerpo.get('stream'):
+                    return self._responder_json(200, {
+                        'object': 'chat.completion',
+                        'model': cuerpo.get('model'),
+                        'choices': [{'index': 0, 'finish_reason': 'stop',
+                                     'message': {'role': 'assistant', 'content': simulador.respuesta}}],
+                    })
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                palabras = simulador.respuesta.split(' ')
+                for i, palabra in enumerate(palabras):
+                    fragmento = palabra if i == len(palabras) - 1 else palabra + ' '
+                    evento = {'object': 'chat.completion.chunk', 'model': cuerpo.get('model'),
+                              'choices': [{'index': 0, 'delta': {'content': fragmento}, 'finish_reason': None}]}
+                    self.wfile.write(f"data: {json.dumps(evento)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                    if simulador.retraso:
+                        time.sleep(simulador.retraso)
+                fin = {'object': 'chat.completion.chunk',
+                       'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+                self.wfile.write(f"data: {json.dumps(fin)}\n\ndata: [DONE]\n\n".encode('utf-8'))
+                self.wfile.flush()
+
+        return Manejador
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que simula la API de chat completions")
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--retraso', type=float, default=0.02, help="Segundos entre fragmentos del stream")
+    args = parser.parse_args()
+    servidor = ServidorLLMSimulado(retraso=args.retraso, puerto=args.puerto)
+    print(f"🤖 Servidor simulado escuchando en {servidor.url} (Ctrl+C para detener)")
+    try:
+        servidor._servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor._servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Registro de rendimiento por sesión para el panel de rendimiento de la app.
+
+Cada página llama a iniciar_ejecucion (a través de init_session_state) al empezar: los
+spans de utils.tracing que se producen durante esa ejecución (carga, limpieza, health
+score, merge, métricas y gráficas) se guardan en un sink propio de la sesión,
+etiquetados con la página y el número de ejecución. El panel los agrupa por etapa y
+muestra además la memoria que ocupa cada clave de st.session_state.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.tracing import SinkMemoria, descartar_trazas_abiertas, fijar_sinks_contexto
+
+# Clave de session_state donde vive el registro de la sesión
+CLAVE_REGISTRO = '_registro_rendimiento'
+
+# Spans que se recuerdan por sesión (los más antiguos se descartan)
+MAX_SPANS_SESION = 2000
+
+# Etapa del panel según el nombre del span
+ETAPAS = {
+    'cargar_csv': 'Carga',
+    'cargar_limpio': 'Limpieza',
+    'cargar_limpios': 'Limpieza',
+    'limpiar_inventario': 'Limpieza',
+    'limpiar_feedback': 'Limpieza',
+    'limpiar_transacciones': 'Limpieza',
+    'calcular_health_score': 'Health score',
+    'merge_en_sesion': 'Merge',
+    'preparar_dashboard_merge': 'Merge',
+    'integrar_datos': 'Merge',
+    'crear_metricas_nuevas': 'Métricas',
+    'graficos': 'Gráficas',
+}
+
+ORDEN_ETAPAS = ['Carga', 'Limpieza', 'Health score', 'Merge', 'Métricas', 'Gráficas', 'Otros']
+
+
+class RegistroSesion(SinkMemoria):
+    """Sink de la sesión: agrega a cada span la página y la ejecución en curso."""
+
+    def __init__(self, max_spans=MAX_SPANS_SESION):
+        super().__init__(max_spans)
+        self.ejecucion = 0
+        self.pagina = None
+
+    def iniciar(self, pagina):
+        self.ejecucion += 1
+        self.pagina = pagina
+
+    def emitir(self, span):
+        super().emitir({**span, 'pagina': self.pagina, 'ejecucion': self.ejecucion})
+
+
+def iniciar_ejecucion(session_state, pagina):
+    """
+    Marca el comienzo de una ejecución de la página y dirige sus trazas al registro de
+    la sesión (que se crea la primera vez).
+
+    Retorna:
+    --------
+    RegistroSesion : Registro de la sesión
+    """
+    registro = session_state.get(CLAVE_REGISTRO)
+    if registro is None:
+        registro = RegistroSesion()
+        session_state[CLAVE_REGISTRO] = registro
+    registro.iniciar(pagina)
+    # Una ejecución anterior interrumpida pudo dejar abierta la traza de una sección
+    descartar_trazas_abiertas()
+    fijar_sinks_contexto(registro)
+    return registro
+
+
+def tabla_spans(spans):
+    """
+    Spans como DataFrame con la etapa de cada uno y la profundidad en el árbol de llamadas.
+
+    Retorna:
+    --------
+    DataFrame : una fila por span, en orden de inicio
+    """
+    columnas = ['ejecucion', 'pagina', 'etapa', 'nombre', 'nivel', 'segundos', 'cpu_segundos', 'cache',
+                'filas_entrada', 'filas_salida', 'memoria_pico_mb', 'error', 'id', 'padre_id', 'inicio']
+    if not spans:
+        return pd.DataFrame(columns=columnas)
+    df = pd.DataFrame(spans).reindex(columns=columnas)
+    df = df.sort_values('inicio', kind='mergesort').reset_index(drop=True)
+    for col in ['filas_entrada', 'filas_salida']:
+        df[col] = df[col].astype('Int64')
+
+    # Profundidad y etapa: un span sin padre registrado es de nivel 0, y un paso sin etapa
+    # propia (p. ej. imputar_valores_columna_categoria) toma la de su padre. Los padres
+    # empiezan antes que sus hijos, así que ya están resueltos al llegar al hijo.
+    niveles, etapas = {}, {}
+    for id_span, padre, nombre in zip(df['id'], df['padre_id'], df['nombre']):
+        tiene_padre = pd.notna(padre) and padre in niveles
+        niveles[id_span] = niveles[padre] + 1 if tiene_padre else 0
+        etapas[id_span] = ETAPAS.get(nombre) or (etapas[padre] if tiene_padre else 'Otros')
+    df['nivel'] = df['id'].map(niveles)
+    df['etapa'] = df['id'].map(etapas)
+    return df
+
+
+def resumen_por_etapa(tabla):
+    """
+    Tiempo por etapa de una ejecución, sumando solo los spans de nivel 0 para no contar
+    dos veces los pasos anidados (p. ej. limpiar_inventario dentro de cargar_limpio).
+
+    Retorna:
+    --------
+    DataFrame : etapa, segundos, cpu_segundos, spans, hits y misses de caché
+    """
+    superiores = tabla[tabla['nivel'] == 0]
+    resumen = superiores.groupby('etapa', sort=False).agg(
+        segundos=('segundos', 'sum'),
+        cpu_segundos=('cpu_segundos', 'sum'),
+        spans=('nombre', 'size'),
+        hits=('cache', lambda c: int((c == 'hit').sum())),
+        misses=('cache', lambda c: int((c == 'miss').sum())),
+    )
+    orden = [etapa for etapa in ORDEN_ETAPAS if etapa in resumen.index]
+    return resumen.reindex(orden).reset_index()
+
+
+def tamano_objeto(valor, _vistos=None):
+    """
+    Memoria aproximada (bytes) de un valor guardado en session_state: DataFrames con
+    memory_usage(deep=True), arrays por nbytes y contenedores sumando su contenido.
+    """
+    _vistos = set() if _vistos is None else _vistos
+    if id(valor) in _vistos:
+        return 0
+    _vistos.add(id(valor))
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, SinkMemoria):
+        return sys.getsizeof(valor) + tamano_objeto(valor.spans, _vistos)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(
+            tamano_objeto(k, _vistos) + tamano_objeto(v, _vistos) for k, v in valor.items()
+        )
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(tamano_objeto(v, _vistos) for v in valor)
+    return sys.getsizeof(valor)
+
+
+def memoria_session_state(session_state):
+    """
+    Memoria ocupada por cada clave de session_state, de mayor a menor.
+
+    Retorna:
+    --------
+    DataFrame : clave, tipo y megabytes
+    """
+    filas = [
+        {'clave': str(clave), 'tipo': type(valor).__name__, 'megabytes': tamano_objeto(valor) / 1024 ** 2}
+        for clave, valor in session_state.items()
+    ]
+    tabla = pd.DataFrame(filas, columns=['clave', 'tipo', 'megabytes'])
+    return tabla.sort_values('megabytes', ascending=False, kind='mergesort').reset_index(drop=True)
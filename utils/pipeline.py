@@ -0,0 +1,194 @@
+"""
+Motor declarativo de las pipelines de limpieza.
+
+Cada paso declara las columnas que lee y las que escribe, y sus parámetros:
+
+    PIPELINE_FEEDBACK = PipelineLimpieza('feedback', [
+        Paso(manejar_outliers_edad_cliente, lee=['Edad_Cliente'], escribe=['Edad_Cliente'], medida='Mediana'),
+        Paso(imputar_valores_recomienda_marca, lee=['Recomienda_Marca'], escribe=['Recomienda_Marca']),
+    ])
+    df_limpio, errores = PIPELINE_FEEDBACK.ejecutar(df)
+
+Con esa declaración el motor:
+- No copia los datos de entrada: cada paso recibe una selección con solo sus columnas y
+  se ejecuta con inplace=True sobre ella (la selección es la única copia defensiva, y con
+  copy-on-write solo se copian las columnas que el paso escribe). Las columnas que
+  escribe se asignan de vuelta en un DataFrame nuevo, sin tocar el del llamador.
+- Agrupa en una etapa los pasos consecutivos que no escriben columnas que otro de la
+  etapa lee o escribe: todos parten del mismo estado y sus salidas se asignan juntas.
+- Si un paso falla, sus columnas quedan como estaban y el error se retorna como un dict
+  (paso, columnas, tipo, mensaje) además de quedar en la traza del paso.
+- Con una versión de los datos (p. ej. el hash del archivo) recuerda la salida de cada
+  paso por sus parámetros y la versión de las columnas que toca: al cambiar un parámetro
+  solo se recalculan ese paso y los que leen lo que escribe.
+"""
+import hashlib
+
+from utils.cache import CacheLRU
+from utils.tracing import traza
+
+# Presupuesto de memoria de la caché de salidas por paso (en MB)
+MEMORIA_CACHE_PASOS_MB = 256
+
+_CACHE_PASOS = CacheLRU(MEMORIA_CACHE_PASOS_MB * 1024 * 1024)
+
+
+class Paso:
+    """
+    Paso de limpieza: una función df -> df que solo toca las columnas declaradas.
+
+    Parámetros:
+    -----------
+    funcion : callable
+        Recibe un DataFrame con las columnas de lee y escribe, los parámetros como
+        argumentos con nombre e inplace=True (puede modificar ese DataFrame, que es del
+        motor) y retorna un DataFrame con las mismas filas
+    lee : list
+        Columnas que el paso necesita
+    escribe : list
+        Columnas que el paso modifica o crea
+    **parametros :
+        Argumentos por defecto de la función
+    """
+
+    def __init__(self, funcion, lee, escribe, **parametros):
+        self.funcion = funcion
+        self.nombre = funcion.__name__
+        self.lee = tuple(lee)
+        self.escribe = tuple(escribe)
+        self.parametros = parametros
+
+    @property
+    def columnas(self):
+        return tuple(dict.fromkeys(self.lee + self.escribe))
+
+    def independiente_de(self, otro):
+        """True si ninguno de los dos pasos escribe columnas que el otro lee o escribe."""
+        return not (set(self.escribe) & set(otro.columnas) or set(otro.escribe) & set(self.columnas))
+
+    def __repr__(self):
+        return f"Paso({self.nombre}, lee={list(self.lee)}, escribe={list(self.escribe)})"
+
+
+def _planificar_etapas(pasos):
+    """Agrupa los pasos consecutivos independientes entre sí, conservando el orden."""
+    etapas = []
+    for paso in pasos:
+        if etapas and all(paso.independiente_de(otro) for otro in etapas[-1]):
+            etapas[-1].append(paso)
+        else:
+            etapas.append([paso])
+    return etapas
+
+
+def _clave_paso(pipeline, paso, argumentos, version, versiones):
+    entrada = [(columna, versiones.get(columna)) for columna in paso.columnas]
+    contenido = repr((version, pipeline, paso.nombre, sorted(argumentos.items()), entrada))
+    return hashlib.blake2b(contenido.encode(), digest_size=16).hexdigest()
+
+
+def _calcular_paso(df, paso, argumentos):
+    """Ejecuta el paso sobre sus columnas y retorna las columnas que escribe."""
+    # Una columna de salida que todavía no existe la crea el paso; una de entrada que falta es un error
+    seleccion = [columna for columna in paso.columnas if columna in paso.lee or columna in df.columns]
+    resultado = paso.funcion(df[seleccion], inplace=True, **argumentos)
+    if len(resultado) != len(df) or not resultado.index.equals(df.index):
+        raise ValueError(f"El paso '{paso.nombre}' cambió las filas del DataFrame")
+    return {columna: resultado[columna] for columna in paso.escribe}
+
+
+class PipelineLimpieza:
+    """
+    Secuencia de pasos declarados que se ejecuta por etapas (ver el docstring del módulo).
+
+    Parámetros:
+    -----------
+    nombre : str
+        Nombre del dataset; forma parte de la clave de caché de cada paso
+    pasos : list
+        Pasos en el orden en que se aplican
+    """
+
+    def __init__(self, nombre, pasos):
+        self.nombre = nombre
+        self.pasos = list(pasos)
+        nombres = [paso.nombre for paso in self.pasos]
+        if len(set(nombres)) != len(nombres):
+            raise ValueError(f"Pasos repetidos en la pipeline '{nombre}': {nombres}")
+        self.etapas = _planificar_etapas(self.pasos)
+
+    def ejecutar(self, df, parametros=None, version=None):
+        """
+        Aplica los pasos sin modificar df.
+
+        Parámetros:
+        -----------
+        df : DataFrame
+            Dataset crudo (no se modifica)
+        parametros : dict, opcional
+            nombre del paso -> argumentos que reemplazan a los declarados
+        version : hashable, opcional
+            Identificador de los datos de df (p. ej. el hash del archivo). Si se pasa, la
+            salida de cada paso se recuerda y se reutiliza; sin versión no se usa caché
+
+        Retorna:
+        --------
+        tuple : (DataFrame limpio, lista de errores). Cada error es un dict con el paso,
+            las columnas que no se actualizaron, el tipo de excepción y su mensaje.
+        """
+        parametros = parametros or {}
+        desconocidos = set(parametros) - {paso.nombre for paso in self.pasos}
+        if desconocidos:
+            raise ValueError(f"Pasos desconocidos en la pipeline '{self.nombre}': {sorted(desconocidos)}")
+
+        # Copia superficial: el motor solo reemplaza columnas enteras, nunca escribe en
+        # los arrays de df
+        df = df.copy(deep=False)
+        errores = []
+        # columna -> clave del último paso que la escribió (las columnas originales no están)
+        versiones = {}
+        for etapa in self.etapas:
+            salidas = {}
+            for paso in etapa:
+                argumentos = {**paso.parametros, **parametros.get(paso.nombre, {})}
+                salida = self._ejecutar_paso(df, paso, argumentos, version, versiones, errores)
+                salidas.update(salida or {})
+            for columna, serie in salidas.items():
+                df[columna] = serie
+        return df, errores
+
+    def _ejecutar_paso(self, df, paso, argumentos, version, versiones, errores):
+        clave = None if version is None else _clave_paso(self.nombre, paso, argumentos, version, versiones)
+        try:
+            with traza(paso.nombre, filas_entrada=len(df), cache=None if clave is None else 'hit') as span:
+                salida = None if clave is None else _CACHE_PASOS.obtener(clave)
+                if salida is None:
+                    salida = _calcular_paso(df, paso, argumentos)
+                    if clave is not None:
+                        span['cache'] = 'miss'
+                        tamano = sum(serie.memory_usage(index=False, deep=True) for serie in salida.values())
+                        _CACHE_PASOS.guardar(clave, salida, tamano)
+                span['filas_salida'] = len(df)
+        except Exception as e:
+            errores.append({
+                'paso': paso.nombre,
+                'columnas': list(paso.escribe),
+                'tipo': type(e).__name__,
+                'mensaje': str(e),
+            })
+            return None
+
+        if clave is not None:
+            for columna in paso.escribe:
+                versiones[columna] = clave
+        return salida
+
+
+def estadisticas_cache_pasos():
+    """Retorna hits, misses, entradas y memoria usada por la caché de salidas por paso."""
+    return _CACHE_PASOS.estadisticas()
+
+
+def limpiar_cache_pasos():
+    """Vacía la caché de salidas por paso y reinicia sus contadores."""
+    _CACHE_PASOS.limpiar()
@@ -0,0 +1,239 @@
+"""
+Prompts de los reportes con IA de cada dashboard.
+
+Cada función arma el resumen de su dataset y lo envuelve en las instrucciones para el
+modelo; las usan las páginas individuales y la página de reportes que genera todos a la vez.
+"""
+import pandas as pd
+
+from utils.rollup import consultar_cubo, conteos, total_cubo
+
+# Nombre de cada reporte -> título en el reporte combinado
+TITULOS_REPORTES = {
+    'inventario': "📦 Inventario",
+    'feedback': "💬 Feedback de Clientes",
+    'transacciones': "💳 Transacciones Logísticas",
+    'merge': "🔗 Análisis Integrado",
+}
+
+
+def _armar_prompt(especialidad, descripcion_datos, resumen, parrafos):
+    """Instrucciones comunes: rol del consultor, resumen y formato de 3 párrafos."""
+    formato = '\n'.join(f"- Párrafo {i}: {texto}" for i, texto in enumerate(parrafos, start=1))
+    return f"""Eres un consultor estratégico senior especializado en {especialidad}
+
+Analiza estos {descripcion_datos}:
+
+{resumen}
+
+Genera exactamente 3 párrafos de recomendaciones estratégicas accionables y específicas.
+
+Formato requerido:
+{formato}
+
+Escribe los 3 párrafos separados por línea en blanco, sin títulos ni numeración."""
+
+
+def _pct(cantidad, total):
+    return cantidad / total * 100
+
+
+def prompt_inventario(df_limpio):
+    """Prompt del reporte de inventario a partir del inventario limpio."""
+    criticos = int((df_limpio['Stock_Actual'] < df_limpio['Punto_Reorden']).sum())
+    resumen = f"""
+Datos de Inventario - TechLogistics S.A.
+
+Total de productos en catálogo: {len(df_limpio)}
+
+Estadísticas de Stock Actual:
+{df_limpio['Stock_Actual'].describe().to_string()}
+
+Productos con stock crítico (< Punto_Reorden):
+{criticos} productos ({_pct(criticos, len(df_limpio)):.1f}%)
+
+Distribución por bodega:
+{df_limpio['Bodega_Origen'].value_counts().to_string()}
+
+Estadísticas de costos:
+{df_limpio['Costo_Unitario_USD'].describe().to_string()}
+
+Valor total del inventario: ${(df_limpio['Stock_Actual'] * df_limpio['Costo_Unitario_USD']).sum():,.2f} USD
+
+Lead time promedio: {df_limpio['Lead_Time_Dias'].mean():.1f} días
+"""
+    return _armar_prompt(
+        "gestión de inventarios para TechLogistics S.A.", "datos de inventario", resumen,
+        ["Análisis de la situación actual del inventario y principales hallazgos críticos",
+         "Recomendación táctica inmediata para optimizar stock (corto plazo)",
+         "Recomendación estratégica para gestión de inventario (mediano-largo plazo)"],
+    )
+
+
+def prompt_feedback(df_limpio):
+    """Prompt del reporte de feedback a partir del feedback limpio."""
+    producto_bajo = int((df_limpio['Rating_Producto'] <= 2).sum())
+    logistica_bajo = int((df_limpio['Rating_Logistica'] <= 2).sum())
+    resumen = f"""
+Datos de Feedback de Clientes - TechLogistics S.A.
+
+Total de registros: {len(df_limpio)}
+
+Estadísticas de Rating_Producto:
+{df_limpio['Rating_Producto'].describe().to_string()}
+
+Estadísticas de Rating_Logistica:
+{df_limpio['Rating_Logistica'].describe().to_string()}
+
+Distribución de Satisfaccion_NPS:
+{df_limpio['Satisfaccion_NPS'].value_counts().head(10).to_string()}
+
+Análisis de calidad:
+- Comentarios con rating producto bajo (≤2): {producto_bajo} ({_pct(producto_bajo, len(df_limpio)):.1f}%)
+- Comentarios con rating logística bajo (≤2): {logistica_bajo} ({_pct(logistica_bajo, len(df_limpio)):.1f}%)
+
+Rating promedio producto: {df_limpio['Rating_Producto'].mean():.2f}/5.0
+Rating promedio logística: {df_limpio['Rating_Logistica'].mean():.2f}/5.0
+NPS promedio: {df_limpio['Satisfaccion_NPS'].mean():.2f}/10.0
+"""
+    return _armar_prompt(
+        "experiencia del cliente para TechLogistics S.A.", "datos de feedback de clientes", resumen,
+        ["Análisis de la satisfacción del cliente y principales hallazgos",
+         "Recomendación táctica inmediata para mejorar la experiencia (corto plazo)",
+         "Recomendación estratégica para fidelización de clientes (mediano-largo plazo)"],
+    )
+
+
+def prompt_transacciones(df_limpio):
+    """Prompt del reporte logístico a partir de las transacciones limpias."""
+    ingresos = (df_limpio['Cantidad_Vendida'] * df_limpio['Precio_Venta_Final']).sum()
+    costo_envio = df_limpio['Costo_Envio'].sum()
+    rapidas = int((df_limpio['Tiempo_Entrega_Real'] <= 3).sum())
+    lentas = int((df_limpio['Tiempo_Entrega_Real'] > 7).sum())
+    resumen = f"""
+Datos de Transacciones Logísticas - TechLogistics S.A.
+
+Total de transacciones: {len(df_limpio)}
+
+Estadísticas de Tiempo_Entrega_Real:
+{df_limpio['Tiempo_Entrega_Real'].describe().to_string()}
+
+Distribución por estado de envío:
+{df_limpio['Estado_Envio'].value_counts().to_string()}
+
+Top 10 ciudades destino:
+{df_limpio['Ciudad_Destino'].value_counts().head(10).to_string()}
+
+Análisis financiero:
+- Ingresos totales: ${ingresos:,.2f} USD
+- Costos de envío totales: ${costo_envio:,.2f} USD
+- Margen neto: ${(ingresos - costo_envio):,.2f} USD
+
+Métricas operativas:
+- Tiempo promedio de entrega: {df_limpio['Tiempo_Entrega_Real'].mean():.1f} días
+- Entregas rápidas (≤3 días): {rapidas} ({_pct(rapidas, len(df_limpio)):.1f}%)
+- Entregas lentas (>7 días): {lentas} ({_pct(lentas, len(df_limpio)):.1f}%)
+"""
+    return _armar_prompt(
+        "logística y operaciones para TechLogistics S.A.", "datos de transacciones logísticas", resumen,
+        ["Análisis del desempeño logístico actual y principales hallazgos",
+         "Recomendación táctica inmediata para optimizar entregas (corto plazo)",
+         "Recomendación estratégica para eficiencia operativa (mediano-largo plazo)"],
+    )
+
+
+def prompt_merge(df_integrado, cubo, health_score):
+    """
+    Prompt del reporte integrado.
+
+    Parámetros:
+    -----------
+    df_integrado : DataFrame
+        Dataset integrado con las métricas nuevas
+    cubo : dict
+        Cubo de agregados del dashboard (utils.rollup.construir_cubo)
+    health_score : float
+        Health score del dataset integrado
+    """
+    filas = cubo['filas']
+    estados = conteos(cubo, 'Estado_Envio')
+    ciudades = conteos(cubo, 'Ciudad_Destino')
+    canales = conteos(cubo, 'Canal_Venta')
+    revenue_canal = consultar_cubo(cubo, ['Canal_Venta'], {'Revenue': 'sum'})['Revenue']
+    resumen = f"""
+Análisis Integrado - Data Validation & Integration Report
+
+Total de Registros Integrados: {filas}
+Fecha de Análisis: {pd.Timestamp.now().strftime('%Y-%m-%d')}
+
+📊 MÉTRICAS FINANCIERAS:
+- Revenue Total: ${total_cubo(cubo, 'Revenue'):,.2f}
+- Ganancia Neta Total: ${total_cubo(cubo, 'Ganancia_Neta_Total'):,.2f}
+- Margen Real Promedio: {total_cubo(cubo, 'Margen_Real_Pct', 'mean'):.1f}%
+- AOV (Average Order Value): ${total_cubo(cubo, 'Revenue', 'mean'):,.2f}
+
+📦 ANÁLISIS DE INVENTARIO:
+- Stock Promedio: {total_cubo(cubo, 'Stock_Actual', 'mean'):.0f} unidades
+- Cantidad Vendida Total: {total_cubo(cubo, 'Cantidad_Vendida'):.0f} unidades
+- Top Categorías: {', '.join(conteos(cubo, 'Categoria').head(3).index.tolist())}
+- Rotación Promedio: {(total_cubo(cubo, 'Cantidad_Vendida') / (total_cubo(cubo, 'Stock_Actual', 'mean') + 1)):.2f}x
+
+⭐ SATISFACCIÓN DEL CLIENTE:
+- Rating Promedio Producto: {total_cubo(cubo, 'Rating_Producto', 'mean'):.2f}/5
+- Rating Promedio Logística: {total_cubo(cubo, 'Rating_Logistica', 'mean'):.2f}/5
+- NPS Promedio: {total_cubo(cubo, 'Satisfaccion_NPS', 'mean'):.1f}
+- Rating Servicio: {total_cubo(cubo, 'Rating_Servicio', 'mean'):.2f}/5
+
+🚚 ANÁLISIS LOGÍSTICO (Entregas):
+- Estado Principal: {estados.index[0]} ({_pct(estados.iloc[0], filas):.1f}%)
+- Costo Envío Promedio: ${total_cubo(cubo, 'Costo_Envio', 'mean'):.2f}
+- Tiempo Entregar Promedio: {total_cubo(cubo, 'Tiempo_Entrega_Real', 'mean'):.1f} días
+- Entregas Exitosas: {estados.get('Entregado', 0)} ({_pct(estados.get('Entregado', 0), filas):.1f}%)
+
+🏘️ DISTRIBUCIÓN GEOGRÁFICA:
+- Top Ciudades: {', '.join(ciudades.head(3).index.tolist())}
+- Ciudades Únicas: {len(ciudades)}
+
+💻 ANÁLISIS DE CANALES:
+- Canal Físico: {canales.get('Físico', 0)} transacciones ({_pct(canales.get('Físico', 0), filas):.1f}%)
+- Canal Online: {canales.get('Online', 0)} transacciones ({_pct(canales.get('Online', 0), filas):.1f}%)
+- Revenue Físico: ${revenue_canal.get('Físico', 0):,.2f}
+- Revenue Online: ${revenue_canal.get('Online', 0):,.2f}
+
+🏥 SALUD DE DATOS:
+- Health Score Integrado: {health_score:.1f}/100
+- Valores Nulos: {int(df_integrado.isna().sum().sum())}
+- Columnas Totales: {len(df_integrado.columns)}
+"""
+    return _armar_prompt(
+        "análisis de datos integrados, logística y e-commerce.", "datos integrados de validación y limpieza", resumen,
+        ["Análisis ejecutivo del desempeño integrado (salud operativa, rentabilidad, satisfacción)",
+         "Recomendación táctica inmediata para optimizar la integración (corto plazo, 1-3 meses)",
+         "Recomendación estratégica para escalar el negocio (mediano-largo plazo, 3-12 meses)"],
+    )
+
+
+def armar_reporte_completo(reportes):
+    """
+    Une los reportes generados en un solo documento Markdown descargable.
+
+    Parámetros:
+    -----------
+    reportes : dict
+        nombre del reporte -> texto, o la excepción si ese reporte falló
+        (resultado de utils.report_service.generar_reportes)
+
+    Retorna:
+    --------
+    str : Documento con una sección por reporte, en el orden de TITULOS_REPORTES
+    """
+    secciones = [
+        "# Recomendaciones Estratégicas - TechLogistics S.A.",
+        f"Generado: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')}",
+    ]
+    orden = [n for n in TITULOS_REPORTES if n in reportes] + [n for n in reportes if n not in TITULOS_REPORTES]
+    for nombre in orden:
+        resultado = reportes[nombre]
+        texto = f"⚠️ No se pudo generar este reporte: {resultado}" if isinstance(resultado, Exception) else resultado.strip()
+        secciones.append(f"## {TITULOS_REPORTES.get(nombre, nombre)}\n\n{texto}")
+    return '\n\n'.join(secciones) + '\n'
@@ -0,0 +1,252 @@
+"""
+Servicio compartido de reportes con IA (API de chat completions de Groq, compatible con OpenAI).
+
+Las páginas arman el prompt y reciben el texto como un generador de fragmentos que se
+puede pasar a st.write_stream: el texto aparece a medida que el modelo lo genera. Las
+respuestas completas se guardan en caché por hash del prompt y de los parámetros del
+modelo, así que el mismo resumen no vuelve a consultar el modelo.
+
+Para generar varios reportes a la vez, generar_reportes lanza las solicitudes en
+paralelo con asyncio (con un límite de solicitudes simultáneas) y reintenta con espera
+exponencial cuando la API responde 429 (límite de tasa) o un error transitorio.
+
+Usa solo la librería estándar (urllib). La URL base se puede cambiar con la variable
+de entorno GROQ_BASE_URL, p. ej. para apuntar al servidor simulado de
+utils/mock_llm_server.py.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import urllib.error
+import urllib.request
+
+from utils.cache import CacheLRU
+
+URL_BASE_GROQ = "https://api.groq.com/openai/v1"
+MODELO_POR_DEFECTO = "llama-3.3-70b-versatile"
+TEMPERATURA_POR_DEFECTO = 0.7
+MAX_TOKENS_POR_DEFECTO = 1500
+
+# Segundos de espera sin recibir datos antes de abandonar la solicitud
+TIMEOUT_SEGUNDOS = 60
+
+# Presupuesto de memoria de la caché de reportes (en MB)
+MEMORIA_CACHE_REPORTES_MB = 16
+
+# Solicitudes simultáneas al generar varios reportes
+MAX_CONCURRENCIA = 4
+
+# Reintentos ante límite de tasa o errores transitorios, con espera exponencial
+MAX_REINTENTOS = 4
+ESPERA_INICIAL_SEGUNDOS = 1.0
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+_CACHE_REPORTES = CacheLRU(MEMORIA_CACHE_REPORTES_MB * 1024 * 1024)
+
+
+class ErrorServicioLLM(RuntimeError):
+    """
+    Error de la API del modelo; estado es el código HTTP (None si no hubo respuesta) y
+    reintentar_en los segundos indicados por la cabecera Retry-After (si vino).
+    """
+
+    def __init__(self, mensaje, estado=None, reintentar_en=None):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.reintentar_en = reintentar_en
+
+
+def _segundos_retry_after(valor):
+    try:
+        return max(float(valor), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def url_base():
+    """URL base de la API (GROQ_BASE_URL o la de Groq)."""
+    return os.environ.get('GROQ_BASE_URL', URL_BASE_GROQ).rstrip('/')
+
+
+def clave_reporte(prompt, modelo=MODELO_POR_DEFECTO, temperatura=TEMPERATURA_POR_DEFECTO,
+                  max_tokens=MAX_TOKENS_POR_DEFECTO):
+    """Hash del prompt y de los parámetros del modelo (clave de la caché de reportes)."""
+    contenido = json.dumps(
+        {'prompt': prompt, 'modelo': modelo, 'temperatura': temperatura, 'max_tokens': max_tokens},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.blake2b(contenido.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _solicitud(prompt, api_key, modelo, temperatura, max_tokens, url):
+    cuerpo = {
+        'model': modelo,
+        'messages': [{'role': 'user', 'content': prompt}],
+        'temperature': temperatura,
+        'max_tokens': max_tokens,
+        'stream': True,
+    }
+    return urllib.request.Request(
+        f"{url or url_base()}/chat/completions",
+        data=json.dumps(cuerpo).encode('utf-8'),
+        method='POST',
+        headers={
+            'Authorization': f"Bearer {api_key}",
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream',
+            'User-Agent': 'validacion-casos-prueba',
+        },
+    )
+
+
+def _leer_eventos(respuesta):
+    """Recorre el stream SSE y retorna los fragmentos de texto; termina con [DONE]."""
+    for linea in respuesta:
+        linea = linea.decode('utf-8').strip()
+        if not linea.startswith('data:'):
+            continue
+        datos = linea[len('data:'):].strip()
+        if datos == '[DONE]':
+            return
+        evento = json.loads(datos)
+        if 'error' in evento:
+            raise ErrorServicioLLM(f"Error del modelo: {evento['error']}")
+        for opcion in evento.get('choices', []):
+            fragmento = (opcion.get('delta') or {}).get('content')
+            if fragmento:
+                yield fragmento
+
+
+def generar_reporte_stream(prompt, api_key, modelo=MODELO_POR_DEFECTO, temperatura=TEMPERATURA_POR_DEFECTO,
+                           max_tokens=MAX_TOKENS_POR_DEFECTO, usar_cache=True, url=None):
+    """
+    Genera el reporte del modelo como un stream de fragmentos de texto.
+
+    Parámetros:
+    -----------
+    prompt : str
+        Mensaje completo para el modelo
+    api_key : str
+        API key de Groq
+    modelo, temperatura, max_tokens :
+        Parámetros del modelo (también forman parte de la clave de caché)
+    usar_cache : bool
+        Si el mismo prompt con los mismos parámetros ya se generó, se retorna la respuesta
+        guardada en un solo fragmento sin consultar el modelo
+    url : str, opcional
+        URL base de la API (por defecto url_base())
+
+    Retorna:
+    --------
+    generator : Fragmentos de texto en el orden en que llegan (usar con st.write_stream).
+        La respuesta solo se guarda en caché si el stream termina completo.
+
+    Lanza ErrorServicioLLM si la API responde con un error o no se puede conectar.
+    """
+    clave = clave_reporte(prompt, modelo, temperatura, max_tokens)
+    if usar_cache:
+        guardado = _CACHE_REPORTES.obtener(clave)
+        if guardado is not None:
+            yield guardado
+            return
+
+    try:
+        respuesta = urllib.request.urlopen(
+            _solicitud(prompt, api_key, modelo, temperatura, max_tokens, url), timeout=TIMEOUT_SEGUNDOS
+        )
+    except urllib.error.HTTPError as e:
+        detalle = e.read().decode('utf-8', errors='replace')[:500]
+        raise ErrorServicioLLM(
+            f"La API respondió {e.code}: {detalle}", estado=e.code,
+            reintentar_en=_segundos_retry_after(e.headers.get('Retry-After')),
+        ) from e
+    except urllib.error.URLError as e:
+        raise ErrorServicioLLM(f"No se pudo conectar con la API: {e.reason}") from e
+
+    fragmentos = []
+    with respuesta:
+        for fragmento in _leer_eventos(respuesta):
+            fragmentos.append(fragmento)
+            yield fragmento
+
+    texto = ''.join(fragmentos)
+    if usar_cache and texto:
+        _CACHE_REPORTES.guardar(clave, texto, len(texto.encode('utf-8')))
+
+
+def generar_reporte(prompt, api_key, **parametros):
+    """Igual que generar_reporte_stream pero retorna el texto completo."""
+    return ''.join(generar_reporte_stream(prompt, api_key, **parametros))
+
+
+async def _generar_con_reintentos(prompt, api_key, semaforo, max_reintentos, espera_inicial, parametros):
+    for intento in range(max_reintentos + 1):
+        try:
+            # El semáforo limita las solicitudes en curso; la espera entre reintentos no lo ocupa
+            async with semaforo:
+                return await asyncio.to_thread(generar_reporte, prompt, api_key, **parametros)
+        except ErrorServicioLLM as e:
+            if e.estado not in ESTADOS_REINTENTABLES or intento == max_reintentos:
+                raise
+            espera = e.reintentar_en
+            if espera is None:
+                # Espera exponencial con jitter para no reintentar todos a la vez
+                espera = espera_inicial * 2 ** intento + random.uniform(0, espera_inicial)
+            await asyncio.sleep(espera)
+
+
+async def generar_reportes_async(prompts, api_key, max_concurrencia=MAX_CONCURRENCIA, max_reintentos=MAX_REINTENTOS,
+                                 espera_inicial=ESPERA_INICIAL_SEGUNDOS, **parametros):
+    """Versión asíncrona de generar_reportes (para usar dentro de un event loop)."""
+    semaforo = asyncio.Semaphore(max_concurrencia)
+    nombres = list(prompts)
+    resultados = await asyncio.gather(
+        *(_generar_con_reintentos(prompts[nombre], api_key, semaforo, max_reintentos, espera_inicial, parametros)
+          for nombre in nombres),
+        return_exceptions=True,
+    )
+    return dict(zip(nombres, resultados))
+
+
+def generar_reportes(prompts, api_key, max_concurrencia=MAX_CONCURRENCIA, max_reintentos=MAX_REINTENTOS,
+                     espera_inicial=ESPERA_INICIAL_SEGUNDOS, **parametros):
+    """
+    Genera varios reportes con solicitudes concurrentes al modelo.
+
+    Parámetros:
+    -----------
+    prompts : dict
+        nombre del reporte -> prompt
+    api_key : str
+        API key de Groq
+    max_concurrencia : int
+        Máximo de solicitudes en curso al mismo tiempo
+    max_reintentos : int
+        Reintentos por reporte ante 429 o errores transitorios (5xx)
+    espera_inicial : float
+        Segundos de espera antes del primer reintento; se duplica en cada intento
+        (si la API envía Retry-After se usa ese valor)
+    **parametros :
+        Parámetros de generar_reporte_stream (modelo, temperatura, max_tokens, url, usar_cache)
+
+    Retorna:
+    --------
+    dict : nombre -> texto del reporte, o la excepción si ese reporte falló (un fallo no
+        cancela los demás)
+    """
+    return asyncio.run(generar_reportes_async(
+        prompts, api_key, max_concurrencia=max_concurrencia, max_reintentos=max_reintentos,
+        espera_inicial=espera_inicial, **parametros,
+    ))
+
+
+def estadisticas_cache_reportes():
+    """Retorna hits, misses y memoria usada por la caché de reportes."""
+    return _CACHE_REPORTES.estadisticas()
+
+
+def limpiar_cache_reportes():
+    """Vacía la caché de reportes y reinicia sus contadores."""
+    _CACHE_REPORTES.limpiar()
@@ -0,0 +1,209 @@
+"""
+Cubo de agregados (grouping sets) para el dashboard del dataset integrado.
+
+En lugar de recorrer el dataframe completo en cada groupby / crosstab de la página, se
+agrupa una sola vez por cada conjunto de dimensiones guardado y se guardan sumas, conteos
+de no nulos, filas y la primera fila no nula de algunas columnas. Cualquier consulta sobre
+un subconjunto de esas dimensiones se resuelve re-agregando esas tablas pequeñas: las
+medias se derivan como suma / conteo.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.join_keys import primera_posicion
+
+# Conjuntos de dimensiones que se agregan sobre las filas. Las dimensiones de pocos
+# valores van juntas (sus combinaciones son pocas); SKU_ID y la fecha, con muchos
+# valores, van solas. Cualquier subconjunto de un conjunto guardado se puede consultar.
+CONJUNTOS_CUBO = [
+    ('Canal_Venta', 'Categoria', 'Ciudad_Destino', 'Estado_Envio'),
+    ('SKU_ID',),
+    ('Fecha_Venta',),
+]
+
+# Columnas numéricas de las que se guarda suma y conteo de no nulos
+MEDIDAS_CUBO = [
+    'Revenue', 'Ganancia_Neta_Total', 'Cantidad_Vendida', 'Rating_Producto', 'Rating_Logistica',
+    'Satisfaccion_NPS', 'Margen_Real_Pct', 'Rating_Servicio', 'Costo_Envio', 'Tiempo_Entrega_Real',
+    'Stock_Actual',
+]
+
+# Columnas para las que se guarda la primera fila no nula de cada grupo (agregado 'first')
+PRIMEROS_CUBO = ['Stock_Actual', 'Categoria']
+
+# Por encima de este número de combinaciones el código del grupo se compacta
+_MAX_COMBINACIONES = 2 ** 40
+
+
+def _dimension(df, nombre):
+    """Columna de dimensión; las fechas se agrupan por día."""
+    serie = df[nombre]
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        serie = serie.dt.normalize()
+    return serie.reset_index(drop=True)
+
+
+def _agregar_conjunto(df, dimensiones, medidas, primeros):
+    """Una pasada sobre las filas: suma, conteo, filas y primera fila por grupo."""
+    n = len(df)
+    columnas_dim = {d: _dimension(df, d) for d in dimensiones}
+    codigo = np.zeros(n, dtype=np.int64)
+    combinaciones = 1
+    for nombre in dimensiones:
+        # Sin centinela: los nulos forman su propio grupo y se descartan al consultar
+        codigos, unicos = pd.factorize(columnas_dim[nombre], use_na_sentinel=False)
+        if combinaciones * max(len(unicos), 1) > _MAX_COMBINACIONES:
+            codigo, _ = pd.factorize(codigo)
+            combinaciones = int(codigo.max()) + 1 if n else 1
+        codigo = codigo * max(len(unicos), 1) + codigos
+        combinaciones *= max(len(unicos), 1)
+    grupos, _ = pd.factorize(codigo)
+    n_grupos = int(grupos.max()) + 1 if n else 0
+
+    # Los valores de cada grupo se toman de su primera fila
+    primera = primera_posicion(grupos, n_grupos)
+    tabla = {d: columnas_dim[d].take(primera).reset_index(drop=True) for d in dimensiones}
+    tabla['filas'] = np.bincount(grupos, minlength=n_grupos)
+    for medida in medidas:
+        valores = df[medida].to_numpy(dtype=np.float64, na_value=np.nan)
+        validos = ~np.isnan(valores)
+        tabla[f'{medida}__suma'] = np.bincount(grupos, weights=np.where(validos, valores, 0), minlength=n_grupos)
+        tabla[f'{medida}__conteo'] = np.bincount(grupos[validos], minlength=n_grupos)
+    for columna in primeros:
+        tabla[f'{columna}__fila'] = primera_posicion(grupos, n_grupos, df[columna].notna().to_numpy())
+    return pd.DataFrame(tabla)
+
+
+def construir_cubo(df, conjuntos=None, medidas=None, primeros=None):
+    """
+    Construye el cubo de agregados del dataset integrado.
+
+    Parámetros:
+    -----------
+    df : DataFrame
+        Dataset integrado (con Revenue y las métricas nuevas)
+    conjuntos : list, opcional
+        Tuplas de dimensiones a agregar (por defecto CONJUNTOS_CUBO); se omiten las
+        dimensiones que no están en df
+    medidas : list, opcional
+        Columnas numéricas de las que se guarda suma y conteo (por defecto MEDIDAS_CUBO)
+    primeros : list, opcional
+        Columnas que admiten el agregado 'first' (por defecto PRIMEROS_CUBO)
+
+    Retorna:
+    --------
+    dict : Cubo para consultar con consultar_cubo, tabla_cruzada, conteos y total_cubo
+    """
+    conjuntos = CONJUNTOS_CUBO if conjuntos is None else conjuntos
+    medidas = [m for m in (MEDIDAS_CUBO if medidas is None else medidas) if m in df.columns]
+    primeros = [p for p in (PRIMEROS_CUBO if primeros is None else primeros) if p in df.columns]
+
+    tablas = {}
+    for conjunto in conjuntos:
+        conjunto = tuple(d for d in conjunto if d in df.columns)
+        if conjunto and conjunto not in tablas:
+            tablas[conjunto] = _agregar_conjunto(df, conjunto, medidas, primeros)
+    return {
+        'filas': len(df),
+        'tablas': tablas,
+        'medidas': medidas,
+        'enteras': {m for m in medidas if pd.api.types.is_integer_dtype(df[m].dtype)},
+        'primeros': {p: df[p].reset_index(drop=True) for p in primeros},
+        'consultas': {},
+    }
+
+
+def _tabla(cubo, dimensiones):
+    """Tabla agregada por las dimensiones pedidas (re-agregando el conjunto más pequeño que las contiene)."""
+    dimensiones = tuple(dimensiones)
+    if dimensiones in cubo['consultas']:
+        return cubo['consultas'][dimensiones]
+    candidatos = [c for c in cubo['tablas'] if set(dimensiones) <= set(c)]
+    if not candidatos:
+        raise ValueError(f"El cubo no tiene un conjunto que contenga las dimensiones {list(dimensiones)}")
+    base = cubo['tablas'][min(candidatos, key=lambda c: len(cubo['tablas'][c]))]
+    # Sumas, conteos y filas se suman; la primera fila de un grupo es la menor de sus partes
+    agregados = {c: ('min' if c.endswith('__fila') else 'sum') for c in base.columns if c == 'filas' or '__' in c}
+    if dimensiones:
+        # dropna=True: como groupby, los grupos con alguna dimensión nula no aparecen
+        tabla = base.groupby(list(dimensiones), sort=True, dropna=True, observed=True).agg(agregados)
+    else:
+        tabla = base.agg(agregados).to_frame().T.astype(np.float64)
+    cubo['consultas'][dimensiones] = tabla
+    return tabla
+
+
+def _agregado(cubo, tabla, columna, funcion):
+    if funcion == 'size':
+        return tabla['filas'].astype(np.int64)
+    if funcion == 'first':
+        if columna not in cubo['primeros']:
+            raise ValueError(f"El cubo no guarda el primer valor de {columna}")
+        valores = cubo['primeros'][columna]
+        filas = tabla[f'{columna}__fila'].to_numpy().astype(np.int64)
+        primeros = valores.take(np.minimum(filas, max(len(valores) - 1, 0))) if len(valores) else valores
+        return pd.Series(primeros.to_numpy(), index=tabla.index).where(filas < len(valores))
+    if columna not in cubo['medidas']:
+        raise ValueError(f"{columna} no es una medida del cubo")
+    suma, conteo = tabla[f'{columna}__suma'], tabla[f'{columna}__conteo'].astype(np.int64)
+    if funcion == 'sum':
+        return suma.round().astype(np.int64) if columna in cubo['enteras'] else suma
+    if funcion == 'count':
+        return conteo
+    if funcion == 'mean':
+        return suma / conteo.where(conteo > 0)
+    raise ValueError(f"Agregado no soportado por el cubo: {funcion}")
+
+
+def consultar_cubo(cubo, dimensiones, agregados):
+    """
+    Equivalente a df.groupby(dimensiones).agg(agregados) resuelto desde el cubo.
+
+    Parámetros:
+    -----------
+    cubo : dict
+        Resultado de construir_cubo
+    dimensiones : list
+        Dimensiones de agrupación (subconjunto de alguno de los conjuntos del cubo)
+    agregados : dict
+        columna -> 'sum', 'mean', 'count', 'first', 'size' (filas del grupo) o una lista
+        de ellos (las columnas del resultado pasan a ser un MultiIndex, como en pandas)
+
+    Retorna:
+    --------
+    DataFrame : Una fila por grupo, ordenado por las dimensiones
+    """
+    tabla = _tabla(cubo, dimensiones)
+    multinivel = any(isinstance(f, (list, tuple)) for f in agregados.values())
+    columnas = {}
+    for columna, funciones in agregados.items():
+        for funcion in (funciones if isinstance(funciones, (list, tuple)) else [funciones]):
+            clave = (columna, funcion) if multinivel else columna
+            columnas[clave] = _agregado(cubo, tabla, columna, funcion)
+    resultado = pd.DataFrame(columnas, index=tabla.index)
+    if multinivel:
+        resultado.columns = pd.MultiIndex.from_tuples(resultado.columns)
+    return resultado
+
+
+def conteos(cubo, dimension):
+    """Equivalente a df[dimension].value_counts(): filas por valor, de mayor a menor."""
+    filas = _tabla(cubo, [dimension])['filas'].astype(np.int64)
+    return filas.sort_values(ascending=False, kind='stable').rename('count')
+
+
+def tabla_cruzada(cubo, filas, columnas, columna=None, funcion='sum'):
+    """
+    Equivalente a pd.crosstab(df[filas], df[columnas]) (conteo de filas) o, si se pasa
+    columna, a pd.crosstab(..., values=df[columna], aggfunc=funcion).
+    """
+    if columna is None:
+        return consultar_cubo(cubo, [filas, columnas], {'filas': 'size'})['filas'].unstack(fill_value=0)
+    return consultar_cubo(cubo, [filas, columnas], {columna: funcion})[columna].unstack()
+
+
+def total_cubo(cubo, columna, funcion='sum'):
+    """Agregado de una columna sobre todas las filas (p. ej. total_cubo(cubo, 'Revenue', 'mean'))."""
+    if funcion == 'size':
+        return cubo['filas']
+    return _agregado(cubo, _tabla(cubo, []), columna, funcion).iloc[0]
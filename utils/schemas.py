@@ -0,0 +1,278 @@
+"""
+Registro de esquemas de los datasets y lectura tipada de CSV con el motor de pyarrow
+"""
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow es opcional: sin él se usa el parser C de pandas
+    pa = None
+    pa_csv = None
+
+# Mismos textos que pandas interpreta como nulos al leer un CSV
+VALORES_NULOS = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+
+# Tipos soportados en los esquemas:
+#   'texto'     -> se conserva el texto tal cual (sin inferencia)
+#   'entero'    -> int64 (float64 si la columna trae nulos)
+#   'decimal'   -> float64
+#   'fecha'     -> datetime64 con el formato declarado en 'formatos_fecha'
+#   'categoria' -> texto, o Categorical con las categorías declaradas si se pide
+ESQUEMAS = {
+    'inventario': {
+        'columnas': {
+            'SKU_ID': 'texto',
+            'Categoria': 'categoria',
+            'Stock_Actual': 'decimal',
+            'Costo_Unitario_USD': 'decimal',
+            'Punto_Reorden': 'entero',
+            'Lead_Time_Dias': 'texto',  # Mezcla días ('10') con textos ('25-30 días', 'Inmediato')
+            'Bodega_Origen': 'categoria',
+            'Ultima_Revision': 'fecha',
+        },
+        'formatos_fecha': {'Ultima_Revision': '%Y-%m-%d'},
+        'categorias': {
+            'Categoria': ['Accesorios', 'Laptops', 'Monitores', 'Smartphones', 'Tablets'],
+            'Bodega_Origen': ['BOD-EXT-99', 'NORTE', 'OCCIDENTE', 'SUR', 'ZONA_FRANCA'],
+        },
+    },
+    'feedback': {
+        'columnas': {
+            'Feedback_ID': 'texto',
+            'Transaccion_ID': 'texto',
+            'Rating_Producto': 'entero',
+            'Rating_Logistica': 'entero',
+            'Comentario_Texto': 'categoria',
+            'Recomienda_Marca': 'categoria',
+            'Ticket_Soporte_Abierto': 'categoria',  # Mezcla 'Sí'/'No' con '1'/'0'
+            'Edad_Cliente': 'entero',
+            'Satisfaccion_NPS': 'decimal',
+        },
+        'formatos_fecha': {},
+        'categorias': {
+            'Comentario_Texto': ['Dañado', 'Excelente', 'Lento', 'No volvería', 'Precio justo'],
+            'Recomienda_Marca': ['NO', 'SI'],
+            'Ticket_Soporte_Abierto': ['No', 'Sí'],
+        },
+    },
+    'transacciones': {
+        'columnas': {
+            'Transaccion_ID': 'texto',
+            'SKU_ID': 'texto',
+            'Fecha_Venta': 'fecha',
+            'Cantidad_Vendida': 'entero',
+            'Precio_Venta_Final': 'decimal',
+            'Costo_Envio': 'decimal',
+            'Tiempo_Entrega_Real': 'entero',
+            'Estado_Envio': 'categoria',
+            'Ciudad_Destino': 'categoria',
+            'Canal_Venta': 'categoria',
+        },
+        'formatos_fecha': {'Fecha_Venta': '%d/%m/%Y'},
+        'categorias': {
+            'Estado_Envio': ['Devuelto', 'En Camino', 'Entregado', 'Perdido', 'Retrasado'],
+            'Ciudad_Destino': ['Barranquilla', 'Bogotá', 'Bucaramanga', 'Cali', 'Medellín', 'Ventas_Web'],
+            'Canal_Venta': ['App', 'Físico', 'Online'],
+        },
+    },
+}
+
+# Tipos que se leen como texto y se convierten (o no) después de la lectura
+_TIPOS_LEIDOS_COMO_TEXTO = ('texto', 'fecha', 'categoria')
+
+
+def detectar_esquema(columnas):
+    """
+    Retorna el nombre del esquema cuyas columnas mejor coinciden con las del archivo,
+    o None si ninguno cubre al menos la mitad de sus columnas declaradas.
+    """
+    columnas = set(columnas)
+    mejor, mejor_cobertura = None, 0.5
+    for nombre, esquema in ESQUEMAS.items():
+        declaradas = esquema['columnas']
+        cobertura = len(columnas & set(declaradas)) / len(declaradas)
+        if cobertura >= mejor_cobertura:
+            mejor, mejor_cobertura = nombre, cobertura
+    return mejor
+
+
+def _leer_encabezado(file_bytes):
+    primera_linea = file_bytes.split(b'\n', 1)[0].decode('utf-8-sig', errors='replace')
+    return next(csv.reader([primera_linea]), [])
+
+
+def _leer_con_pyarrow(file_bytes, columnas_texto):
+    tabla = pa_csv.read_csv(
+        io.BytesIO(file_bytes),
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: pa.string() for col in columnas_texto},
+            null_values=VALORES_NULOS,
+            strings_can_be_null=True,
+        ),
+    )
+    # Columnas completamente vacías: float64 como hace pandas
+    for i, tipo in enumerate(tabla.schema.types):
+        if pa.types.is_null(tipo):
+            tabla = tabla.set_column(i, tabla.schema.field(i).name, tabla.column(i).cast(pa.float64()))
+    return tabla.to_pandas()
+
+
+def _convertir_columna(serie, tipo, formato_fecha=None, categorias=None):
+    """
+    Convierte una columna al tipo declarado.
+    Retorna None si algún valor no nulo no se puede representar en ese tipo.
+    """
+    if tipo == 'texto':
+        return serie
+
+    if tipo == 'categoria':
+        if categorias is None:
+            return serie
+        declaradas = set(categorias)
+        observadas = [c for c in pd.unique(serie.dropna()) if c not in declaradas]
+        return pd.Series(pd.Categorical(serie, categories=list(categorias) + sorted(observadas)),
+                         index=serie.index, name=serie.name)
+
+    if tipo == 'fecha':
+        convertida = pd.to_datetime(serie, format=formato_fecha, errors='coerce')
+        if (convertida.isna() & serie.notna()).any():
+            return None
+        return convertida
+
+    if tipo in ('entero', 'decimal'):
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            convertida = serie
+        else:
+            convertida = pd.to_numeric(serie, errors='coerce')
+            if (convertida.isna() & serie.notna()).any():
+                return None
+        if tipo == 'entero' and not convertida.isna().any():
+            return convertida.astype(np.int64)
+        return convertida.astype(np.float64)
+
+    raise ValueError(f"Tipo de columna desconocido en el esquema: '{tipo}'")
+
+
+def transformar_valores(serie, funcion):
+    """
+    Aplica funcion (Series -> Series del mismo largo, p. ej. un replace o .str.upper()) a
+    los valores de una columna de texto o categórica.
+
+    En una columna Categorical la función se aplica solo al diccionario de categorías y
+    las filas se traducen por sus códigos con un único take: las categorías que quedan
+    iguales se funden (conservando el orden de la primera) y las que pasan a NaN quedan
+    como nulos.
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return funcion(serie)
+    nuevas = funcion(pd.Series(serie.cat.categories))
+    categorias = pd.Index(nuevas.dropna().unique())
+    # El código -1 (nulo) toma el último elemento, que sigue siendo -1
+    traduccion = np.append(categorias.get_indexer(nuevas), -1)
+    codigos = traduccion[serie.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codigos, categorias), index=serie.index, name=serie.name)
+
+
+def leer_csv_con_esquema(file_bytes, nombre_esquema=None, usar_categoricas=True):
+    """
+    Lee un CSV desde bytes aplicando el esquema declarado del dataset.
+
+    Parámetros:
+    -----------
+    file_bytes : bytes
+        Contenido del archivo CSV
+    nombre_esquema : str, opcional
+        'inventario', 'feedback' o 'transacciones'. Si es None se detecta por el encabezado.
+    usar_categoricas : bool
+        Si es True (por defecto), las columnas declaradas como 'categoria' se convierten
+        a Categorical con las categorías declaradas (más los valores sucios que aparezcan,
+        al final); la limpieza los corrige sobre el diccionario de categorías
+
+    Retorna:
+    --------
+    DataFrame : Dataframe con los tipos del esquema. Las columnas cuyo contenido no
+        encaja en el tipo declarado se dejan tal como se leyeron y sus nombres quedan
+        en df.attrs['columnas_sin_convertir'].
+    """
+    encabezado = _leer_encabezado(file_bytes)
+    if nombre_esquema is None:
+        nombre_esquema = detectar_esquema([col.strip() for col in encabezado])
+    esquema = ESQUEMAS.get(nombre_esquema, {'columnas': {}, 'formatos_fecha': {}, 'categorias': {}})
+    tipos = esquema['columnas']
+
+    # Las columnas de texto se declaran como string para que pyarrow no infiera otro tipo
+    columnas_texto = [col for col in encabezado if tipos.get(col.strip()) in _TIPOS_LEIDOS_COMO_TEXTO]
+    if pa_csv is not None:
+        df = _leer_con_pyarrow(file_bytes, columnas_texto)
+    else:
+        df = pd.read_csv(io.BytesIO(file_bytes), na_filter=True,
+                         dtype={col: str for col in columnas_texto})
+    # Limpiar columnas sin nombre
+    df.columns = df.columns.str.strip()
+
+    sin_convertir = []
+    for col, tipo in tipos.items():
+        if col not in df.columns:
+            continue
+        convertida = _convertir_columna(
+            df[col],
+            tipo,
+            formato_fecha=esquema['formatos_fecha'].get(col),
+            categorias=esquema['categorias'].get(col) if usar_categoricas else None,
+        )
+        if convertida is None:
+            sin_convertir.append(col)
+        else:
+            df[col] = convertida
+
+    df.attrs['esquema'] = nombre_esquema
+    df.attrs['columnas_sin_convertir'] = sin_convertir
+    return df
+
+
+def leer_csv_por_bloques(ruta, nombre_esquema=None, filas_por_bloque=100_000):
+    """
+    Lee un CSV en disco por bloques aplicando el esquema declarado a cada bloque.
+
+    Parámetros:
+    -----------
+    ruta : str
+        Ruta del archivo CSV
+    nombre_esquema : str, opcional
+        'inventario', 'feedback' o 'transacciones'. Si es None se detecta por el encabezado.
+    filas_por_bloque : int
+        Número de filas de cada bloque
+
+    Retorna:
+    --------
+    generator : DataFrames de como máximo filas_por_bloque filas. Una columna 'entero'
+        puede salir int64 en un bloque y float64 en otro si solo este trae nulos.
+    """
+    with open(ruta, 'rb') as f:
+        encabezado = _leer_encabezado(f.readline())
+    if nombre_esquema is None:
+        nombre_esquema = detectar_esquema([col.strip() for col in encabezado])
+    esquema = ESQUEMAS.get(nombre_esquema, {'columnas': {}, 'formatos_fecha': {}, 'categorias': {}})
+    tipos = esquema['columnas']
+    columnas_texto = [col for col in encabezado if tipos.get(col.strip()) in _TIPOS_LEIDOS_COMO_TEXTO]
+
+    for df in pd.read_csv(ruta, chunksize=filas_por_bloque, na_filter=True,
+                          dtype={col: str for col in columnas_texto}):
+        df.columns = df.columns.str.strip()
+        for col, tipo in tipos.items():
+            if col not in df.columns:
+                continue
+            convertida = _convertir_columna(df[col], tipo, formato_fecha=esquema['formatos_fecha'].get(col))
+            if convertida is not None:
+                df[col] = convertida
+        df.attrs['esquema'] = nombre_esquema
+        yield df
@@ -1,8 +1,14 @@
 import streamlit as st
 
+from utils.performance import iniciar_ejecucion
 
-def init_session_state():
-    """Inicializa el session state con todas las variables necesarias"""
+
+def init_session_state(pagina=None):
+    """
+    Inicializa el session state con todas las variables necesarias y empieza a registrar
+    el rendimiento de esta ejecución de la página (ver utils.performance).
+    """
+    iniciar_ejecucion(st.session_state, pagina)
     if 'inventario_file' not in st.session_state:
         st.session_state.inventario_file = None
     if 'inventario_name' not in st.session_state:
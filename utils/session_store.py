@@ -0,0 +1,53 @@
+"""
+Resultados derivados guardados en la sesión de Streamlit, asociados a los archivos de entrada.
+
+Cada resultado se guarda junto con la clave de las entradas con que se calculó (los hashes
+de los archivos subidos). Mientras la clave no cambie, los reruns de la página (cualquier
+botón o widget) reutilizan el resultado; si se sube un archivo distinto, la clave deja de
+coincidir y el resultado se descarta.
+"""
+from utils.cache import hash_contenido
+
+
+def clave_entradas(*archivos):
+    """Clave de un resultado: tupla con el hash del contenido de cada archivo de entrada."""
+    return tuple(hash_contenido(archivo) for archivo in archivos)
+
+
+def obtener_resultado(session_state, nombre, clave):
+    """
+    Retorna el resultado guardado bajo nombre si se calculó con la misma clave.
+
+    Parámetros:
+    -----------
+    session_state : st.session_state o dict
+        Almacén de la sesión
+    nombre : str
+        Nombre del resultado en la sesión
+    clave : tuple
+        Clave de las entradas actuales (ver clave_entradas)
+
+    Retorna:
+    --------
+    dict o None : Valores guardados, o None si no hay resultado o sus entradas cambiaron
+        (en ese caso el resultado viejo se elimina de la sesión)
+    """
+    entrada = session_state.get(nombre)
+    if entrada is None:
+        return None
+    if entrada['clave'] != clave:
+        del session_state[nombre]
+        return None
+    return entrada['valores']
+
+
+def guardar_resultado(session_state, nombre, clave, valores):
+    """Guarda valores en la sesión bajo nombre, asociados a la clave de sus entradas, y los retorna."""
+    session_state[nombre] = {'clave': clave, 'valores': valores}
+    return valores
+
+
+def descartar_resultado(session_state, nombre):
+    """Elimina el resultado guardado bajo nombre (si existe)."""
+    if nombre in session_state:
+        del session_state[nombre]
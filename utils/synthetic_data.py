@@ -0,0 +1,229 @@
+"""
+Generador de datasets sintéticos con los mismos patrones de suciedad que data/*_v2.csv.
+
+Las proporciones de cada problema (cantidades negativas, tiempos de entrega 999,
+categorías '???', lead times '25-30 días', comentarios '---', fechas dd/mm/yyyy, claves
+sin pareja, ...) se midieron sobre los archivos originales, así que un dataset generado
+de cualquier tamaño ejercita los mismos caminos de la limpieza, la integración y las
+métricas. Se usa para medir cómo escala el pipeline (benchmarks/bench_pipeline.py).
+
+    datasets = generar_datasets(1_000_000)          # DataFrames con el contenido de los CSV
+    archivos = generar_csv(1_000_000)               # bytes de cada CSV, como un archivo subido
+    rutas = escribir_csv('salida/sintetico', 1_000_000)
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow es opcional: sin él se escribe con pandas
+    pa = None
+    pa_csv = None
+
+# Tamaño de inventario y feedback relativo al número de transacciones (2.500 y 4.500
+# filas por cada 10.000 transacciones en los archivos originales)
+PROPORCION_INVENTARIO = 0.25
+PROPORCION_FEEDBACK = 0.45
+
+# Los SKU vendidos se reparten en un rango 20% mayor que el inventario: ~82% de las
+# transacciones encuentran su producto
+RANGO_SKU_VENDIDOS = 1.2
+
+# Proporción de filas con cada problema, medida sobre data/*_v2.csv
+SUCIEDAD = {
+    'inventario': {
+        'stock_vacio': 0.04,
+        'stock_negativo': 0.024,
+        'costo_extremo_alto': 0.0004,
+        'costo_extremo_bajo': 0.0004,
+    },
+    'feedback': {
+        'feedback_id_repetido': 0.111,
+        'rating_producto_99': 0.0067,
+        'edad_195': 0.005,
+    },
+    'transacciones': {
+        'cantidad_negativa': 0.01,
+        'costo_envio_vacio': 0.083,
+        'tiempo_entrega_999': 0.005,
+        'estado_envio_vacio': 0.168,
+    },
+}
+
+# Valores (limpios y sucios) que aparecen con la misma frecuencia en cada columna categórica
+CATEGORIAS = ['Laptops', 'Monitores', 'Smartphones', 'Tablets', 'Accesorios', 'smart-phone', '???', 'LAPTOP']
+LEAD_TIMES = ['25-30 días', 'Inmediato', '10', 'nan', '5', '3']
+BODEGAS = ['norte', 'Sur', 'BOD-EXT-99', 'ZONA_FRANCA', 'Norte', 'Occidente']
+COMENTARIOS = ['Excelente', 'Lento', 'N/A', 'Dañado', '---', 'No volvería', 'Precio justo']
+RECOMIENDA = ['SI', 'NO', 'N/A', 'Maybe']
+TICKETS = ['Sí', '1', '0', 'No']
+ESTADOS_ENVIO = ['Retrasado', 'Entregado', 'Devuelto', 'En Camino', 'Perdido']
+CIUDADES = ['Ventas_Web', 'BOG', 'Bogotá', 'Cali', 'Bucaramanga', 'Medellín', 'MED', 'Barranquilla']
+CANALES = ['Físico', 'Online', 'WhatsApp', 'App']
+
+# Rangos de fechas de los archivos originales
+FECHAS_REVISION = ('2024-03-04', '2026-01-31')
+FECHAS_VENTA = ('2024-09-23', '2026-02-04')
+
+PRIMER_SKU = 1000
+PRIMER_FEEDBACK = 8000
+PRIMERA_TRANSACCION = 10000
+
+
+def _ids(prefijo, numeros):
+    return np.char.add(prefijo, numeros.astype(str)).astype(object)
+
+
+def _elegir(rng, valores, filas):
+    return np.asarray(valores, dtype=object)[rng.integers(0, len(valores), filas)]
+
+
+def _fechas(rng, rango, formato, filas):
+    """Fechas al azar dentro del rango, como texto (se formatea una vez cada día del rango)."""
+    dias = pd.date_range(*rango).strftime(formato).to_numpy(dtype=object)
+    return dias[rng.integers(0, len(dias), filas)]
+
+
+def _mascara(rng, proporcion, filas):
+    return rng.random(filas) < proporcion
+
+
+def generar_inventario(filas, semilla=0):
+    """Inventario con SKU únicos PROD-1000..., categorías y bodegas mal escritas, stock vacío o negativo."""
+    rng = np.random.default_rng(semilla)
+    suciedad = SUCIEDAD['inventario']
+
+    stock = rng.integers(0, 1999, filas).astype(np.float64)
+    negativo = _mascara(rng, suciedad['stock_negativo'], filas)
+    stock[negativo] = rng.integers(-50, 0, int(negativo.sum()))
+    stock[_mascara(rng, suciedad['stock_vacio'], filas)] = np.nan
+
+    costo = rng.uniform(50, 1500, filas).round(2)
+    costo[_mascara(rng, suciedad['costo_extremo_alto'], filas)] = 850000.0
+    costo[_mascara(rng, suciedad['costo_extremo_bajo'], filas)] = 0.05
+
+    return pd.DataFrame({
+        'SKU_ID': _ids('PROD-', np.arange(PRIMER_SKU, PRIMER_SKU + filas)),
+        'Categoria': _elegir(rng, CATEGORIAS, filas),
+        'Stock_Actual': stock,
+        'Costo_Unitario_USD': costo,
+        'Punto_Reorden': rng.integers(100, 300, filas),
+        'Lead_Time_Dias': _elegir(rng, LEAD_TIMES, filas),
+        'Bodega_Origen': _elegir(rng, BODEGAS, filas),
+        'Ultima_Revision': _fechas(rng, FECHAS_REVISION, '%Y-%m-%d', filas),
+    })
+
+
+def generar_transacciones(filas, filas_inventario, semilla=0):
+    """Transacciones con fechas dd/mm/yyyy, cantidades -5, tiempos 999, ciudades abreviadas y nulos."""
+    rng = np.random.default_rng(semilla + 1)
+    suciedad = SUCIEDAD['transacciones']
+
+    cantidad = rng.integers(1, 15, filas)
+    cantidad[_mascara(rng, suciedad['cantidad_negativa'], filas)] = -5
+
+    costo_envio = rng.uniform(5, 100, filas).round(2)
+    costo_envio[_mascara(rng, suciedad['costo_envio_vacio'], filas)] = np.nan
+
+    tiempo = rng.integers(1, 30, filas)
+    tiempo[_mascara(rng, suciedad['tiempo_entrega_999'], filas)] = 999
+
+    estado = _elegir(rng, ESTADOS_ENVIO, filas)
+    estado[_mascara(rng, suciedad['estado_envio_vacio'], filas)] = ''
+
+    ultimo_sku = PRIMER_SKU + max(int(filas_inventario * RANGO_SKU_VENDIDOS), 1)
+    return pd.DataFrame({
+        'Transaccion_ID': _ids('TRX-', np.arange(PRIMERA_TRANSACCION, PRIMERA_TRANSACCION + filas)),
+        'SKU_ID': _ids('PROD-', rng.integers(PRIMER_SKU, ultimo_sku + 1, filas)),
+        'Fecha_Venta': _fechas(rng, FECHAS_VENTA, '%d/%m/%Y', filas),
+        'Cantidad_Vendida': cantidad,
+        'Precio_Venta_Final': rng.uniform(10, 2000, filas).round(2),
+        'Costo_Envio': costo_envio,
+        'Tiempo_Entrega_Real': tiempo,
+        'Estado_Envio': estado,
+        'Ciudad_Destino': _elegir(rng, CIUDADES, filas),
+        'Canal_Venta': _elegir(rng, CANALES, filas),
+    })
+
+
+def generar_feedback(filas, filas_transacciones, semilla=0):
+    """Feedback de transacciones al azar, con IDs repetidos, ratings 99, edades 195 y textos '---' / 'N/A'."""
+    rng = np.random.default_rng(semilla + 2)
+    suciedad = SUCIEDAD['feedback']
+
+    # Algunos Feedback_ID se repiten en filas con distinto contenido
+    numeros = np.arange(PRIMER_FEEDBACK, PRIMER_FEEDBACK + filas)
+    repetido = _mascara(rng, suciedad['feedback_id_repetido'], filas)
+    numeros[repetido] = numeros[rng.integers(0, filas, int(repetido.sum()))]
+
+    rating = rng.integers(1, 6, filas)
+    rating[_mascara(rng, suciedad['rating_producto_99'], filas)] = 99
+
+    edad = rng.integers(18, 85, filas)
+    edad[_mascara(rng, suciedad['edad_195'], filas)] = 195
+
+    return pd.DataFrame({
+        'Feedback_ID': _ids('FB-', numeros),
+        'Transaccion_ID': _ids('TRX-', rng.integers(PRIMERA_TRANSACCION, PRIMERA_TRANSACCION + filas_transacciones, filas)),
+        'Rating_Producto': rating,
+        'Rating_Logistica': rng.integers(1, 6, filas),
+        'Comentario_Texto': _elegir(rng, COMENTARIOS, filas),
+        'Recomienda_Marca': _elegir(rng, RECOMIENDA, filas),
+        'Ticket_Soporte_Abierto': _elegir(rng, TICKETS, filas),
+        'Edad_Cliente': edad,
+        'Satisfaccion_NPS': rng.uniform(-99.9, 99.9, filas).round(1),
+    })
+
+
+def generar_datasets(transacciones, semilla=0):
+    """
+    Genera los tres datasets sucios con el tamaño relativo de los originales.
+
+    Parámetros:
+    -----------
+    transacciones : int
+        Filas de transacciones (inventario y feedback se escalan con PROPORCION_INVENTARIO
+        y PROPORCION_FEEDBACK)
+    semilla : int
+        Semilla del generador; la misma semilla produce los mismos datos
+
+    Retorna:
+    --------
+    dict : 'inventario', 'feedback' y 'transacciones' -> DataFrame con el contenido que
+        tendría el CSV (textos sucios tal cual; los valores vacíos como NaN o '')
+    """
+    filas_inventario = max(int(transacciones * PROPORCION_INVENTARIO), 1)
+    filas_feedback = max(int(transacciones * PROPORCION_FEEDBACK), 1)
+    return {
+        'inventario': generar_inventario(filas_inventario, semilla),
+        'feedback': generar_feedback(filas_feedback, transacciones, semilla),
+        'transacciones': generar_transacciones(transacciones, filas_inventario, semilla),
+    }
+
+
+def _a_csv(df):
+    if pa_csv is not None:
+        salida = io.BytesIO()
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), salida)
+        return salida.getvalue()
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def generar_csv(transacciones, semilla=0):
+    """Igual que generar_datasets pero retorna el contenido de cada CSV en bytes (como un archivo subido)."""
+    return {nombre: _a_csv(df) for nombre, df in generar_datasets(transacciones, semilla).items()}
+
+
+def escribir_csv(directorio, transacciones, semilla=0):
+    """Escribe los tres CSV sintéticos en directorio y retorna sus rutas por nombre de dataset."""
+    os.makedirs(directorio, exist_ok=True)
+    rutas = {}
+    for nombre, contenido in generar_csv(transacciones, semilla).items():
+        rutas[nombre] = os.path.join(directorio, f"{nombre}_sintetico_{transacciones}.csv")
+        with open(rutas[nombre], 'wb') as f:
+            f.write(contenido)
+    return rutas
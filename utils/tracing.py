@@ -0,0 +1,344 @@
+"""
+Trazas livianas de las etapas del pipeline (limpieza, integración y métricas).
+
+Cada etapa instrumentada abre un span que registra tiempo real, tiempo de CPU del hilo,
+pico de memoria (opcional), filas de entrada y de salida y la excepción, si la hubo.
+Los spans terminados se envían a los sinks configurados:
+
+    configurar_trazas(SinkMemoria(), SinkJSONL('salida/trazas.jsonl'), memoria=True)
+
+    with capturar_trazas() as sink:          # sink en memoria solo durante el bloque
+        limpiar_inventario(df)
+    sink.spans                               # [{'nombre': 'imputar_...', 'padre': ...}, ...]
+
+Las secciones largas que no conviene envolver en un bloque with se miden con
+iniciar_traza(nombre) / terminar_traza(span).
+
+Además de los sinks globales, fijar_sinks_contexto agrega sinks que solo reciben los
+spans del hilo o contexto actual (p. ej. la sesión de Streamlit que ejecuta la página).
+Sin sinks configurados las trazas no miden nada y su costo es despreciable.
+
+El pico de memoria se mide con tracemalloc (asignaciones hechas a través de Python,
+como los arrays de numpy; las columnas de texto de Arrow no se cuentan). Si varios
+hilos se ejecutan a la vez, el pico de cada span incluye lo que asignan los demás.
+"""
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pandas as pd
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # opentelemetry es opcional: solo lo usa SinkOpenTelemetry
+    otel_trace = None
+
+_SINKS = []
+_CONFIGURACION = {'memoria': False}
+_BLOQUEO_SINKS = threading.Lock()
+_IDS = itertools.count(1)
+_PILA = threading.local()
+_SINKS_CONTEXTO = ContextVar('sinks_contexto', default=())
+
+
+class SinkMemoria:
+    """Guarda los últimos max_spans spans en memoria (p. ej. para mostrarlos en un panel)."""
+
+    def __init__(self, max_spans=10_000):
+        self._spans = deque(maxlen=max_spans)
+        self._bloqueo = threading.Lock()
+
+    def emitir(self, span):
+        with self._bloqueo:
+            self._spans.append(span)
+
+    @property
+    def spans(self):
+        with self._bloqueo:
+            return list(self._spans)
+
+    def a_dataframe(self):
+        """Spans como DataFrame (una fila por span, en orden de finalización)."""
+        return pd.DataFrame(self.spans)
+
+    def limpiar(self):
+        with self._bloqueo:
+            self._spans.clear()
+
+
+class SinkJSONL:
+    """Agrega cada span como una línea JSON al archivo indicado."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._bloqueo = threading.Lock()
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        os.makedirs(directorio, exist_ok=True)
+
+    def emitir(self, span):
+        linea = json.dumps(span, ensure_ascii=False, default=str)
+        with self._bloqueo, open(self.ruta, 'a', encoding='utf-8') as f:
+            f.write(linea + '\n')
+
+
+class SinkOpenTelemetry:
+    """
+    Reenvía los spans a un tracer de OpenTelemetry (requiere opentelemetry-api y un
+    exportador configurado por la aplicación). Los campos del span van como atributos
+    'pipeline.*' y una excepción marca el span con estado de error.
+    """
+
+    def __init__(self, tracer=None, nombre_tracer='validacion-casos-prueba'):
+        if otel_trace is None:
+            raise ImportError("SinkOpenTelemetry requiere el paquete opentelemetry-api")
+        self.tracer = tracer or otel_trace.get_tracer(nombre_tracer)
+
+    def emitir(self, span):
+        atributos = {
+            f'pipeline.{campo}': valor
+            for campo, valor in span.items()
+            if campo not in ('nombre', 'inicio') and isinstance(valor, (str, bool, int, float))
+        }
+        inicio_ns = int(span['inicio'] * 1e9)
+        otel_span = self.tracer.start_span(span['nombre'], start_time=inicio_ns, attributes=atributos)
+        if span['error']:
+            otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, span['error']))
+        otel_span.end(end_time=inicio_ns + int(span['segundos'] * 1e9))
+
+
+def configurar_trazas(*sinks, memoria=False):
+    """
+    Reemplaza los sinks que reciben los spans.
+
+    Parámetros:
+    -----------
+    *sinks :
+        Objetos con un método emitir(span); sin sinks las trazas quedan desactivadas
+    memoria : bool
+        Si es True se mide el pico de memoria de cada span con tracemalloc (se inicia si
+        no estaba activo; se detiene al desactivar la medición). Hace más lentas las
+        etapas con muchas asignaciones pequeñas.
+    """
+    with _BLOQUEO_SINKS:
+        _SINKS[:] = sinks
+        _CONFIGURACION['memoria'] = memoria
+    if memoria and sinks:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _CONFIGURACION['tracemalloc_propio'] = True
+    elif _CONFIGURACION.pop('tracemalloc_propio', False):
+        # Solo se detiene tracemalloc si lo inició configurar_trazas
+        tracemalloc.stop()
+
+
+def registrar_sink(sink):
+    """Agrega un sink a los configurados."""
+    with _BLOQUEO_SINKS:
+        _SINKS.append(sink)
+    return sink
+
+
+def quitar_sink(sink):
+    """Quita un sink agregado con registrar_sink o configurar_trazas."""
+    with _BLOQUEO_SINKS:
+        if sink in _SINKS:
+            _SINKS.remove(sink)
+
+
+def fijar_sinks_contexto(*sinks):
+    """
+    Fija los sinks que reciben los spans del contexto actual, además de los globales.
+
+    El valor vive en una ContextVar: lo ve el hilo que lo fija (y las tareas o hilos que
+    copian su contexto), no el resto. Una página de Streamlit lo fija al empezar cada
+    ejecución para que sus spans lleguen solo al sink de su sesión.
+    """
+    _SINKS_CONTEXTO.set(tuple(sinks))
+
+
+@contextmanager
+def capturar_trazas(max_spans=10_000):
+    """Registra un SinkMemoria mientras dura el bloque y lo retorna."""
+    sink = registrar_sink(SinkMemoria(max_spans))
+    try:
+        yield sink
+    finally:
+        quitar_sink(sink)
+
+
+def _pila():
+    if not hasattr(_PILA, 'spans'):
+        _PILA.spans = []
+    return _PILA.spans
+
+
+def _hay_sinks():
+    return bool(_SINKS) or bool(_SINKS_CONTEXTO.get())
+
+
+def _emitir(span):
+    with _BLOQUEO_SINKS:
+        sinks = list(_SINKS)
+    for sink in sinks + list(_SINKS_CONTEXTO.get()):
+        try:
+            sink.emitir(span)
+        except Exception as e:
+            # Un sink que falla no debe interrumpir el pipeline
+            print(f"No se pudo emitir la traza '{span['nombre']}' a {type(sink).__name__}: {e}")
+
+
+def _abrir_span(nombre, atributos):
+    span = {'nombre': nombre, 'filas_entrada': None, 'filas_salida': None, **atributos}
+    if not _hay_sinks():
+        return span
+
+    pila = _pila()
+    padre = pila[-1] if pila else None
+    medir_memoria = _CONFIGURACION['memoria'] and tracemalloc.is_tracing()
+    if medir_memoria:
+        memoria_inicial, pico_previo = tracemalloc.get_traced_memory()
+        if padre is not None:
+            # reset_peak borra el pico que llevaba el padre: se guarda para tenerlo en cuenta en el suyo
+            padre['_pico_hijos'] = max(padre.get('_pico_hijos', 0), pico_previo)
+        tracemalloc.reset_peak()
+
+    span.update({
+        'id': next(_IDS),
+        'padre': padre['nombre'] if padre else None,
+        'padre_id': padre['id'] if padre else None,
+        'inicio': time.time(),
+        'error': None,
+        '_medicion': (padre, memoria_inicial if medir_memoria else None, time.perf_counter(), time.thread_time()),
+    })
+    pila.append(span)
+    return span
+
+
+def _cerrar_span(span):
+    medicion = span.pop('_medicion', None)
+    if medicion is None:
+        # Sin sinks al abrirlo (o ya cerrado): no hay nada que medir ni emitir
+        return
+    padre, memoria_inicial, inicio, inicio_cpu = medicion
+    span['segundos'] = time.perf_counter() - inicio
+    span['cpu_segundos'] = time.thread_time() - inicio_cpu
+    _quitar_de_pila(span)
+    span['memoria_pico_mb'] = None
+    pico_hijos = span.pop('_pico_hijos', 0)
+    if memoria_inicial is not None and tracemalloc.is_tracing():
+        _, pico = tracemalloc.get_traced_memory()
+        pico = max(pico, pico_hijos)
+        span['memoria_pico_mb'] = max(pico - memoria_inicial, 0) / 1024 ** 2
+        if padre is not None:
+            padre['_pico_hijos'] = max(padre.get('_pico_hijos', 0), pico)
+    _emitir(span)
+
+
+def _quitar_de_pila(span):
+    pila = _pila()
+    for i in range(len(pila) - 1, -1, -1):
+        if pila[i] is span:
+            del pila[i]
+            return
+
+
+@contextmanager
+def traza(nombre, **atributos):
+    """
+    Abre un span alrededor del bloque.
+
+    Parámetros:
+    -----------
+    nombre : str
+        Nombre de la etapa
+    **atributos :
+        Campos adicionales del span (p. ej. filas_entrada=len(df))
+
+    Retorna:
+    --------
+    dict : El span; el bloque puede agregarle campos (p. ej. span['filas_salida'] = len(df)).
+        Si el bloque lanza una excepción se registra en span['error'] y se vuelve a lanzar.
+    """
+    span = _abrir_span(nombre, atributos)
+    try:
+        yield span
+    except BaseException as e:
+        if '_medicion' in span:
+            span['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _cerrar_span(span)
+
+
+def iniciar_traza(nombre, **atributos):
+    """
+    Abre un span sin bloque with, para medir secciones largas (p. ej. las gráficas de
+    una página) sin reindentarlas. Se cierra con terminar_traza.
+
+    Retorna:
+    --------
+    dict : El span, igual que traza
+    """
+    return _abrir_span(nombre, atributos)
+
+
+def terminar_traza(span):
+    """Cierra y emite un span abierto con iniciar_traza."""
+    _cerrar_span(span)
+
+
+def anotar_traza(**campos):
+    """
+    Agrega campos al span abierto más interno de este hilo (p. ej. cuántos outliers
+    reemplazó un paso de limpieza). Sin span abierto no hace nada.
+    """
+    pila = _pila()
+    if pila:
+        pila[-1].update(campos)
+
+
+def descartar_trazas_abiertas():
+    """
+    Descarta, sin emitirlos, los spans de iniciar_traza que quedaron abiertos en este
+    hilo (p. ej. porque la sección lanzó una excepción antes de terminar_traza), para
+    que no queden como padres de los spans siguientes.
+    """
+    for span in _pila():
+        span.pop('_medicion', None)
+    _pila().clear()
+
+
+def _filas(valor):
+    """Filas del DataFrame (o del primer DataFrame de una tupla, como integrar_datos con reporte)."""
+    if isinstance(valor, tuple):
+        valor = next((v for v in valor if isinstance(v, pd.DataFrame)), None)
+    return len(valor) if isinstance(valor, pd.DataFrame) else None
+
+
+def trazar(nombre=None):
+    """
+    Decorador: ejecuta la función dentro de una traza con su nombre (o el indicado).
+    Las filas de entrada son las del primer argumento DataFrame y las de salida las del
+    resultado.
+    """
+    def decorador(funcion):
+        nombre_span = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _hay_sinks():
+                return funcion(*args, **kwargs)
+            entrada = next((a for a in itertools.chain(args, kwargs.values()) if isinstance(a, pd.DataFrame)), None)
+            with traza(nombre_span, filas_entrada=_filas(entrada)) as span:
+                resultado = funcion(*args, **kwargs)
+                span['filas_salida'] = _filas(resultado)
+                return resultado
+        return envoltura
+    return decorador